@@ -1,12 +1,18 @@
 import pandas as pd
+import numpy as np
 import os
 import math
 from tabulate import tabulate
+import particiones
+import metricas
+import formato_json
 
 # Carpeta base
 BASE = os.path.expanduser(r"~")
 # Carpeta del proyecto (ruta fija)
 CARPETA = r"D:\Desarrollo de sistemas\bd-ejercicio\proyecto1"
+# Formato de la copia JSON: "json" (indentado), "ndjson", "ndjson.gz" o "ndjson.zst"
+FORMATO_JSON = "json"
 
 
 # Helpers para campos ID y generación de nuevos IDs
@@ -56,9 +62,29 @@ def generate_new_id(tabla: list, id_field: str):
         return ""
 
 # Leer CSV y convertir en diccionarios ---
-def cargar_tablas():
+@metricas.medir("cargar_tablas", filas=metricas.filas_del_resultado)
+def cargar_tablas(desde=None, hasta=None, origen="csv"):
+    """Carga todas las tablas. Si las facturas están particionadas por mes
+    (ver particiones.py) se leen solo los meses entre `desde` y `hasta` y se
+    presentan como una sola tabla lógica. Una carga con rango es solo para
+    consulta: no se debe guardar (guardar_tabla_csv rechaza pisar meses que
+    no se cargaron).
+
+    Con origen="json" (o si falta el CSV) se lee la copia JSON en cualquiera
+    de los formatos de formato_json.py, registro por registro.
+    """
+    def read_json_records(ruta):
+        try:
+            return list(formato_json.iterar_registros(ruta))
+        except Exception as e:
+            print(f" Error leyendo {ruta}: {e}")
+            return []
+
     def read_csv_records(fname):
         ruta = os.path.join(CARPETA, fname)
+        ruta_json = formato_json.buscar_archivo(CARPETA, os.path.splitext(fname)[0])
+        if ruta_json and (origen == "json" or not os.path.exists(ruta)):
+            return read_json_records(ruta_json)
         if not os.path.exists(ruta):
             print(f" Advertencia: archivo no encontrado: {ruta} -> se usará tabla vacía.")
             return []
@@ -81,71 +107,105 @@ def cargar_tablas():
         "proveedores": "proveedores.csv",
     }
 
+    particionado = particiones.hay_particiones(CARPETA)
     tablas = {}
     for key, fname in mapping.items():
+        if particionado and key in particiones.TABLAS_PARTICIONADAS:
+            continue
         tablas[key] = read_csv_records(fname)
+    if particionado:
+        tablas.update(particiones.cargar_particiones(CARPETA, desde, hasta))
+        # Mantener el orden de tablas del mapping en el menú
+        tablas = {key: tablas[key] for key in mapping}
 
     return tablas
 
 
+@metricas.medir("guardar_tabla_csv", filas=lambda r, a, k: len(a[0][a[1]]))
+def guardar_tabla_csv(tablas, nombre):
+    """Guarda una tabla en CSV; las facturas particionadas reescriben solo los meses tocados."""
+    if nombre in particiones.TABLAS_PARTICIONADAS and particiones.hay_particiones(CARPETA):
+        try:
+            escritas = particiones.guardar_particiones(tablas, CARPETA, solo=[nombre])
+        except particiones.ParticionNoCargada as e:
+            print(f"❌ {nombre} no guardada: {e}")
+            return
+        print(f" Guardado: {nombre} ({len(escritas)} particiones reescritas)")
+        return
+    ruta = os.path.join(CARPETA, f"{nombre}.csv")
+    pd.DataFrame(tablas[nombre]).to_csv(ruta, index=False)
+    print(f" Guardado: {ruta}")
+
+
+@metricas.medir("guardar_todo", filas=metricas.filas_primer_argumento)
 def guardar_todo(tablas):
     """Guarda cada tabla del diccionario en CARPETA con nombre clave.csv"""
     print("\n Guardando todos los cambios (CSV)...")
     if not os.path.isdir(CARPETA):
         os.makedirs(CARPETA, exist_ok=True)
-    for key, tabla in tablas.items():
-        fname = f"{key}.csv"
-        ruta = os.path.join(CARPETA, fname)
+    for key in tablas:
         try:
-            pd.DataFrame(tabla).to_csv(ruta, index=False)
-            print(f" Guardado: {ruta}")
+            guardar_tabla_csv(tablas, key)
         except Exception as e:
-            print(f" Error guardando {ruta}: {e}")
+            print(f" Error guardando {key}: {e}")
     print(" Archivos CSV actualizados correctamente.\n")
 
 
-def exportar_tabla_json(tabla, nombre):
+def sanitize_val(v):
+    """Convierte un valor a un tipo nativo serializable en JSON (NaN/NA/NaT/inf -> None)."""
+    # Manejar pandas/NumPy NA/NaN/NaT -> None
+    try:
+        if pd.isna(v):
+            return None
+    except Exception:
+        pass
+
+    # Numpy types -> nativos
+    if isinstance(v, (np.integer,)):
+        return int(v)
+    if isinstance(v, (np.floating,)):
+        f = float(v)
+        if math.isnan(f) or math.isinf(f):
+            return None
+        return f
+    if isinstance(v, (np.bool_,)):
+        return bool(v)
+    if isinstance(v, (np.ndarray,)):
+        # convertir arrays a listas sanitizadas
+        return [sanitize_val(x) for x in v.tolist()]
+
+    # pandas Timestamp / datetime -> ISO string
+    try:
+        if hasattr(v, "isoformat"):
+            return v.isoformat()
+    except Exception:
+        pass
+
+    # Valores ya serializables (str, int, bool, None)
+    return v
+
+
+@metricas.medir("exportar_tabla_json", filas=metricas.filas_primer_argumento)
+def exportar_tabla_json(tabla, nombre, formato=None):
     """Exporta una tabla (lista de dicts) a JSON limpiando tipos no serializables
     y reemplazando NaN/NA/NaT/inf por JSON null.
+
+    `formato` (por defecto FORMATO_JSON) puede ser "ndjson", "ndjson.gz" o
+    "ndjson.zst": se escribe registro por registro, sin copia intermedia.
     """
     import json
-    import math
-    import numpy as np
-    import pandas as pd
 
-    ruta = os.path.join(CARPETA, f"{nombre}.json")
-
-    def sanitize_val(v):
-        # Manejar pandas/NumPy NA/NaN/NaT -> None
-        try:
-            if pd.isna(v):
-                return None
-        except Exception:
-            pass
-
-        # Numpy types -> nativos
-        if isinstance(v, (np.integer,)):
-            return int(v)
-        if isinstance(v, (np.floating,)):
-            f = float(v)
-            if math.isnan(f) or math.isinf(f):
-                return None
-            return f
-        if isinstance(v, (np.bool_,)):
-            return bool(v)
-        if isinstance(v, (np.ndarray,)):
-            # convertir arrays a listas sanitizadas
-            return [sanitize_val(x) for x in v.tolist()]
-
-        # pandas Timestamp / datetime -> ISO string
+    formato = formato or FORMATO_JSON
+    if formato != "json":
+        ruta = formato_json.ruta_tabla(CARPETA, nombre, formato)
         try:
-            if hasattr(v, "isoformat"):
-                return v.isoformat()
-        except Exception:
-            pass
+            formato_json.escribir(tabla, ruta, limpiar=sanitize_val)
+            print(f" Tabla '{nombre}' exportada a {ruta}")
+        except Exception as e:
+            print(" Error exportando a JSON:", e)
+        return
 
-        # Valores ya serializables (str, int, bool, None)
-        return v
+    ruta = os.path.join(CARPETA, f"{nombre}.json")
 
     safe = []
     for rec in tabla:
@@ -188,7 +248,18 @@ def normalize_id_value(value):
         return str(value).strip()
 
 
+@metricas.medir("buscar_por_id", filas=metricas.filas_primer_argumento)
+def buscar_indice_por_id(tabla, id_field, id_valor):
+    """Devuelve la posición del registro cuyo ID coincide (comparación normalizada) o None."""
+    buscado = normalize_id_value(id_valor)
+    for idx, registro in enumerate(tabla):
+        if normalize_id_value(registro.get(id_field, '')) == buscado:
+            return idx
+    return None
+
+
 # Mostrar tabla con formato organizado usando tabulate - MODIFICADA
+@metricas.medir("mostrar_tabla", filas=metricas.filas_primer_argumento)
 def mostrar_tabla(tabla, nombre):
     print(f"\n{'='*80}")
     print(f"📊 TABLA: {nombre.upper()} ({len(tabla)} registros)")
@@ -223,6 +294,10 @@ def mostrar_tabla(tabla, nombre):
 # Menú de selección 
 def menu():
     tablas = cargar_tablas()
+    # Libro de stock: las líneas de factura reservan y descuentan stock de productos
+    from stock import LibroStock, StockInsuficiente
+    libro = LibroStock(tablas.get("productos", []), CARPETA)
+    libro.iniciar_volcado_periodico()
 
     while True:
         nombres = list(tablas.keys())
@@ -256,6 +331,7 @@ def menu():
             continue
 
         if opcion == len(nombres) + 3:
+            libro.detener()
             print(" Saliendo del programa...")
             break
 
@@ -285,13 +361,29 @@ def menu():
                 nuevo = {}
                 campos = list(tabla[0].keys()) if tabla else []
                 for campo in campos:
-                    if is_id_field(campo):
+                    if campo == id_field:
                         # Generar id automáticamente si es posible
                         nuevo[campo] = generate_new_id(tabla, campo)
                     else:
                         raw = input(f"📝 Ingrese {campo}: ")
                         nuevo[campo] = parse_input_value(campo, raw)
-                tabla.append(nuevo)
+                # Medir solo el alta (no la espera de input del usuario); una línea
+                # rechazada sale del bloque con la excepción y queda registrada como error
+                reserva = None
+                try:
+                    with metricas.bloque("menu.agregar", filas=1, tabla=nombre_tabla):
+                        if nombre_tabla == "facturadet":
+                            # Reservar antes de agregar la línea: si no hay stock no se agrega
+                            reserva = libro.reservar(nuevo.get("id_producto"), nuevo.get("cantidad"),
+                                                     referencia=f"id_facturaENC {nuevo.get('id_facturaENC')}")
+                        tabla.append(nuevo)
+                        if reserva is not None:
+                            libro.confirmar(reserva)
+                except (StockInsuficiente, KeyError, ValueError) as e:
+                    print(f"❌ Línea no agregada: {e}")
+                    continue
+                if reserva is not None:
+                    print(f"📦 Stock de producto {reserva.id_producto}: {libro.disponible(reserva.id_producto)}")
                 if id_field and id_field in nuevo:
                     print(f"✅ Registro agregado con {id_field} {nuevo[id_field]}")
                 else:
@@ -301,12 +393,12 @@ def menu():
                 # Preguntar si se desea guardar la tabla en CSV/JSON/both inmediatamente
                 guardar_choice = input("💾 Guardar cambios para esta tabla ahora? (C)SV / (J)SON / (B)oth / (N)o: ").strip().lower()
                 if guardar_choice == 'c':
-                    pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                    guardar_tabla_csv(tablas, nombre_tabla)
                     print("✅ Guardado CSV de la tabla.")
                 elif guardar_choice == 'j':
                     exportar_tabla_json(tabla, nombre_tabla)
                 elif guardar_choice == 'b':
-                    pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                    guardar_tabla_csv(tablas, nombre_tabla)
                     exportar_tabla_json(tabla, nombre_tabla)
 
             elif accion == "m":
@@ -318,13 +410,7 @@ def menu():
                     # Pedir el ID real de la base de datos, no el índice automático
                     id_valor = input(f"🔧 Ingrese el {id_field} del registro a modificar: ").strip()
                     # Buscar el registro por el ID real usando comparación normalizada
-                    registro_idx = None
-                    for idx, registro in enumerate(tabla):
-                        registro_id_valor = registro.get(id_field, '')
-                        # Normalizar ambos valores para comparación
-                        if normalize_id_value(registro_id_valor) == normalize_id_value(id_valor):
-                            registro_idx = idx
-                            break
+                    registro_idx = buscar_indice_por_id(tabla, id_field, id_valor)
                     
                     if registro_idx is None:
                         print(f"❌ No se encontró registro con {id_field} = {id_valor}")
@@ -336,6 +422,7 @@ def menu():
 
                 if 0 <= registro_idx < len(tabla):
                     campos_mod = get_modifiable_fields(tabla[registro_idx])
+                    stock_anterior = tabla[registro_idx].get("stock")
                     if not campos_mod:
                         print("ℹ️  No hay campos modificables en este registro.")
                         continue
@@ -380,18 +467,20 @@ def menu():
                         else:
                             print("❌ Número de campo inválido.")
 
+                    if nombre_tabla == "productos" and tabla[registro_idx].get("stock") != stock_anterior:
+                        libro.ajustar(tabla[registro_idx].get(id_field), tabla[registro_idx].get("stock"))
                     print("✅ Registro modificado.")
                     mostrar_tabla(tabla, nombre_tabla)
 
                     # Opciones de guardado al modificar
                     guardar_choice = input("💾 Guardar cambios para esta tabla ahora? (C)SV / (J)SON / (B)oth / (N)o: ").strip().lower()
                     if guardar_choice == 'c':
-                        pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                        guardar_tabla_csv(tablas, nombre_tabla)
                         print("✅ Guardado CSV de la tabla.")
                     elif guardar_choice == 'j':
                         exportar_tabla_json(tabla, nombre_tabla)
                     elif guardar_choice == 'b':
-                        pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                        guardar_tabla_csv(tablas, nombre_tabla)
                         exportar_tabla_json(tabla, nombre_tabla)
 
                 else:
@@ -406,13 +495,7 @@ def menu():
                     # Pedir el ID real de la base de datos, no el índice automático
                     id_valor = input(f"🗑️  Ingrese el {id_field} del registro a borrar: ").strip()
                     # Buscar el registro por el ID real usando comparación normalizada
-                    registro_idx = None
-                    for idx, registro in enumerate(tabla):
-                        registro_id_valor = registro.get(id_field, '')
-                        # Normalizar ambos valores para comparación
-                        if normalize_id_value(registro_id_valor) == normalize_id_value(id_valor):
-                            registro_idx = idx
-                            break
+                    registro_idx = buscar_indice_por_id(tabla, id_field, id_valor)
                     
                     if registro_idx is None:
                         print(f"❌ No se encontró registro con {id_field} = {id_valor}")
@@ -425,20 +508,23 @@ def menu():
                 if 0 <= registro_idx < len(tabla):
                     # No borrar/alterar campos id: vaciar solo campos modificables
                     campos_no_id = get_modifiable_fields(tabla[registro_idx])
-                    for campo in campos_no_id:
-                        tabla[registro_idx][campo] = ""
+                    with metricas.bloque("menu.borrar", filas=1, tabla=nombre_tabla):
+                        for campo in campos_no_id:
+                            tabla[registro_idx][campo] = ""
+                    if nombre_tabla == "productos" and "stock" in campos_no_id:
+                        libro.ajustar(tabla[registro_idx].get(id_field), "", referencia="borrado")
                     print(f"✅ Registro {id_field} {id_valor} vaciado (campos no id).")
                     mostrar_tabla(tabla, nombre_tabla)
 
                     # Preguntar guardar tras borrar/vaciar campos
                     guardar_choice = input("💾 Guardar cambios para esta tabla ahora? (C)SV / (J)SON / (B)oth / (N)o: ").strip().lower()
                     if guardar_choice == 'c':
-                        pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                        guardar_tabla_csv(tablas, nombre_tabla)
                         print("✅ Guardado CSV de la tabla.")
                     elif guardar_choice == 'j':
                         exportar_tabla_json(tabla, nombre_tabla)
                     elif guardar_choice == 'b':
-                        pd.DataFrame(tabla).to_csv(os.path.join(CARPETA, f"{nombre_tabla}.csv"), index=False)
+                        guardar_tabla_csv(tablas, nombre_tabla)
                         exportar_tabla_json(tabla, nombre_tabla)
                 else:
                     print("❌ ID fuera de rango.")
@@ -911,8 +997,9 @@ def generar_informe_explicativo():
         pdf.savefig(fig)
         plt.close()
 
-# Generar el informe
-print("📊 Generando informe explicativo del sistema...")
-generar_informe_explicativo()
-print("✅ Informe generado: 'Informe_Sistema_Gestion_BD.pdf'")
-print("📄 El PDF contiene 8 páginas con análisis completo del sistema")
\ No newline at end of file
+# Generar el informe (solo al ejecutar el script, no al importarlo)
+if __name__ == "__main__":
+    print("📊 Generando informe explicativo del sistema...")
+    generar_informe_explicativo()
+    print("✅ Informe generado: 'Informe_Sistema_Gestion_BD.pdf'")
+    print("📄 El PDF contiene 8 páginas con análisis completo del sistema")
\ No newline at end of file
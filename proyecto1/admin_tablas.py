@@ -0,0 +1,896 @@
+"""Capa de datos del administrador web (streamlit_app.py).
+
+No importa streamlit, así se puede usar desde benchmarks y scripts.
+"""
+import json
+import os
+import threading
+from json.encoder import encode_basestring
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as pat
+
+import formato_json
+
+# Archivo (en CARPETA) con los tipos inferidos por tabla
+ARCHIVO_TIPOS = "tipos_inferidos.json"
+# Por encima de este tamaño los tipos se infieren sobre una muestra de filas
+UMBRAL_MUESTRA_BYTES = 20 * 1024 * 1024
+MUESTRA_FILAS = 100000
+# Proporción mínima de valores numéricos para tratar una columna como número
+PROPORCION_NUMERICA = 0.6
+# Filas por bloque del buffer de altas
+TAM_BLOQUE_ALTAS = 4096
+# Filas por bloque al escribir la copia JSON
+FILAS_BLOQUE_JSON = 50000
+
+
+def is_id_field(colname: str) -> bool:
+    n = str(colname).strip().lower()
+    return n == "id" or n.startswith("id_") or n.startswith("id") or n.endswith("_id") or ("_id" in n)
+
+
+def columna_id(columnas):
+    """Primera columna que es un ID (la clave "real" de la fila), o None."""
+    return next((c for c in columnas if is_id_field(c)), None)
+
+
+def _tipo_numerico(valores):
+    """Int64 si todos los valores presentes son enteros, si no float64."""
+    finitos = valores[~np.isnan(valores)]
+    if finitos.size == 0 or np.array_equal(finitos, np.trunc(finitos)):
+        return "Int64"
+    return "float64"
+
+
+def inferir_tipo_columna(nombre, serie):
+    """Decide el tipo de una columna leída con el parser por defecto de read_csv.
+
+    Devuelve "Int64", "float64" o "string". Cada columna se recorre una sola
+    vez: las que el parser ya dejó numéricas no vuelven a convertirse y las de
+    texto pasan una única vez por to_numeric. Mismas reglas que antes: los ID
+    siempre son numéricos y el resto solo si más del 60% de las filas son números.
+    """
+    es_id = is_id_field(nombre)
+    total = max(1, len(serie))
+    if pat.is_bool_dtype(serie):
+        return "string"
+    if pat.is_integer_dtype(serie):
+        return "Int64"
+    if pat.is_float_dtype(serie):
+        valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    if es_id or np.count_nonzero(~np.isnan(valores)) / total > PROPORCION_NUMERICA:
+        return _tipo_numerico(valores)
+    return "string"
+
+
+def inferir_tipos(df):
+    return {col: inferir_tipo_columna(col, df[col]) for col in df.columns}
+
+
+def aplicar_tipos(df, tipos, estricto=False):
+    """Convierte cada columna de `df` a su tipo final.
+
+    Con `estricto` (tipos guardados de antes) lanza ValueError si algún texto
+    de una columna numérica no se puede convertir, en lugar de dejarlo nulo.
+    """
+    for col, tipo in tipos.items():
+        serie = df[col]
+        if tipo == "string":
+            if str(serie.dtype) != "string":
+                df[col] = serie.astype("string")
+        elif pat.is_numeric_dtype(serie) and not pat.is_bool_dtype(serie):
+            if serie.dtype != tipo:
+                df[col] = serie.astype(tipo)
+        else:
+            # Columna mayoritariamente numérica con algún texto
+            convertida = pd.to_numeric(serie, errors="coerce")
+            if estricto and convertida.isna().sum() > serie.isna().sum():
+                raise ValueError(f"La columna {col} tiene valores que no son {tipo}")
+            df[col] = convertida.astype(tipo)
+    return df
+
+
+def leer_con_tipos(ruta, tipos):
+    """Lee el CSV con los tipos ya conocidos: texto como string y números con el
+    parser nativo (int64/float64), que después se pasan a Int64 sin reparsear.
+    Si el archivo ya no respeta los tipos lanza ValueError/TypeError.
+    """
+    df = pd.read_csv(ruta, dtype={col: "string" for col, t in tipos.items() if t == "string"})
+    return aplicar_tipos(df, tipos, estricto=True)
+
+
+def cargar_tipos(carpeta):
+    ruta = os.path.join(carpeta, ARCHIVO_TIPOS)
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_tipos(carpeta, cache):
+    ruta = os.path.join(carpeta, ARCHIVO_TIPOS)
+    try:
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+    except OSError:
+        pass
+
+
+def huella_archivo(ruta):
+    """Tamaño y fecha de modificación del archivo, para saber si cambió desde que se infirieron sus tipos."""
+    info = os.stat(ruta)
+    return {"bytes": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def _inferir_y_leer(ruta):
+    if os.path.getsize(ruta) > UMBRAL_MUESTRA_BYTES:
+        tipos = inferir_tipos(pd.read_csv(ruta, nrows=MUESTRA_FILAS))
+        try:
+            return leer_con_tipos(ruta, tipos), tipos
+        except (ValueError, TypeError):
+            pass  # la muestra no representaba al archivo: inferir sobre todo
+    df = pd.read_csv(ruta)
+    tipos = inferir_tipos(df)
+    texto = [c for c, t in tipos.items() if t == "string" and not pat.is_string_dtype(df[c])]
+    if texto:
+        # El parser convirtió a número columnas que quedan como texto: releerlas tal cual
+        crudo = pd.read_csv(ruta, usecols=texto, dtype="string")
+        for c in texto:
+            df[c] = crudo[c]
+    return aplicar_tipos(df, tipos), tipos
+
+
+def cargar_tabla_csv(ruta, cache):
+    """Carga un CSV usando los tipos guardados en `cache` si siguen valiendo.
+
+    Los tipos guardados se usan solo si el archivo no cambió (mismo tamaño y
+    fecha de modificación) desde que se infirieron. Si no hay tipos, el archivo
+    cambió o ya no los respeta, se infieren y se actualiza `cache`.
+    Devuelve (DataFrame, cambió_cache).
+    """
+    clave = os.path.basename(ruta)
+    entrada = cache.get(clave)
+    columnas = list(pd.read_csv(ruta, nrows=0).columns)
+    huella = huella_archivo(ruta)
+    if entrada and entrada.get("columnas") == columnas and entrada.get("archivo") == huella:
+        try:
+            return leer_con_tipos(ruta, entrada["tipos"]), False
+        except (ValueError, TypeError):
+            pass
+    df, tipos = _inferir_y_leer(ruta)
+    cache[clave] = {"columnas": columnas, "tipos": tipos, "archivo": huella}
+    return df, True
+
+
+def cargar_tabla_json(ruta_json):
+    """Carga la copia JSON (json/ndjson/gz/zst) por bloques e infiere tipos."""
+    partes = [pd.DataFrame(b) for b in formato_json.iterar_bloques(ruta_json)]
+    if not partes:
+        return pd.DataFrame()
+    df = pd.concat(partes, ignore_index=True)
+    return aplicar_tipos(df, inferir_tipos(df))
+
+
+def cargar_tablas_df(carpeta, archivos):
+    """Carga cada CSV de `archivos` (o su copia JSON) como DataFrame tipado."""
+    cache = cargar_tipos(carpeta)
+    cambio = False
+    tablas = {}
+    for f in archivos:
+        ruta = os.path.join(carpeta, f)
+        key = os.path.splitext(f)[0]
+        try:
+            if os.path.exists(ruta):
+                tablas[key], cambio_tabla = cargar_tabla_csv(ruta, cache)
+                cambio = cambio or cambio_tabla
+            else:
+                ruta_json = formato_json.buscar_archivo(carpeta, key)
+                tablas[key] = cargar_tabla_json(ruta_json) if ruta_json else pd.DataFrame()
+        except Exception:
+            tablas[key] = pd.DataFrame()
+    if cambio:
+        guardar_tipos(carpeta, cache)
+    return tablas
+
+
+def registrar_tipos(carpeta, dtypes_por_tabla):
+    """Anota en tipos_inferidos.json los tipos de CSV que acaba de escribir la app.
+
+    Así un guardado propio no obliga a inferir de nuevo en la próxima carga.
+    Las tablas con alguna columna de otro tipo se borran del archivo.
+    """
+    cache = cargar_tipos(carpeta)
+    for nombre, dtypes in dtypes_por_tabla.items():
+        clave = f"{nombre}.csv"
+        tipos = {str(col): str(dtype) for col, dtype in dtypes.items()}
+        if set(tipos.values()) <= {"Int64", "float64", "string"}:
+            cache[clave] = {"columnas": list(tipos), "tipos": tipos,
+                            "archivo": huella_archivo(os.path.join(carpeta, clave))}
+        else:
+            cache.pop(clave, None)
+    guardar_tipos(carpeta, cache)
+
+
+def guardar_csv(df, ruta):
+    """Escribe el CSV en un temporal y lo renombra (los nulos quedan como celdas vacías)."""
+    temporal = ruta + ".tmp"
+    df.to_csv(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+def _json_columna(serie):
+    """Valores de una columna ya codificados como texto JSON (nulos -> null), de una vez por columna."""
+    nulos = serie.isna().to_numpy(dtype=bool)
+    if pat.is_bool_dtype(serie):
+        textos = ["true" if v else "false" for v in serie.to_numpy(dtype=object, na_value=False).tolist()]
+    elif pat.is_integer_dtype(serie):
+        textos = list(map(str, serie.to_numpy(dtype="int64", na_value=0).tolist()))
+    elif pat.is_float_dtype(serie):
+        textos = list(map(repr, serie.to_numpy(dtype="float64", na_value=np.nan).tolist()))
+    elif pat.is_string_dtype(serie):
+        textos = list(map(encode_basestring, serie.to_numpy(dtype=object, na_value="").tolist()))
+    else:
+        textos = [json.dumps(v, ensure_ascii=False, default=str) for v in serie.tolist()]
+    if nulos.any():
+        for i in np.flatnonzero(nulos).tolist():
+            textos[i] = "null"
+    return textos
+
+
+def exportar_json(df, ruta, filas_por_bloque=FILAS_BLOQUE_JSON):
+    """Escribe la tabla como arreglo JSON con indent=2 (mismo texto que json.dump).
+
+    Codifica columna por columna y escribe por bloques de filas en un
+    temporal que se renombra al final: no arma la lista de diccionarios.
+    """
+    prefijos = [f'    {encode_basestring(str(col))}: ' for col in df.columns]
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        if len(df) == 0:
+            f.write("[]")
+        else:
+            f.write("[\n")
+            for inicio in range(0, len(df), filas_por_bloque):
+                bloque = df.iloc[inicio:inicio + filas_por_bloque]
+                columnas = [[prefijo + v for v in _json_columna(bloque[col])]
+                            for prefijo, col in zip(prefijos, bloque.columns)]
+                if columnas:
+                    filas = ["  {\n" + ",\n".join(campos) + "\n  }" for campos in zip(*columnas)]
+                else:
+                    filas = ["  {}"] * len(bloque)
+                if inicio:
+                    f.write(",\n")
+                f.write(",\n".join(filas))
+            f.write("\n]")
+    os.replace(temporal, ruta)
+
+
+def convertir_valor(texto, dtype):
+    """Texto de un formulario -> valor para una columna de tipo `dtype` (pd.NA si vacío o inválido)."""
+    if texto == "" or texto is None:
+        return pd.NA
+    if pat.is_integer_dtype(dtype):
+        try:
+            return int(texto)
+        except Exception:
+            return pd.NA
+    if pat.is_float_dtype(dtype):
+        try:
+            return float(texto)
+        except Exception:
+            return pd.NA
+    return texto
+
+
+def diferencias(original, editado, dtypes):
+    """Compara una página con su versión editada en la grilla, columna por columna.
+
+    Cada columna editada se convierte de una vez al tipo de la tabla (vacío
+    -> nulo) y se compara con la original. Devuelve (cambios, errores):
+    cambios {posición: {columna: valor}} con solo las celdas que cambiaron y
+    errores [(posición, columna, valor)] con las que no respetan el tipo.
+    """
+    cambios, errores = {}, []
+    posiciones = original.index.to_numpy()
+    for col in original.columns:
+        antes = original[col]
+        despues = editado[col].reindex(original.index)
+        dtype = dtypes.get(col)
+        vacios = despues.isna()
+        if not pat.is_numeric_dtype(despues):
+            vacios |= (despues.astype("string").str.strip() == "").fillna(False)
+        if pat.is_numeric_dtype(dtype) and not pat.is_bool_dtype(dtype):
+            numeros = pd.to_numeric(despues.mask(vacios), errors="coerce")
+            invalidos = numeros.isna() & ~vacios
+            if pat.is_integer_dtype(dtype):
+                invalidos |= (numeros.notna() & (numeros % 1 != 0)).fillna(False)
+            nuevos = numeros.mask(invalidos).astype(dtype)
+        else:
+            invalidos = pd.Series(False, index=despues.index)
+            nuevos = despues.mask(vacios).astype(antes.dtype)
+        iguales = (antes.isna() & nuevos.isna()) | (antes == nuevos).fillna(False)
+        invalidos = invalidos.to_numpy(dtype=bool)
+        cambiadas = ~iguales.to_numpy(dtype=bool) & ~invalidos
+        for idx, valor in zip(posiciones[cambiadas], nuevos[cambiadas]):
+            cambios.setdefault(int(idx), {})[col] = valor
+        errores += [(int(idx), col, valor) for idx, valor in zip(posiciones[invalidos], despues[invalidos])]
+    return cambios, errores
+
+
+def _tipo_numpy(dtype):
+    if pat.is_bool_dtype(dtype):
+        return object
+    if pat.is_integer_dtype(dtype):
+        return np.int64
+    if pat.is_float_dtype(dtype):
+        return np.float64
+    return object
+
+
+def _a_serie(valores, nulos, dtype):
+    """Arma la columna final (con el dtype de la tabla) a partir de valores + máscara de nulos."""
+    if valores.dtype == np.int64:
+        serie = pd.Series(pd.arrays.IntegerArray(valores, nulos))
+    elif valores.dtype == np.float64:
+        serie = pd.Series(np.where(nulos, np.nan, valores))
+    else:
+        valores[nulos] = None
+        serie = pd.Series(valores, dtype=object)
+    try:
+        return serie.astype(dtype)
+    except (TypeError, ValueError):
+        return serie
+
+
+class BufferAltas:
+    """Filas nuevas de una tabla en bloques preasignados y tipados.
+
+    Cada columna de un bloque es un arreglo numpy del tipo de la columna más
+    una máscara de nulos. Agregar una fila escribe en la siguiente posición
+    libre (O(1)); cuando el bloque se llena se asigna otro de `tam_bloque`
+    filas. La tabla base nunca se copia.
+    """
+
+    def __init__(self, dtypes, tam_bloque=TAM_BLOQUE_ALTAS):
+        self.dtypes = dict(dtypes)
+        self.tam_bloque = tam_bloque
+        self.bloques = []
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def _nuevo_bloque(self):
+        self.bloques.append({
+            col: (np.empty(self.tam_bloque, dtype=_tipo_numpy(dtype)), np.ones(self.tam_bloque, dtype=bool))
+            for col, dtype in self.dtypes.items()
+        })
+
+    def poner(self, pos, col, valor):
+        valores, nulos = self.bloques[pos // self.tam_bloque][col]
+        i = pos % self.tam_bloque
+        if valor is None or valor is pd.NA or (isinstance(valor, float) and np.isnan(valor)):
+            nulos[i] = True
+            return
+        try:
+            valores[i] = valor
+            nulos[i] = False
+        except (TypeError, ValueError, OverflowError):
+            nulos[i] = True
+
+    def agregar(self, fila):
+        """Agrega `fila` (dict columna -> valor) y devuelve su posición dentro del buffer."""
+        if self.n == len(self.bloques) * self.tam_bloque:
+            self._nuevo_bloque()
+        pos = self.n
+        for col in self.dtypes:
+            self.poner(pos, col, fila.get(col, pd.NA))
+        self.n += 1
+        return pos
+
+    def valor(self, pos, col):
+        valores, nulos = self.bloques[pos // self.tam_bloque][col]
+        i = pos % self.tam_bloque
+        if nulos[i]:
+            return pd.NA
+        v = valores[i]
+        return v.item() if hasattr(v, "item") else v
+
+    def tomar(self, posiciones):
+        """DataFrame con las filas del buffer en `posiciones` (en ese orden)."""
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        bloques = posiciones // self.tam_bloque
+        offsets = posiciones % self.tam_bloque
+        columnas = {}
+        for col, dtype in self.dtypes.items():
+            valores = np.empty(len(posiciones), dtype=_tipo_numpy(dtype))
+            nulos = np.empty(len(posiciones), dtype=bool)
+            for b in np.unique(bloques):
+                sel = bloques == b
+                v, m = self.bloques[b][col]
+                valores[sel] = v[offsets[sel]]
+                nulos[sel] = m[offsets[sel]]
+            columnas[col] = _a_serie(valores, nulos, dtype)
+        return pd.DataFrame(columnas)
+
+    def a_dataframe(self, inicio=0, fin=None, columnas=None):
+        """Copia las filas [inicio, fin) del buffer a un DataFrame con los dtypes de la tabla."""
+        fin = self.n if fin is None else min(fin, self.n)
+        inicio = min(inicio, fin)
+        tam = self.tam_bloque
+        elegidas = self.dtypes if columnas is None else {c: self.dtypes[c] for c in columnas}
+        columnas = {}
+        for col, dtype in elegidas.items():
+            partes_v, partes_n = [], []
+            for b in range(inicio // tam, -(-fin // tam)):
+                desde, hasta = max(inicio - b * tam, 0), min(fin - b * tam, tam)
+                valores, nulos = self.bloques[b][col]
+                partes_v.append(valores[desde:hasta])
+                partes_n.append(nulos[desde:hasta])
+            valores = np.concatenate(partes_v) if partes_v else np.empty(0, dtype=_tipo_numpy(dtype))
+            nulos = np.concatenate(partes_n) if partes_n else np.empty(0, dtype=bool)
+            columnas[col] = _a_serie(valores, nulos, dtype)
+        return pd.DataFrame(columnas)
+
+
+class IndiceColumna:
+    """Índices de una columna para filtrar sin recorrer toda la tabla.
+
+    Se arman la primera vez que se usan:
+    - ordenado: valores sin nulos ordenados + sus posiciones -> rango y
+      prefijo con searchsorted (el texto se indexa en minúsculas)
+    - hash: valores distintos (factorize) + posiciones agrupadas por valor ->
+      igualdad, y "contiene" evaluado solo sobre los valores distintos
+    Todas las búsquedas devuelven posiciones ordenadas.
+    """
+
+    def __init__(self, serie):
+        self._serie = serie.reset_index(drop=True)
+        self.es_texto = not (pat.is_numeric_dtype(serie) and not pat.is_bool_dtype(serie))
+        self._ordenado = None
+        self._hash = None
+
+    def _orden(self):
+        if self._ordenado is None:
+            serie = self._serie.dropna()
+            if self.es_texto:
+                serie = serie.astype("string").str.lower()
+                valores = serie.sort_values(kind="stable")
+                self._ordenado = (valores.to_numpy(dtype=object), valores.index.to_numpy())
+            else:
+                valores = serie.astype("float64").sort_values(kind="stable")
+                self._ordenado = (valores.to_numpy(), valores.index.to_numpy())
+        return self._ordenado
+
+    def _grupos(self):
+        if self._hash is None:
+            codigos, unicos = pd.factorize(self._serie)
+            orden = np.argsort(codigos, kind="stable")
+            limites = np.searchsorted(codigos[orden], np.arange(len(unicos) + 1))
+            mapa = {v: i for i, v in enumerate(unicos.tolist())}
+            self._hash = (mapa, unicos, orden, limites)
+        return self._hash
+
+    def _posiciones(self, codigos):
+        _, _, orden, limites = self._grupos()
+        partes = [orden[limites[c]:limites[c + 1]] for c in codigos]
+        return np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.int64)
+
+    def iguales(self, valor):
+        codigo = self._grupos()[0].get(valor)
+        return self._posiciones([] if codigo is None else [codigo])
+
+    def rango(self, minimo=None, maximo=None):
+        valores, posiciones = self._orden()
+        i = 0 if minimo is None else np.searchsorted(valores, minimo, "left")
+        j = len(valores) if maximo is None else np.searchsorted(valores, maximo, "right")
+        return np.sort(posiciones[i:j])
+
+    def prefijo(self, texto):
+        valores, posiciones = self._orden()
+        texto = str(texto).lower()
+        i = np.searchsorted(valores, texto, "left")
+        j = np.searchsorted(valores, texto + "\U0010ffff", "left")
+        return np.sort(posiciones[i:j])
+
+    def contiene(self, texto):
+        unicos = self._grupos()[1]
+        coinciden = pd.Series(unicos, dtype="string").str.contains(str(texto), case=False, regex=False, na=False)
+        return self._posiciones(np.flatnonzero(coinciden.to_numpy(dtype=bool)))
+
+
+class _TablaPaginada:
+    """Operaciones comunes a TablaAdmin y VistaSesion (usan len, columnas, columna y filas).
+
+    Los índices (orden, rango de orden, IndiceColumna) se cachean por versión
+    de la tabla y se descartan solos cuando la tabla cambia.
+    """
+
+    @property
+    def vacia(self):
+        return len(self) == 0 or len(self.columnas) == 0
+
+    def vaciar(self, idx):
+        self.modificar(idx, {col: pd.NA for col in self.columnas})
+
+    def _cacheado(self, nombre, clave, construir):
+        version = self._version_cache()
+        cache = self._caches.setdefault(nombre, {})
+        cacheado = cache.get(clave)
+        if cacheado is None or cacheado[0] != version:
+            for vieja in [k for k, v in cache.items() if v[0] != version]:
+                del cache[vieja]
+            cacheado = cache[clave] = (version, construir())
+        return cacheado[1]
+
+    def indice_orden(self, col, ascendente=True):
+        """Posiciones de las filas ordenadas por `col` (nulos al final)."""
+        def construir():
+            orden = self.columna(col).sort_values(ascending=ascendente, kind="stable", na_position="last")
+            return orden.index.to_numpy()
+        return self._cacheado("orden", (col, ascendente), construir)
+
+    def rango_orden(self, col, ascendente=True):
+        """Lugar de cada fila en indice_orden(col): ordena un subconjunto sin reordenar la tabla."""
+        def construir():
+            orden = self.indice_orden(col, ascendente)
+            rango = np.empty(len(orden), dtype=np.int64)
+            rango[orden] = np.arange(len(orden))
+            return rango
+        return self._cacheado("rango", (col, ascendente), construir)
+
+    def indice(self, col):
+        return self._cacheado("indice", col, lambda: IndiceColumna(self.columna(col)))
+
+    def filtrar(self, filtros):
+        """Posiciones (ordenadas) de las filas que cumplen todos los filtros.
+
+        Cada filtro es (columna, operación, *valores) con operación "iguales",
+        "rango", "prefijo" o "contiene" (métodos de IndiceColumna).
+        """
+        resultado = None
+        for col, operacion, *valores in filtros:
+            posiciones = getattr(self.indice(col), operacion)(*valores)
+            resultado = posiciones if resultado is None else np.intersect1d(resultado, posiciones, assume_unique=True)
+        return np.arange(len(self)) if resultado is None else resultado
+
+    def paginas(self, por_pagina, total=None):
+        total = len(self) if total is None else total
+        return max(1, -(-total // por_pagina))
+
+    def ventana(self, pagina, por_pagina, orden=None, ascendente=True, posiciones=None):
+        """Filas de la página `pagina` (desde 1), opcionalmente ordenadas por la columna `orden`.
+
+        Con `posiciones` (resultado de filtrar) la página sale solo de esas filas.
+        """
+        total = len(self) if posiciones is None else len(posiciones)
+        inicio = (max(1, pagina) - 1) * por_pagina
+        fin = min(inicio + por_pagina, total)
+        if posiciones is not None:
+            if orden is not None:
+                posiciones = posiciones[np.argsort(self.rango_orden(orden, ascendente)[posiciones], kind="stable")]
+            return self.filas(posiciones[inicio:fin])
+        if orden is None:
+            return self.filas(np.arange(inicio, max(inicio, fin)))
+        return self.filas(self.indice_orden(orden, ascendente)[inicio:fin])
+
+
+class TablaAdmin(_TablaPaginada):
+    """Tabla del administrador web: DataFrame base + buffer de altas.
+
+    `df` es la vista consolidada: base y altas se unen (una sola copia) solo
+    cuando alguien pide la tabla entera —guardar, exportar, recorrerla— y el
+    resultado queda como nueva base. `version` aumenta con cada cambio.
+
+    La grilla pide solo una ventana (`ventana`): se copian las filas de la
+    página, ordenadas con un índice de orden que se calcula una vez por
+    columna y versión.
+    """
+
+    def __init__(self, df):
+        self._base = df
+        self._altas = BufferAltas(df.dtypes)
+        self.version = 0
+        self._caches = {}
+
+    def __len__(self):
+        return len(self._base) + len(self._altas)
+
+    @property
+    def columnas(self):
+        return list(self._base.columns)
+
+    @property
+    def dtypes(self):
+        return self._base.dtypes
+
+    @property
+    def pendientes(self):
+        """Altas todavía no consolidadas en la base."""
+        return len(self._altas)
+
+    @property
+    def df(self):
+        if len(self._altas):
+            nuevas = self._altas.a_dataframe()
+            self._base = pd.concat([self._base, nuevas], ignore_index=True)
+            self._altas = BufferAltas(self._base.dtypes)
+        return self._base
+
+    def agregar(self, fila):
+        """Agrega una fila (dict columna -> valor ya convertido) y devuelve su índice."""
+        pos = self._altas.agregar(fila)
+        self.version += 1
+        return len(self._base) + pos
+
+    def fila(self, idx):
+        n_base = len(self._base)
+        if idx < n_base:
+            return self._base.iloc[idx].to_dict()
+        return {col: self._altas.valor(idx - n_base, col) for col in self.columnas}
+
+    def modificar(self, idx, valores):
+        n_base = len(self._base)
+        for col, valor in valores.items():
+            if idx < n_base:
+                self._base.at[idx, col] = valor
+            else:
+                self._altas.poner(idx - n_base, col, valor)
+        self.version += 1
+
+    def modificar_lote(self, cambios):
+        """Aplica {posición: {columna: valor}} de una vez: una asignación por columna en la base."""
+        n_base = len(self._base)
+        por_columna = {}
+        for idx, valores in cambios.items():
+            for col, valor in valores.items():
+                if idx < n_base:
+                    por_columna.setdefault(col, ([], []))
+                    por_columna[col][0].append(idx)
+                    por_columna[col][1].append(valor)
+                else:
+                    self._altas.poner(idx - n_base, col, valor)
+        for col, (idxs, valores) in por_columna.items():
+            self._base.loc[idxs, col] = pd.array(valores, dtype=self._base[col].dtype)
+        self.version += 1
+
+    def columna(self, col):
+        """Serie con la columna completa (posición = ID) sin consolidar la tabla."""
+        if not len(self._altas):
+            return self._base[col].reset_index(drop=True)
+        return pd.concat([self._base[col], self._altas.a_dataframe(columnas=[col])[col]], ignore_index=True)
+
+    def _version_cache(self):
+        return self.version
+
+    def filas(self, posiciones):
+        """DataFrame con las filas en `posiciones` (en ese orden); el índice es la posición."""
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        n_base = len(self._base)
+        en_base = posiciones < n_base
+        if en_base.all():
+            parte = self._base.iloc[posiciones]
+        else:
+            parte = pd.concat([self._base.iloc[posiciones[en_base]],
+                               self._altas.tomar(posiciones[~en_base] - n_base)], ignore_index=True)
+            # volver al orden pedido
+            llegada = np.concatenate([np.flatnonzero(en_base), np.flatnonzero(~en_base)])
+            parte = parte.iloc[np.argsort(llegada, kind="stable")]
+        parte.index = pd.Index(posiciones, name="ID")
+        return parte
+
+
+class VistaSesion(_TablaPaginada):
+    """Una tabla tal como la ve una sesión: la TablaAdmin compartida + sus cambios sin guardar.
+
+    Las altas de la sesión van a un BufferAltas propio y las modificaciones
+    a un dict {posición: {columna: valor}}. La tabla compartida no se toca
+    hasta `confirmar`; sin cambios pendientes todo se delega en ella.
+
+    Con la primera alta propia la sesión fija cuántas filas de la compartida
+    ve (`_corte`): sus altas quedan en las posiciones `_corte + offset` aunque
+    otra sesión confirme filas mientras tanto. Las filas que confirmen otras
+    sesiones aparecen al confirmar o descartar.
+    """
+
+    def __init__(self, compartida, lock):
+        self.compartida = compartida
+        self._lock = lock
+        self._altas = BufferAltas(compartida.dtypes)
+        self._cambios = {}
+        self._corte = None
+        self.version = 0
+        self._caches = {}
+
+    def _n_compartida(self):
+        """Filas de la compartida que ve la sesión (llamar con el lock tomado)."""
+        return len(self.compartida) if self._corte is None else self._corte
+
+    def __len__(self):
+        with self._lock:
+            return self._n_compartida() + len(self._altas)
+
+    @property
+    def columnas(self):
+        return self.compartida.columnas
+
+    @property
+    def dtypes(self):
+        return self.compartida.dtypes
+
+    @property
+    def pendientes(self):
+        """Altas + filas modificadas todavía no confirmadas."""
+        return len(self._altas) + len(self._cambios)
+
+    def agregar(self, fila):
+        with self._lock:
+            if self._corte is None:
+                self._corte = len(self.compartida)
+        pos = self._altas.agregar(fila)
+        self.version += 1
+        return self._corte + pos
+
+    def fila(self, idx):
+        with self._lock:
+            n = self._n_compartida()
+            if idx >= n:
+                return {col: self._altas.valor(idx - n, col) for col in self.columnas}
+            fila = self.compartida.fila(idx)
+        fila.update(self._cambios.get(idx, {}))
+        return fila
+
+    def modificar(self, idx, valores):
+        with self._lock:
+            n = self._n_compartida()
+        if idx >= n:
+            for col, valor in valores.items():
+                self._altas.poner(idx - n, col, valor)
+        else:
+            self._cambios.setdefault(idx, {}).update(valores)
+        self.version += 1
+
+    def modificar_lote(self, cambios):
+        with self._lock:
+            n = self._n_compartida()
+        for idx, valores in cambios.items():
+            if idx >= n:
+                for col, valor in valores.items():
+                    self._altas.poner(idx - n, col, valor)
+            else:
+                self._cambios.setdefault(idx, {}).update(valores)
+        self.version += 1
+
+    def columna(self, col):
+        with self._lock:
+            serie = self.compartida.columna(col).iloc[:self._n_compartida()]
+        if len(self._altas):
+            serie = pd.concat([serie, self._altas.a_dataframe(columnas=[col])[col]], ignore_index=True)
+        for idx, valores in self._cambios.items():
+            if col in valores:
+                serie.iat[idx] = valores[col]
+        return serie
+
+    def _version_cache(self):
+        return (self.compartida.version, self.version)
+
+    # Sin cambios propios, los índices son los de la tabla compartida
+    def indice_orden(self, col, ascendente=True):
+        if not self.pendientes:
+            with self._lock:
+                return self.compartida.indice_orden(col, ascendente)
+        return super().indice_orden(col, ascendente)
+
+    def rango_orden(self, col, ascendente=True):
+        if not self.pendientes:
+            with self._lock:
+                return self.compartida.rango_orden(col, ascendente)
+        return super().rango_orden(col, ascendente)
+
+    def indice(self, col):
+        if not self.pendientes:
+            with self._lock:
+                return self.compartida.indice(col)
+        return super().indice(col)
+
+    def filas(self, posiciones):
+        posiciones = np.asarray(posiciones, dtype=np.int64)
+        with self._lock:
+            n = self._n_compartida()
+            en_compartida = posiciones < n
+            parte = self.compartida.filas(posiciones[en_compartida])
+        if not en_compartida.all():
+            propias = self._altas.tomar(posiciones[~en_compartida] - n)
+            propias.index = pd.Index(posiciones[~en_compartida], name="ID")
+            parte = pd.concat([parte, propias]).loc[posiciones]
+        tocadas = [idx for idx in parte.index if idx in self._cambios]
+        if tocadas:
+            parte = parte.copy()
+            for idx in tocadas:
+                for col, valor in self._cambios[idx].items():
+                    parte.at[idx, col] = valor
+        return parte
+
+    @property
+    def df(self):
+        """Tabla completa con los cambios aplicados (sin cambios: la de la compartida, no modificarla)."""
+        with self._lock:
+            base = self.compartida.df
+            if not self.pendientes:
+                return base
+            df = base.iloc[:self._n_compartida()].copy()
+        for idx, valores in self._cambios.items():
+            for col, valor in valores.items():
+                df.at[idx, col] = valor
+        if len(self._altas):
+            df = pd.concat([df, self._altas.a_dataframe()], ignore_index=True)
+        return df
+
+    def instantanea(self):
+        """Copia de `df` tomada bajo el lock del almacén: otra sesión que confirme o
+        guarde mientras se usa (ej. al exportar) no la cambia a medias."""
+        with self._lock:
+            df = self.df
+            # Con cambios pendientes `df` ya es una tabla nueva; sin ellos es la compartida
+            return df if self.pendientes else df.copy()
+
+    def confirmar(self):
+        """Pasa los cambios a la tabla compartida (si dos sesiones tocan la misma fila, gana la última)."""
+        with self._lock:
+            if self._cambios:
+                self.compartida.modificar_lote(self._cambios)
+            for pos in range(len(self._altas)):
+                self.compartida.agregar({col: self._altas.valor(pos, col) for col in self.columnas})
+        self.descartar()
+
+    def descartar(self):
+        self._altas = BufferAltas(self.compartida.dtypes)
+        self._cambios = {}
+        self._corte = None
+        self._caches = {}
+        self.version += 1
+
+
+class AlmacenCompartido:
+    """Tablas cargadas una sola vez por proceso y compartidas por todas las sesiones.
+
+    Cada sesión trabaja sobre `sesion()` (vistas con sus propios cambios);
+    `confirmar` los pasa a las tablas compartidas bajo el lock y `guardar`
+    escribe solo las tablas cuya versión cambió desde la última escritura.
+    """
+
+    def __init__(self, tablas_df):
+        self.lock = threading.RLock()
+        self.tablas = {nombre: TablaAdmin(df) for nombre, df in tablas_df.items()}
+        # Versión de cada tabla que coincide con su CSV en disco
+        self._guardadas = {nombre: tabla.version for nombre, tabla in self.tablas.items()}
+
+    def guardar(self, carpeta):
+        """Escribe los CSV de las tablas modificadas (o que no tienen archivo). Devuelve {nombre: tabla}."""
+        escritas = {}
+        with self.lock:
+            for nombre, tabla in self.tablas.items():
+                ruta = os.path.join(carpeta, f"{nombre}.csv")
+                if self._guardadas.get(nombre) == tabla.version and (os.path.exists(ruta) or not tabla.columnas):
+                    continue
+                guardar_csv(tabla.df, ruta)
+                self._guardadas[nombre] = tabla.version
+                escritas[nombre] = tabla
+            if escritas:
+                registrar_tipos(carpeta, {nombre: tabla.dtypes for nombre, tabla in escritas.items()})
+        return escritas
+
+    def sesion(self):
+        return {nombre: VistaSesion(tabla, self.lock) for nombre, tabla in self.tablas.items()}
+
+    def confirmar(self, vistas):
+        with self.lock:
+            for vista in vistas.values():
+                vista.confirmar()
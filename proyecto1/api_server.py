@@ -0,0 +1,377 @@
+# para ejecutar : py "d:\Desarrollo de sistemas\bd-ejercicio\proyecto1\api_server.py" --puerto 8765
+"""API HTTP/JSON local sobre las tablas de Proyecto1.
+
+Servidor asyncio (solo biblioteca estándar) con un único almacén en memoria
+compartido por todas las conexiones. Las lecturas se atienden en forma
+concurrente y las escrituras se serializan con un lock lectores/escritor.
+
+Rutas:
+    GET    /tablas                          -> nombres y cantidad de registros
+    GET    /tablas/<tabla>?pagina=1&por_pagina=50
+    GET    /tablas/<tabla>/<id>
+    POST   /tablas/<tabla>                  -> alta con ID automático
+                                               (en facturadet reserva y descuenta stock)
+    PUT    /tablas/<tabla>/<id>             -> modifica campos no ID
+    DELETE /tablas/<tabla>/<id>             -> vacía campos no ID (igual que el menú)
+    POST   /guardar                         -> persiste todas las tablas en CSV
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import urlsplit, parse_qs
+
+import Proyecto1 as p1
+from stock import LibroStock, StockInsuficiente
+
+POR_PAGINA_DEFECTO = 50
+POR_PAGINA_MAX = 1000
+
+MOTIVOS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error",
+}
+
+
+class ErrorAPI(Exception):
+    """Error con código HTTP asociado, se responde como {"error": ...}."""
+
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje)
+        self.status = status
+        self.mensaje = mensaje
+
+
+class LockLectoresEscritor:
+    """Lock asyncio: muchos lectores a la vez o un solo escritor.
+
+    Da preferencia al escritor: mientras uno espera no entran lectores nuevos,
+    así una ráfaga de GET no deja sin turno a las altas/modificaciones.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._lectores = 0
+        self._escribiendo = False
+        self._escritores_esperando = 0
+
+    async def adquirir_lectura(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._escribiendo and self._escritores_esperando == 0)
+            self._lectores += 1
+
+    async def liberar_lectura(self):
+        async with self._cond:
+            self._lectores -= 1
+            if self._lectores == 0:
+                self._cond.notify_all()
+
+    async def adquirir_escritura(self):
+        async with self._cond:
+            self._escritores_esperando += 1
+            try:
+                await self._cond.wait_for(lambda: not self._escribiendo and self._lectores == 0)
+            finally:
+                self._escritores_esperando -= 1
+            self._escribiendo = True
+
+    async def liberar_escritura(self):
+        async with self._cond:
+            self._escribiendo = False
+            self._cond.notify_all()
+
+
+class AlmacenTablas:
+    """Almacén en memoria: mismas tablas (listas de dicts) que usa el menú.
+
+    Mantiene por tabla un índice {id normalizado -> posición} para que la
+    búsqueda por ID no recorra la lista completa como hace el menú.
+    """
+
+    def __init__(self, tablas, libro=None):
+        self.tablas = tablas
+        self.libro = libro   # LibroStock: toda escritura de `stock` en productos pasa por él
+        self.id_fields = {}
+        self.indices = {}
+        for nombre, tabla in tablas.items():
+            self._reindexar(nombre)
+
+    def _reindexar(self, nombre):
+        tabla = self.tablas[nombre]
+        id_field = p1.get_main_id_field(tabla[0]) if tabla else None
+        self.id_fields[nombre] = id_field
+        indice = {}
+        if id_field:
+            for pos, registro in enumerate(tabla):
+                indice.setdefault(p1.normalize_id_value(registro.get(id_field, "")), pos)
+        self.indices[nombre] = indice
+
+    def _tabla(self, nombre):
+        if nombre not in self.tablas:
+            raise ErrorAPI(404, f"Tabla inexistente: {nombre}")
+        return self.tablas[nombre]
+
+    def _posicion(self, nombre, id_valor):
+        self._tabla(nombre)
+        id_field = self.id_fields.get(nombre)
+        if not id_field:
+            raise ErrorAPI(404, f"La tabla {nombre} no tiene campo ID")
+        pos = self.indices[nombre].get(p1.normalize_id_value(id_valor))
+        if pos is None:
+            raise ErrorAPI(404, f"No se encontró registro con {id_field} = {id_valor}")
+        return pos
+
+    # Lecturas
+    def resumen(self):
+        return {nombre: len(tabla) for nombre, tabla in self.tablas.items()}
+
+    def listar(self, nombre, pagina, por_pagina):
+        tabla = self._tabla(nombre)
+        inicio = (pagina - 1) * por_pagina
+        return {
+            "tabla": nombre,
+            "pagina": pagina,
+            "por_pagina": por_pagina,
+            "total": len(tabla),
+            "registros": tabla[inicio:inicio + por_pagina],
+        }
+
+    def obtener(self, nombre, id_valor):
+        return self._tabla(nombre)[self._posicion(nombre, id_valor)]
+
+    # Escrituras (siempre bajo el lock de escritura)
+    def agregar(self, nombre, datos):
+        tabla = self._tabla(nombre)
+        if not isinstance(datos, dict):
+            raise ErrorAPI(400, "El cuerpo debe ser un objeto JSON")
+        campos = list(tabla[0].keys()) if tabla else list(datos.keys())
+        nuevo = {}
+        for campo in campos:
+            # Solo el ID principal es automático; las claves foráneas vienen en el cuerpo
+            if campo == self.id_fields.get(nombre):
+                nuevo[campo] = p1.generate_new_id(tabla, campo)
+            else:
+                nuevo[campo] = _valor(campo, datos.get(campo))
+        tabla.append(nuevo)
+        if self.id_fields.get(nombre) is None:
+            self._reindexar(nombre)
+        else:
+            self.indices[nombre][p1.normalize_id_value(nuevo[self.id_fields[nombre]])] = len(tabla) - 1
+        if nombre == "productos" and self.libro is not None:
+            self.libro.registrar(nuevo)
+        return nuevo
+
+    def modificar(self, nombre, id_valor, datos):
+        if not isinstance(datos, dict):
+            raise ErrorAPI(400, "El cuerpo debe ser un objeto JSON")
+        registro = self._tabla(nombre)[self._posicion(nombre, id_valor)]
+        modificables = p1.get_modifiable_fields(registro)
+        desconocidos = [c for c in datos if c not in modificables]
+        if desconocidos:
+            raise ErrorAPI(400, f"Campos no modificables o inexistentes: {', '.join(desconocidos)}")
+        for campo, valor in datos.items():
+            registro[campo] = _valor(campo, valor)
+        if "stock" in datos:
+            self._ajustar_stock(nombre, registro, "API PUT")
+        return registro
+
+    def vaciar(self, nombre, id_valor):
+        registro = self._tabla(nombre)[self._posicion(nombre, id_valor)]
+        for campo in p1.get_modifiable_fields(registro):
+            registro[campo] = ""
+        self._ajustar_stock(nombre, registro, "API DELETE")
+        return registro
+
+    def _ajustar_stock(self, nombre, registro, referencia):
+        if nombre == "productos" and self.libro is not None and "stock" in registro:
+            self.libro.ajustar(registro.get(self.id_fields[nombre]), registro["stock"], referencia)
+
+
+def _valor(campo, valor):
+    """Números JSON se guardan tal cual; el resto pasa por el mismo parseo que el menú."""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    return p1.parse_input_value(campo, valor)
+
+
+def _entero(query, clave, defecto):
+    try:
+        return int(query.get(clave, [defecto])[0])
+    except ValueError:
+        raise ErrorAPI(400, f"Parámetro '{clave}' debe ser entero")
+
+
+def _a_json(obj):
+    def limpiar(o):
+        if isinstance(o, dict):
+            return {k: limpiar(v) for k, v in o.items()}
+        if isinstance(o, list):
+            return [limpiar(v) for v in o]
+        return p1.sanitize_val(o)
+    return json.dumps(limpiar(obj), ensure_ascii=False).encode("utf-8")
+
+
+class ServidorAPI:
+    def __init__(self, almacen, libro=None):
+        self.almacen = almacen
+        self.libro = libro
+        self.lock = LockLectoresEscritor()
+
+    # La serialización se hace dentro del lock: así ninguna escritura puede
+    # modificar un registro mientras se está armando la respuesta.
+    async def _leer(self, funcion, *args):
+        await self.lock.adquirir_lectura()
+        try:
+            return _a_json(funcion(*args))
+        finally:
+            await self.lock.liberar_lectura()
+
+    async def _escribir(self, funcion, *args):
+        await self.lock.adquirir_escritura()
+        try:
+            return _a_json(funcion(*args))
+        finally:
+            await self.lock.liberar_escritura()
+
+    async def _agregar_linea_factura(self, datos):
+        """Alta en facturadet: reserva el stock antes de tomar el lock de escritura.
+
+        La reserva usa el contador del producto, así líneas sobre productos
+        distintos no se bloquean entre sí mientras esperan turno para escribir.
+        """
+        if not isinstance(datos, dict):
+            raise ErrorAPI(400, "El cuerpo debe ser un objeto JSON")
+        try:
+            reserva = self.libro.reservar(datos.get("id_producto"), datos.get("cantidad"),
+                                          referencia=f"id_facturaENC {datos.get('id_facturaENC')}")
+        except StockInsuficiente as e:
+            raise ErrorAPI(409, str(e))
+        except (KeyError, ValueError) as e:
+            raise ErrorAPI(400, str(e).strip("'\""))
+        try:
+            payload = await self._escribir(self.almacen.agregar, "facturadet", datos)
+        except Exception:
+            self.libro.cancelar(reserva)
+            raise
+        self.libro.confirmar(reserva)
+        return payload
+
+    async def _guardar(self):
+        # Copia bajo lock de lectura y escribe los CSV fuera del event loop
+        await self.lock.adquirir_lectura()
+        try:
+            copia = {nombre: [dict(r) for r in tabla] for nombre, tabla in self.almacen.tablas.items()}
+        finally:
+            await self.lock.liberar_lectura()
+        await asyncio.get_running_loop().run_in_executor(None, p1.guardar_todo, copia)
+        return _a_json({"guardado": sorted(copia)})
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        url = urlsplit(ruta)
+        partes = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        datos = None
+        if metodo in ("POST", "PUT"):
+            try:
+                datos = json.loads(cuerpo.decode("utf-8") or "{}")
+            except (ValueError, UnicodeDecodeError):
+                raise ErrorAPI(400, "JSON inválido")
+
+        if partes == ["guardar"] and metodo == "POST":
+            return 200, await self._guardar()
+        if not partes or partes[0] != "tablas" or len(partes) > 3:
+            raise ErrorAPI(404, f"Ruta inexistente: {url.path}")
+
+        if len(partes) == 1:
+            if metodo == "GET":
+                return 200, await self._leer(self.almacen.resumen)
+        elif len(partes) == 2:
+            nombre = partes[1]
+            if metodo == "GET":
+                pagina = max(1, _entero(query, "pagina", 1))
+                por_pagina = min(POR_PAGINA_MAX, max(1, _entero(query, "por_pagina", POR_PAGINA_DEFECTO)))
+                return 200, await self._leer(self.almacen.listar, nombre, pagina, por_pagina)
+            if metodo == "POST":
+                if nombre == "facturadet" and self.libro is not None:
+                    return 201, await self._agregar_linea_factura(datos)
+                return 201, await self._escribir(self.almacen.agregar, nombre, datos)
+        else:
+            nombre, id_valor = partes[1], partes[2]
+            if metodo == "GET":
+                return 200, await self._leer(self.almacen.obtener, nombre, id_valor)
+            if metodo == "PUT":
+                return 200, await self._escribir(self.almacen.modificar, nombre, id_valor, datos)
+            if metodo == "DELETE":
+                return 200, await self._escribir(self.almacen.vaciar, nombre, id_valor)
+        raise ErrorAPI(405, f"Método {metodo} no permitido en {url.path}")
+
+    async def atender(self, reader, writer):
+        """Atiende una conexión HTTP/1.1 con keep-alive."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    clave, _, valor = h.decode("latin-1").partition(":")
+                    headers[clave.strip().lower()] = valor.strip()
+                largo = int(headers.get("content-length", 0) or 0)
+                cuerpo = await reader.readexactly(largo) if largo else b""
+
+                try:
+                    status, payload = await self.despachar(metodo.upper(), ruta, cuerpo)
+                except ErrorAPI as e:
+                    status, payload = e.status, _a_json({"error": e.mensaje})
+                except Exception as e:
+                    status, payload = 500, _a_json({"error": str(e)})
+
+                cerrar = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                writer.write(
+                    f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def servir(host, puerto):
+    tablas = p1.cargar_tablas()
+    libro = LibroStock(tablas.get("productos", []), p1.CARPETA)
+    almacen = AlmacenTablas(tablas, libro)
+    libro.iniciar_volcado_periodico()
+    api = ServidorAPI(almacen, libro)
+    server = await asyncio.start_server(api.atender, host, puerto)
+    print(f" API escuchando en http://{host}:{puerto} (carpeta: {p1.CARPETA})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        libro.detener()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local sobre las tablas de Proyecto1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--carpeta", default=p1.CARPETA, help="carpeta con los CSV (por defecto CARPETA de Proyecto1)")
+    args = parser.parse_args()
+    p1.CARPETA = args.carpeta
+    try:
+        asyncio.run(servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        print(" Servidor detenido.")
@@ -0,0 +1,84 @@
+# para ejecutar : py bench_altas_admin.py --filas 1000000 --altas 200
+"""Altas de a una fila en el administrador web: pd.concat por alta vs buffer de altas.
+
+Parte de una facturadet sintética ya tipada y agrega `--altas` filas de a
+una, como lo hace el formulario "Agregar":
+  - anterior: DataFrame de una fila + astype por columna + pd.concat (copia la tabla)
+  - buffer: TablaAdmin.agregar (escribe en un bloque preasignado)
+Al final consolida la vista del buffer y verifica que sea igual a la anterior.
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def alta_anterior(df, normalized):
+    """Copia del camino "Agregar" original de streamlit_app.py."""
+    new_row = pd.DataFrame([normalized])
+    for col, dtype in df.dtypes.items():
+        try:
+            new_row[col] = new_row[col].astype(dtype)
+        except Exception:
+            pass
+    return pd.concat([df, new_row], ignore_index=True)
+
+
+def filas_formulario(n, inicio):
+    """Filas como las escribe el usuario (texto), una con un campo vacío cada tanto."""
+    for i in range(n):
+        yield {
+            "id_facturaDET": str(inicio + i),
+            "id_facturaENC": str(1 + (inicio + i) // 4),
+            "id_producto": str(1 + i % 499),
+            "cantidad": "" if i % 7 == 0 else str(1 + i % 9),
+            "precio_unitario": "12000.5",
+            "observacion": "" if i % 3 else "alta manual",
+        }
+
+
+def _ms(tiempos):
+    return f"p50 {statistics.median(tiempos) * 1000:8.3f} ms   máx {max(tiempos) * 1000:8.3f} ms"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de altas de a una fila")
+    parser.add_argument("--filas", type=int, default=1000000)
+    parser.add_argument("--altas", type=int, default=200)
+    args = parser.parse_args()
+
+    base = facturadet_sintetica(args.filas)
+    base = admin_tablas.aplicar_tipos(base, admin_tablas.inferir_tipos(base))
+    altas = list(filas_formulario(args.altas, args.filas + 1))
+    print(f"\n facturadet sintética: {args.filas} filas, {args.altas} altas de a una\n")
+
+    df = base.copy()
+    t_anterior = []
+    for valores in altas:
+        normalized = {c: admin_tablas.convertir_valor(v, df.dtypes.get(c)) for c, v in valores.items()}
+        t0 = time.perf_counter()
+        df = alta_anterior(df, normalized)
+        t_anterior.append(time.perf_counter() - t0)
+
+    tabla = admin_tablas.TablaAdmin(base.copy())
+    t_buffer = []
+    for valores in altas:
+        t0 = time.perf_counter()
+        tabla.agregar({c: admin_tablas.convertir_valor(v, tabla.dtypes.get(c)) for c, v in valores.items()})
+        t_buffer.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    consolidada = tabla.df
+    t_consolidar = time.perf_counter() - t0
+
+    assert len(tabla) == len(df) == args.filas + args.altas
+    pd.testing.assert_frame_equal(consolidada, df)
+
+    print(f"  Anterior (pd.concat por alta): {_ms(t_anterior)}   total {sum(t_anterior):7.2f} s")
+    print(f"  Buffer de altas              : {_ms(t_buffer)}   total {sum(t_buffer):7.3f} s")
+    print(f"  Consolidar la vista (1 vez)  : {t_consolidar * 1000:8.1f} ms")
+    print(" ✅ Tabla consolidada igual a la del camino anterior")
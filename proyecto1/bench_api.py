@@ -0,0 +1,101 @@
+# para ejecutar (con api_server.py corriendo): py bench_api.py --conexiones 50 --segundos 10
+"""Prueba de carga para api_server.py.
+
+Abre N conexiones keep-alive y durante un tiempo fijo envía una mezcla de
+lecturas (listado paginado y búsqueda por ID) y escrituras (PUT sobre
+productos). Informa requests/s y latencias p50/p99.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def _request(reader, writer, metodo, ruta, cuerpo=None):
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    writer.write(
+        f"{metodo} {ruta} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(datos)}\r\n\r\n".encode("latin-1") + datos
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    largo = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""):
+            break
+        if h.lower().startswith(b"content-length:"):
+            largo = int(h.split(b":", 1)[1])
+    return status, await reader.readexactly(largo)
+
+
+async def _cliente(host, puerto, fin, ids, tabla, prop_escrituras, latencias, errores):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    rnd = random.Random()
+    try:
+        while time.perf_counter() < fin:
+            r = rnd.random()
+            if r < prop_escrituras:
+                metodo, ruta, cuerpo = "PUT", f"/tablas/{tabla}/{rnd.choice(ids)}", {"stock": rnd.randint(0, 100)}
+            elif r < prop_escrituras + (1 - prop_escrituras) / 2:
+                metodo, ruta, cuerpo = "GET", f"/tablas/{tabla}/{rnd.choice(ids)}", None
+            else:
+                metodo, ruta, cuerpo = "GET", f"/tablas/{tabla}?pagina={rnd.randint(1, 5)}&por_pagina=20", None
+            t0 = time.perf_counter()
+            status, _ = await _request(reader, writer, metodo, ruta, cuerpo)
+            latencias.append(time.perf_counter() - t0)
+            if status >= 400:
+                errores.append(status)
+    finally:
+        writer.close()
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+async def main(args):
+    # IDs reales de la tabla para las búsquedas y modificaciones
+    reader, writer = await asyncio.open_connection(args.host, args.puerto)
+    _, cuerpo = await _request(reader, writer, "GET", f"/tablas/{args.tabla}?pagina=1&por_pagina=1000")
+    writer.close()
+    registros = json.loads(cuerpo)["registros"]
+    if not registros:
+        print(f"❌ La tabla {args.tabla} está vacía en el servidor")
+        return
+    id_field = next(k for k in registros[0] if k.lower().startswith("id"))
+    ids = [r[id_field] for r in registros if r.get(id_field) is not None]
+
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    fin = inicio + args.segundos
+    await asyncio.gather(*[
+        _cliente(args.host, args.puerto, fin, ids, args.tabla, args.escrituras, latencias, errores)
+        for _ in range(args.conexiones)
+    ])
+    duracion = time.perf_counter() - inicio
+
+    print(f"\n{'='*60}")
+    print(f"📈 CARGA: {args.conexiones} conexiones, {args.segundos}s, {args.escrituras:.0%} escrituras")
+    print(f"{'='*60}")
+    print(f"  Requests totales : {len(latencias)}")
+    print(f"  Errores          : {len(errores)}")
+    print(f"  Requests/s       : {len(latencias) / duracion:,.0f}")
+    print(f"  Latencia p50     : {_percentil(latencias, 50) * 1000:.2f} ms")
+    print(f"  Latencia p99     : {_percentil(latencias, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de Proyecto1")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--tabla", default="productos")
+    parser.add_argument("--conexiones", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--escrituras", type=float, default=0.1, help="proporción de PUT (0..1)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+# para ejecutar : py bench_carga_admin.py --filas 1000000
+"""Tiempo de carga del administrador web: algoritmo anterior vs inferencia en una pasada.
+
+Genera una facturadet sintética (con una columna de precio con decimales y
+un comentario de texto) y compara:
+  - anterior: read_csv(dtype=str) + to_numeric/dropna/% 1 por columna
+  - primera carga: inferencia en una pasada (escribe tipos_inferidos.json)
+  - cargas siguientes: read_csv(dtype=...) con los tipos guardados
+También verifica que los tres caminos dan los mismos tipos y valores.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import admin_tablas
+
+
+def carga_anterior(ruta):
+    """Copia del load_tables original de streamlit_app.py (para comparar)."""
+    df = pd.read_csv(ruta, dtype=str).replace({"": pd.NA, "nan": pd.NA})
+    for col in df.columns:
+        if admin_tablas.is_id_field(col):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        else:
+            coerced = pd.to_numeric(df[col], errors="coerce")
+            non_na = coerced.notna().sum()
+            total = len(coerced)
+            if total > 0 and non_na / max(1, total) > 0.6:
+                non_na_vals = coerced.dropna()
+                if (non_na_vals % 1 == 0).all():
+                    df[col] = coerced.astype("Int64")
+                else:
+                    df[col] = coerced.astype("float64")
+            else:
+                df[col] = df[col].astype("string")
+    return df
+
+
+def facturadet_sintetica(n, semilla=42):
+    rnd = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "id_facturaDET": np.arange(1, n + 1),
+        "id_facturaENC": 1 + np.arange(n) // 4,
+        "id_producto": rnd.integers(1, 500, n),
+        "cantidad": rnd.integers(1, 10, n),
+        "precio_unitario": rnd.choice([8500.0, 12000.5, 45000.0, 120000.25], n),
+        "observacion": rnd.choice(["", "entrega parcial", "bonificado", ""], n),
+    })
+
+
+def _tiempo(funcion, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de carga de tablas del administrador web")
+    parser.add_argument("--filas", type=int, default=1000000)
+    args = parser.parse_args()
+
+    carpeta = tempfile.mkdtemp(prefix="bench_carga_")
+    ruta = os.path.join(carpeta, "facturadet.csv")
+    facturadet_sintetica(args.filas).to_csv(ruta, index=False)
+    print(f"\n facturadet sintética: {args.filas} filas, {os.path.getsize(ruta) / 1e6:.1f} MB")
+
+    anterior, t_anterior = _tiempo(lambda: carga_anterior(ruta))
+
+    def primera():
+        cache_ruta = os.path.join(carpeta, admin_tablas.ARCHIVO_TIPOS)
+        if os.path.exists(cache_ruta):
+            os.remove(cache_ruta)
+        return admin_tablas.cargar_tablas_df(carpeta, ["facturadet.csv"])["facturadet"]
+    nueva, t_primera = _tiempo(primera)
+    admin_tablas.cargar_tablas_df(carpeta, ["facturadet.csv"])
+    cacheada, t_cache = _tiempo(lambda: admin_tablas.cargar_tablas_df(carpeta, ["facturadet.csv"])["facturadet"])
+
+    for nombre, df in (("primera carga", nueva), ("con tipos guardados", cacheada)):
+        assert dict(df.dtypes.astype(str)) == dict(anterior.dtypes.astype(str)), f"tipos distintos en {nombre}"
+        pd.testing.assert_frame_equal(df, anterior, check_dtype=False)
+
+    print(f" Tipos: {dict(anterior.dtypes.astype(str))}\n")
+    print(f"  Anterior (texto + to_numeric por columna): {t_anterior:7.2f} s")
+    print(f"  Primera carga (inferencia en una pasada) : {t_primera:7.2f} s  ({t_anterior / t_primera:.1f}x)")
+    print(f"  Con tipos guardados (read_csv dtype=...) : {t_cache:7.2f} s  ({t_anterior / t_cache:.1f}x)")
+    shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,76 @@
+# para ejecutar : py bench_edicion_admin.py --filas 1000000 --ediciones 200
+"""Editar muchas celdas en el administrador web: formulario fila por fila vs grilla en lote.
+
+  - anterior: por cada fila, el formulario "Modificar" (convertir cada campo + .at por celda)
+    y un rerun completo de la página por envío
+  - grilla: una página editada, diferencias() valida por columna y modificar_lote aplica todo
+Verifica que las dos tablas terminan iguales.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def modificar_anterior(df, idx, newvals):
+    """Copia del submit de "Modificar" original de streamlit_app.py."""
+    for c, s in newvals.items():
+        if s == "" or s is None:
+            df.at[idx, c] = pd.NA
+        else:
+            col_dtype = df.dtypes.get(c)
+            if pd.api.types.is_integer_dtype(col_dtype):
+                try:
+                    df.at[idx, c] = int(s)
+                except Exception:
+                    df.at[idx, c] = pd.NA
+            elif pd.api.types.is_float_dtype(col_dtype):
+                try:
+                    df.at[idx, c] = float(s)
+                except Exception:
+                    df.at[idx, c] = pd.NA
+            else:
+                df.at[idx, c] = s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de edición en lote")
+    parser.add_argument("--filas", type=int, default=1000000)
+    parser.add_argument("--ediciones", type=int, default=200)
+    args = parser.parse_args()
+
+    df = facturadet_sintetica(args.filas)
+    df = admin_tablas.aplicar_tipos(df, admin_tablas.inferir_tipos(df))
+    filas = np.arange(args.ediciones) * 3
+    precios = np.round(np.linspace(1000, 5000, args.ediciones), 2)
+
+    anterior = df.copy()
+    t0 = time.perf_counter()
+    for idx, precio in zip(filas, precios):
+        # el formulario manda todos los campos de la fila como texto
+        row = anterior.loc[idx]
+        newvals = {c: ("" if pd.isna(row[c]) else str(row[c])) for c in anterior.columns}
+        newvals["precio_unitario"] = str(precio)
+        modificar_anterior(anterior, idx, newvals)
+    t_anterior = time.perf_counter() - t0
+
+    tabla = admin_tablas.TablaAdmin(df.copy())
+    t0 = time.perf_counter()
+    ventana = tabla.filas(filas)
+    editado = ventana.copy()
+    editado["precio_unitario"] = precios
+    cambios, errores = admin_tablas.diferencias(ventana, editado, tabla.dtypes)
+    tabla.modificar_lote(cambios)
+    t_lote = time.perf_counter() - t0
+
+    assert not errores and len(cambios) == args.ediciones
+    pd.testing.assert_frame_equal(tabla.df, anterior)
+
+    print(f"\n facturadet sintética: {args.filas} filas, {args.ediciones} precios editados\n")
+    print(f"  Formulario fila por fila: {t_anterior * 1000:8.1f} ms + {args.ediciones} reruns de la página")
+    print(f"  Grilla en lote          : {t_lote * 1000:8.1f} ms + 1 rerun")
+    print(" ✅ Misma tabla final")
@@ -0,0 +1,66 @@
+# para ejecutar : py bench_filtros_admin.py --filas 1000000
+"""Filtros del administrador web: máscara booleana por rerun vs índices por columna.
+
+Para cada filtro mide la máscara sobre la tabla completa (lo que costaría
+filtrar en cada rerun), la primera consulta con índice (incluye armarlo) y
+las siguientes (índice cacheado para la versión de la tabla). Verifica que
+ambos caminos devuelven las mismas filas.
+"""
+import argparse
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def _mejor(funcion, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de filtros con índices")
+    parser.add_argument("--filas", type=int, default=1000000)
+    args = parser.parse_args()
+
+    df = facturadet_sintetica(args.filas)
+    df = admin_tablas.aplicar_tipos(df, admin_tablas.inferir_tipos(df))
+    consultas = [
+        ("id_producto = 77", ("id_producto", "iguales", 77), lambda d: d["id_producto"] == 77),
+        ("id_facturaENC entre 1000 y 1100", ("id_facturaENC", "rango", 1000, 1100),
+         lambda d: d["id_facturaENC"].between(1000, 1100)),
+        ("precio_unitario >= 45000", ("precio_unitario", "rango", 45000.0, None),
+         lambda d: d["precio_unitario"] >= 45000),
+        ("observacion contiene 'parc'", ("observacion", "contiene", "parc"),
+         lambda d: d["observacion"].str.contains("parc", case=False, regex=False, na=False)),
+        ("observacion empieza con 'BONI'", ("observacion", "prefijo", "BONI"),
+         lambda d: d["observacion"].str.lower().str.startswith("boni", na=False)),
+    ]
+
+    filas = []
+    for nombre, filtro, mascara in consultas:
+        tabla = admin_tablas.TablaAdmin(df)
+        esperado, t_mascara = _mejor(lambda: np.flatnonzero(mascara(df).fillna(False).to_numpy(dtype=bool)))
+        t0 = time.perf_counter()
+        primera = tabla.filtrar([filtro])
+        t_primera = time.perf_counter() - t0
+        siguiente, t_siguiente = _mejor(lambda: tabla.filtrar([filtro]))
+        assert np.array_equal(primera, esperado) and np.array_equal(siguiente, esperado), nombre
+        filas.append({
+            "filtro": nombre,
+            "coincidencias": len(esperado),
+            "máscara_ms": round(t_mascara * 1000, 2),
+            "índice_1ra_ms": round(t_primera * 1000, 2),
+            "índice_cacheado_ms": round(t_siguiente * 1000, 3),
+        })
+
+    print(f"\n facturadet sintética: {args.filas} filas\n")
+    print(tabulate(filas, headers="keys", tablefmt="grid"))
+    print(" ✅ Mismas filas con máscara y con índice")
@@ -0,0 +1,63 @@
+# para ejecutar : py bench_grilla_admin.py --tamanos 10000 100000 1000000
+"""Costo de dibujar la grilla del administrador web por rerun, según el tamaño de la tabla.
+
+  - anterior: reset_index de la tabla completa + serialización Arrow (lo que hace st.dataframe)
+  - ventana: TablaAdmin.ventana de una página ordenada + serialización Arrow
+    (con el índice de orden ya calculado, como en los reruns siguientes)
+Se informa tiempo y tamaño del payload; el de la ventana no depende del tamaño de la tabla.
+"""
+import argparse
+import time
+
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+from tabulate import tabulate
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def _mejor(funcion, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la grilla paginada")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--por-pagina", type=int, default=50)
+    parser.add_argument("--orden", default="id_producto")
+    args = parser.parse_args()
+
+    filas = []
+    for n in args.tamanos:
+        df = facturadet_sintetica(n)
+        df = admin_tablas.aplicar_tipos(df, admin_tablas.inferir_tipos(df))
+        tabla = admin_tablas.TablaAdmin(df)
+
+        completo, t_anterior = _mejor(lambda: convert_pandas_df_to_arrow_bytes(
+            df.reset_index(drop=False).rename(columns={"index": "ID"})), 3)
+
+        pagina = tabla.paginas(args.por_pagina) // 2 + 1
+        t0 = time.perf_counter()
+        tabla.indice_orden(args.orden)
+        t_indice = time.perf_counter() - t0
+        pagina_bytes, t_ventana = _mejor(lambda: convert_pandas_df_to_arrow_bytes(
+            tabla.ventana(pagina, args.por_pagina, args.orden).reset_index()))
+
+        esperado = df.sort_values(args.orden, kind="stable").iloc[(pagina - 1) * args.por_pagina:][:args.por_pagina]
+        assert list(tabla.ventana(pagina, args.por_pagina, args.orden).index) == list(esperado.index)
+        filas.append({
+            "filas": n,
+            "anterior_ms": round(t_anterior * 1000, 1),
+            "anterior_KB": round(len(completo) / 1024),
+            "ventana_ms": round(t_ventana * 1000, 2),
+            "ventana_KB": round(len(pagina_bytes) / 1024, 1),
+            "indice_orden_ms (1 vez por versión)": round(t_indice * 1000, 1),
+        })
+
+    print(f"\n Página de {args.por_pagina} filas ordenada por {args.orden}\n")
+    print(tabulate(filas, headers="keys", tablefmt="grid"))
@@ -0,0 +1,124 @@
+# para ejecutar : py bench_guardado_admin.py --filas 1000000
+"""Guardar y exportar en el administrador web: antes vs después.
+
+Usa las tablas reales de la carpeta del proyecto más una facturadet
+sintética de `--filas` filas.
+  - "Guardar todos" después de modificar una celda de clientes:
+    anterior (copia + to_csv de todas las tablas) vs incremental (solo las que cambiaron)
+  - "Exportar tabla a JSON" de facturadet:
+    anterior (where + to_dict + pd.isna/.item por celda) vs exportar_json por columnas
+Verifica que los CSV y el JSON escritos sean idénticos byte a byte.
+"""
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pandas.api.types as pat
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+TABLAS = ["clientes", "localidades", "provincias", "productos", "proveedores", "rubros", "sucursales", "facturaenc"]
+
+
+def save_tables_anterior(tablas, carpeta):
+    """Copia del save_tables original de streamlit_app.py."""
+    for name, df in tablas.items():
+        ruta = os.path.join(carpeta, f"{name}.csv")
+        s = df.copy()
+        for c in s.columns:
+            if pat.is_integer_dtype(s[c].dtype):
+                s[c] = s[c].astype("Int64")
+            if pd.api.types.is_string_dtype(s[c].dtype):
+                s[c] = s[c].fillna("")
+        s.to_csv(ruta, index=False)
+
+
+def export_json_anterior(df, ruta):
+    """Copia del export_json original de streamlit_app.py."""
+    df = df.copy()
+    df = df.where(pd.notnull(df), None)
+    records = []
+    for rec in df.to_dict(orient="records"):
+        clean = {}
+        for k, v in rec.items():
+            if v is None:
+                clean[k] = None
+            else:
+                try:
+                    if pd.isna(v):
+                        clean[k] = None
+                        continue
+                except Exception:
+                    pass
+                if hasattr(v, "item"):
+                    try:
+                        clean[k] = v.item()
+                        continue
+                    except Exception:
+                        pass
+                clean[k] = v
+        records.append(clean)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def _tiempo(funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de guardado y exportación del administrador web")
+    parser.add_argument("--filas", type=int, default=1000000)
+    args = parser.parse_args()
+
+    tablas = admin_tablas.cargar_tablas_df(CARPETA, [f"{t}.csv" for t in TABLAS])
+    det = facturadet_sintetica(args.filas)
+    det.loc[::5, "observacion"] = "con \"comillas\", acentos y\nsalto"
+    tablas["facturadet"] = admin_tablas.aplicar_tipos(det, admin_tablas.inferir_tipos(det))
+
+    antes = tempfile.mkdtemp(prefix="bench_guardado_antes_")
+    despues = tempfile.mkdtemp(prefix="bench_guardado_despues_")
+    almacen = admin_tablas.AlmacenCompartido({k: v.copy() for k, v in tablas.items()})
+    # Estado inicial en disco (como después de cargar)
+    save_tables_anterior(tablas, antes)
+    almacen.guardar(despues)
+
+    # Una modificación en clientes y "Guardar todos"
+    tablas["clientes"].at[0, "nombre"] = "Editado"
+    vista = almacen.sesion()["clientes"]
+    vista.modificar(0, {"nombre": "Editado"})
+    almacen.confirmar({"clientes": vista})
+    _, t_guardar_antes = _tiempo(lambda: save_tables_anterior(tablas, antes))
+    escritas, t_guardar_despues = _tiempo(lambda: almacen.guardar(despues))
+    assert list(escritas) == ["clientes"]
+    for nombre in tablas:
+        assert filecmp.cmp(os.path.join(antes, f"{nombre}.csv"), os.path.join(despues, f"{nombre}.csv"),
+                           shallow=False), nombre
+
+    json_antes = os.path.join(antes, "facturadet.json")
+    json_despues = os.path.join(despues, "facturadet.json")
+    _, t_json_antes = _tiempo(lambda: export_json_anterior(tablas["facturadet"], json_antes))
+    _, t_json_despues = _tiempo(lambda: admin_tablas.exportar_json(almacen.tablas["facturadet"].df, json_despues))
+    assert filecmp.cmp(json_antes, json_despues, shallow=False)
+    for nombre in TABLAS:
+        export_json_anterior(tablas[nombre], json_antes)
+        admin_tablas.exportar_json(almacen.tablas[nombre].df, json_despues)
+        assert filecmp.cmp(json_antes, json_despues, shallow=False), nombre
+
+    print(f"\n Tablas del proyecto + facturadet sintética de {args.filas} filas\n")
+    print(f"  Guardar todos (1 celda cambiada)  anterior: {t_guardar_antes:6.2f} s   "
+          f"incremental: {t_guardar_despues:6.3f} s  ({len(escritas)} tabla)")
+    print(f"  Exportar facturadet a JSON        anterior: {t_json_antes:6.2f} s   "
+          f"por columnas: {t_json_despues:6.2f} s  ({t_json_antes / t_json_despues:.1f}x)")
+    print(" ✅ CSV y JSON idénticos byte a byte")
+    shutil.rmtree(antes, ignore_errors=True)
+    shutil.rmtree(despues, ignore_errors=True)
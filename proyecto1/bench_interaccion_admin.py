@@ -0,0 +1,59 @@
+# para ejecutar : py bench_interaccion_admin.py --tamanos 10000 100000 1000000
+"""Costo de elegir una fila en "Modificar", según el tamaño de la tabla.
+
+  - anterior: selectbox con una opción por fila (list(range(n)) + una etiqueta
+    por opción, como hace st.selectbox) y rerun de toda la página, grilla incluida
+  - ID validado: búsqueda del ID en el índice hash (cacheado por versión) + la
+    fila elegida, dentro del fragmento de operaciones (la grilla no se redibuja)
+"""
+import argparse
+import time
+
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+from tabulate import tabulate
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def _mejor(funcion, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la elección de fila en Modificar")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    filas = []
+    for n in args.tamanos:
+        df = facturadet_sintetica(n)
+        df = admin_tablas.aplicar_tipos(df, admin_tablas.inferir_tipos(df))
+        tabla = admin_tablas.TablaAdmin(df)
+        buscado = n // 2
+
+        def anterior():
+            opciones = list(range(len(tabla)))
+            [str(o) for o in opciones]
+            tabla.fila(opciones[buscado])
+            convert_pandas_df_to_arrow_bytes(tabla.ventana(1, 50).reset_index())
+
+        tabla.indice("id_facturaDET")
+
+        def por_id():
+            posiciones = tabla.indice("id_facturaDET").iguales(buscado + 1)
+            tabla.fila(int(posiciones[0]))
+
+        assert tabla.fila(int(tabla.indice("id_facturaDET").iguales(buscado + 1)[0]))["id_facturaDET"] == buscado + 1
+        filas.append({
+            "filas": n,
+            "selectbox + rerun completo_ms": round(_mejor(anterior) * 1000, 2),
+            "ID validado en fragmento_ms": round(_mejor(por_id) * 1000, 3),
+        })
+
+    print(tabulate(filas, headers="keys", tablefmt="grid"))
@@ -0,0 +1,103 @@
+# para ejecutar : py bench_json.py --filas 200000
+"""Compara el JSON indentado actual contra NDJSON, NDJSON+gzip y NDJSON+zstd.
+
+Usa una tabla facturadet sintética y mide tamaño en disco, tiempo de
+escritura, tiempo de lectura y memoria pico de la lectura (tracemalloc):
+json.load del arreglo completo vs lectura en streaming de formato_json.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+import formato_json
+
+
+def facturadet_sintetica(n, semilla=42):
+    rnd = random.Random(semilla)
+    return [{
+        "id_facturaDET": i,
+        "id_facturaENC": 1 + i // 4,
+        "id_producto": rnd.randint(1, 500),
+        "cantidad": rnd.randint(1, 10),
+        "precio_unitario": rnd.choice([8500, 12000, 45000, 120000, 450000]),
+    } for i in range(1, n + 1)]
+
+
+def _medir_lectura(funcion):
+    """Tiempo sin tracemalloc (lo hace mucho más lento) y memoria pico en una segunda pasada."""
+    t0 = time.perf_counter()
+    n = funcion()
+    segundos = time.perf_counter() - t0
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n, segundos, pico
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tamaño y velocidad de los formatos de la copia JSON")
+    parser.add_argument("--filas", type=int, default=200000)
+    args = parser.parse_args()
+
+    registros = facturadet_sintetica(args.filas)
+    carpeta = tempfile.mkdtemp(prefix="bench_json_")
+    ruta_csv = os.path.join(carpeta, "facturadet.csv")
+    with open(ruta_csv, "w", encoding="utf-8") as f:
+        f.write(",".join(registros[0]) + "\n")
+        for r in registros:
+            f.write(",".join(str(v) for v in r.values()) + "\n")
+    tam_csv = os.path.getsize(ruta_csv)
+
+    formatos = ["json", "ndjson", "ndjson.gz"]
+    try:
+        formato_json._zstd()
+        formatos.append("ndjson.zst")
+    except ImportError:
+        print(" (zstandard no instalado: se omite ndjson.zst)")
+
+    filas = []
+    for formato in formatos:
+        ruta = formato_json.ruta_tabla(carpeta, "facturadet", formato)
+        t0 = time.perf_counter()
+        if formato == "json":
+            # Igual que exportar_tabla_json original
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(registros, f, ensure_ascii=False, indent=2)
+        else:
+            formato_json.escribir(registros, ruta)
+        escritura = time.perf_counter() - t0
+        tam = os.path.getsize(ruta)
+
+        def streaming():
+            return sum(1 for _ in formato_json.iterar_registros(ruta))
+        n, lectura, pico = _medir_lectura(streaming)
+        assert n == args.filas
+        filas.append({
+            "formato": formato,
+            "tamaño_MB": round(tam / 1e6, 2),
+            "x_CSV": round(tam / tam_csv, 2),
+            "escritura_s": round(escritura, 3),
+            "lectura_s": round(lectura, 3),
+            "filas/s": f"{n / lectura:,.0f}",
+            "pico_lectura_MB": round(pico / 1e6, 2),
+        })
+
+    def json_load():
+        with open(formato_json.ruta_tabla(carpeta, "facturadet", "json"), encoding="utf-8") as f:
+            return len(json.load(f))
+    n, lectura, pico = _medir_lectura(json_load)
+    filas.append({"formato": "json (json.load)", "tamaño_MB": filas[0]["tamaño_MB"], "x_CSV": filas[0]["x_CSV"],
+                  "escritura_s": "-", "lectura_s": round(lectura, 3), "filas/s": f"{n / lectura:,.0f}",
+                  "pico_lectura_MB": round(pico / 1e6, 2)})
+
+    print(f"\n facturadet sintética: {args.filas} filas, CSV = {tam_csv / 1e6:.2f} MB\n")
+    print(tabulate(filas, headers="keys", tablefmt="grid"))
+    shutil.rmtree(carpeta, ignore_errors=True)
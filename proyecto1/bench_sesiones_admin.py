@@ -0,0 +1,76 @@
+# para ejecutar : py bench_sesiones_admin.py --filas 1000000 --sesiones 10
+"""Memoria del administrador web con varias sesiones abiertas.
+
+  - anterior: cada sesión guarda su propia copia de la tabla en session_state
+  - almacén compartido: una copia por proceso + los cambios de cada sesión
+Cada sesión hace unas altas y modificaciones. También verifica que los
+cambios de una sesión no se vean en otra hasta confirmarlos.
+"""
+import argparse
+import tracemalloc
+
+import pandas as pd
+
+import admin_tablas
+from bench_carga_admin import facturadet_sintetica
+
+
+def _editar(vista, n):
+    for i in range(n):
+        vista.agregar({"id_facturaDET": 10 ** 8 + i, "cantidad": i, "observacion": "sesión"})
+        vista.modificar(i, {"cantidad": 99})
+
+
+def _memoria(funcion):
+    tracemalloc.start()
+    resultado = funcion()
+    usada = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, usada
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria por sesión del administrador web")
+    parser.add_argument("--filas", type=int, default=1000000)
+    parser.add_argument("--sesiones", type=int, default=10)
+    parser.add_argument("--ediciones", type=int, default=20)
+    args = parser.parse_args()
+
+    df = facturadet_sintetica(args.filas)
+    df = admin_tablas.aplicar_tipos(df, admin_tablas.inferir_tipos(df))
+    tam_tabla = df.memory_usage(deep=True).sum()
+
+    def anterior():
+        sesiones = [{"facturadet": admin_tablas.TablaAdmin(df.copy(deep=True))} for _ in range(args.sesiones)]
+        for s in sesiones:
+            _editar(s["facturadet"], args.ediciones)
+        return sesiones
+
+    def compartido():
+        almacen = admin_tablas.AlmacenCompartido({"facturadet": df.copy(deep=True)})
+        sesiones = [almacen.sesion() for _ in range(args.sesiones)]
+        for s in sesiones:
+            _editar(s["facturadet"], args.ediciones)
+        return almacen, sesiones
+
+    _, mem_anterior = _memoria(anterior)
+    (almacen, sesiones), mem_compartido = _memoria(compartido)
+
+    # Aislamiento entre sesiones y confirmación
+    a, b = sesiones[0]["facturadet"], sesiones[1]["facturadet"]
+    assert a.fila(0)["cantidad"] == 99 and len(a) == args.filas + args.ediciones
+    assert almacen.tablas["facturadet"].fila(0)["cantidad"] == df.at[0, "cantidad"]
+    b.descartar()
+    assert b.fila(0)["cantidad"] == df.at[0, "cantidad"] and len(b) == args.filas
+    vista_a = a.ventana(1, 50, "cantidad", ascendente=False)
+    assert (vista_a["cantidad"].head(args.ediciones) == 99).all()
+    esperado = a.df
+    almacen.confirmar({"facturadet": a})
+    assert a.pendientes == 0 and len(b) == args.filas + args.ediciones
+    pd.testing.assert_frame_equal(b.df, esperado)
+
+    print(f"\n facturadet sintética: {args.filas} filas ({tam_tabla / 1e6:.0f} MB), "
+          f"{args.sesiones} sesiones con {args.ediciones} altas y {args.ediciones} modificaciones cada una\n")
+    print(f"  Copia por sesión   : {mem_anterior / 1e6:8.1f} MB")
+    print(f"  Almacén compartido : {mem_compartido / 1e6:8.1f} MB")
+    print(" ✅ Cambios aislados por sesión hasta confirmar")
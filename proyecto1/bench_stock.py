@@ -0,0 +1,91 @@
+# para ejecutar : py bench_stock.py --hilos 16 --pedidos 20000
+"""Benchmark del libro de stock con muchos hilos y productos superpuestos.
+
+Cada hilo arma pedidos de 1 a 4 líneas sobre un conjunto chico de productos
+"calientes" (para forzar contención) y reserva/confirma todas las líneas o
+ninguna. Al final verifica que el stock nunca quedó negativo y que coincide
+con lo confirmado. Compara contra un único lock global para todo el stock.
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+
+from stock import LibroStock, StockInsuficiente
+
+
+class LibroStockLockGlobal(LibroStock):
+    """Referencia: todos los contadores comparten el mismo lock."""
+
+    def __init__(self, productos, carpeta=None):
+        super().__init__(productos, carpeta)
+        compartido = threading.Lock()
+        for contador in self.contadores.values():
+            contador.lock = compartido
+
+
+def _productos(n, stock_inicial):
+    return [{"id_producto": i, "descripcion": f"Producto {i}", "stock": stock_inicial} for i in range(1, n + 1)]
+
+
+def correr(clase, args):
+    productos = _productos(args.productos, args.stock)
+    carpeta = tempfile.mkdtemp(prefix="bench_stock_")
+    libro = clase(productos, carpeta)
+    libro.iniciar_volcado_periodico(intervalo=0.5)
+    confirmados = [0] * args.productos
+    rechazados = [0]
+    lock_totales = threading.Lock()
+    por_hilo = args.pedidos // args.hilos
+
+    def trabajador(semilla):
+        rnd = random.Random(semilla)
+        locales = [0] * args.productos
+        sin_stock = 0
+        for _ in range(por_hilo):
+            ids = rnd.sample(range(1, args.productos + 1), rnd.randint(1, min(4, args.productos)))
+            lineas = [(i, rnd.randint(1, 3)) for i in ids]
+            try:
+                reservas = libro.reservar_lineas(lineas, referencia=f"hilo {semilla}")
+            except StockInsuficiente:
+                sin_stock += 1
+                continue
+            for r in reservas:
+                libro.confirmar(r)
+                locales[r.id_producto - 1] += r.cantidad
+        with lock_totales:
+            for i, c in enumerate(locales):
+                confirmados[i] += c
+            rechazados[0] += sin_stock
+
+    hilos = [threading.Thread(target=trabajador, args=(s,)) for s in range(args.hilos)]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    duracion = time.perf_counter() - t0
+    libro.detener()
+
+    for i, registro in enumerate(productos):
+        esperado = args.stock - confirmados[i]
+        assert registro["stock"] == esperado >= 0, f"Stock inconsistente en producto {i + 1}"
+    return por_hilo * args.hilos, rechazados[0], duracion
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de reservas de stock concurrentes")
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--pedidos", type=int, default=20000)
+    parser.add_argument("--productos", type=int, default=20)
+    parser.add_argument("--stock", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"📦 STOCK: {args.hilos} hilos, {args.pedidos} pedidos, {args.productos} productos")
+    print(f"{'='*60}")
+    for nombre, clase in (("Lock por producto", LibroStock), ("Lock global", LibroStockLockGlobal)):
+        total, rechazados, duracion = correr(clase, args)
+        print(f"  {nombre:18}: {total / duracion:10,.0f} pedidos/s  "
+              f"({rechazados} rechazados por stock, invariantes OK)")
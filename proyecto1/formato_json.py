@@ -0,0 +1,160 @@
+"""Formatos compactos para la copia JSON de las tablas.
+
+- "json"        arreglo con indent=2 (formato original)
+- "ndjson"      un registro por línea
+- "ndjson.gz"   NDJSON comprimido con gzip
+- "ndjson.zst"  NDJSON comprimido con zstd (requiere `pip install zstandard`)
+
+La lectura es siempre en streaming (un registro a la vez), también para el
+arreglo JSON clásico, así el parser no necesita tener el archivo entero en
+memoria.
+"""
+import gzip
+import io
+import json
+import os
+
+FORMATOS = {
+    "json": ".json",
+    "ndjson": ".ndjson",
+    "ndjson.gz": ".ndjson.gz",
+    "ndjson.zst": ".ndjson.zst",
+}
+# Desempate al cargar si dos copias tienen la misma fecha: primero los compactos
+PREFERENCIA_LECTURA = ("ndjson.zst", "ndjson.gz", "ndjson", "json")
+TAM_BLOQUE = 64 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("El formato ndjson.zst requiere la librería 'zstandard' (pip install zstandard)")
+    return zstandard
+
+
+def ruta_tabla(carpeta, nombre, formato):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (opciones: {', '.join(FORMATOS)})")
+    return os.path.join(carpeta, f"{nombre}{FORMATOS[formato]}")
+
+
+def formato_de_ruta(ruta):
+    for formato in sorted(FORMATOS, key=lambda f: -len(FORMATOS[f])):
+        if ruta.endswith(FORMATOS[formato]):
+            return formato
+    raise ValueError(f"Extensión no reconocida: {ruta}")
+
+
+def buscar_archivo(carpeta, nombre):
+    """Ruta de la copia JSON más reciente (por fecha de modificación) de la tabla, o None.
+
+    Si se cambió FORMATO_JSON pueden quedar copias en varios formatos; la
+    vieja no debe ganarle a la última exportada.
+    """
+    existentes = [ruta_tabla(carpeta, nombre, f) for f in PREFERENCIA_LECTURA]
+    existentes = [r for r in existentes if os.path.exists(r)]
+    if not existentes:
+        return None
+    # max se queda con el primero entre iguales: a igual fecha decide PREFERENCIA_LECTURA
+    return max(existentes, key=os.path.getmtime)
+
+
+def _abrir_texto(ruta, modo, formato=None):
+    """Abre en modo texto ('r' o 'w') con la compresión del formato (o de la extensión)."""
+    formato = formato or formato_de_ruta(ruta)
+    if formato.endswith(".gz"):
+        return gzip.open(ruta, modo + "t", encoding="utf-8", compresslevel=6)
+    if formato.endswith(".zst"):
+        zstd = _zstd()
+        if modo == "w":
+            crudo = zstd.ZstdCompressor(level=3).stream_writer(open(ruta, "wb"), closefd=True)
+        else:
+            crudo = zstd.ZstdDecompressor().stream_reader(open(ruta, "rb"), closefd=True)
+        return io.TextIOWrapper(crudo, encoding="utf-8")
+    return open(ruta, modo, encoding="utf-8")
+
+
+def escribir(registros, ruta, limpiar=None):
+    """Escribe los registros en el formato indicado por la extensión de `ruta`.
+
+    `limpiar` convierte cada valor a algo serializable (ej. sanitize_val de
+    Proyecto1). Escribe en un temporal y lo renombra al final.
+    """
+    formato = formato_de_ruta(ruta)
+    temporal = ruta + ".tmp"
+    with _abrir_texto(temporal, "w", formato) as f:
+        if formato == "json":
+            datos = [{k: limpiar(v) for k, v in r.items()} if limpiar else r for r in registros]
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        else:
+            for r in registros:
+                if limpiar:
+                    r = {k: limpiar(v) for k, v in r.items()}
+                f.write(json.dumps(r, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+    os.replace(temporal, ruta)
+
+
+def _iterar_arreglo(f):
+    """Itera los elementos de un arreglo JSON leyendo el archivo por bloques."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    # Avanzar hasta el '['
+    while True:
+        bloque = f.read(TAM_BLOQUE)
+        if not bloque:
+            return
+        buffer += bloque
+        inicio = buffer.find("[")
+        if inicio >= 0:
+            pos = inicio + 1
+            break
+        buffer = ""
+    fin_archivo = False
+    while True:
+        # Saltar espacios y separadores
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            obj, fin = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if fin_archivo:
+                raise
+            bloque = f.read(TAM_BLOQUE)
+            fin_archivo = not bloque
+            buffer = buffer[pos:] + bloque
+            pos = 0
+            continue
+        yield obj
+        pos = fin
+        if pos > TAM_BLOQUE:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iterar_registros(ruta):
+    """Genera los registros del archivo uno por uno (memoria constante)."""
+    formato = formato_de_ruta(ruta)
+    with _abrir_texto(ruta, "r", formato) as f:
+        if formato == "json":
+            yield from _iterar_arreglo(f)
+        else:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+
+
+def iterar_bloques(ruta, tam=50000):
+    """Igual que iterar_registros pero en listas de hasta `tam` registros (para armar DataFrames)."""
+    bloque = []
+    for r in iterar_registros(ruta):
+        bloque.append(r)
+        if len(bloque) >= tam:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
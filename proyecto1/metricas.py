@@ -0,0 +1,192 @@
+# resumen : py metricas.py   (o py metricas.py --archivo otra_ruta\metricas.jsonl)
+"""Instrumentación liviana de operaciones (tiempo, filas y memoria pico).
+
+Se activa con variables de entorno; desactivada no agrega costo: `medir`
+devuelve la función original sin envolver y `bloque` devuelve siempre el
+mismo context manager vacío.
+
+    PROYECTO1_METRICAS=1           activa el registro
+    PROYECTO1_METRICAS_MEMORIA=1   agrega memoria pico con tracemalloc (más lento)
+    PROYECTO1_METRICAS_ARCHIVO     ruta del archivo (por defecto metricas.jsonl junto a este módulo)
+
+Cada operación es una línea JSON en un archivo rotativo (5 MB x 3 copias).
+`python metricas.py` muestra p50/p95 por operación.
+"""
+import argparse
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+
+ACTIVO = os.environ.get("PROYECTO1_METRICAS", "") not in ("", "0")
+MEMORIA = ACTIVO and os.environ.get("PROYECTO1_METRICAS_MEMORIA", "") not in ("", "0")
+ARCHIVO = os.environ.get("PROYECTO1_METRICAS_ARCHIVO",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "metricas.jsonl"))
+MAX_BYTES = 5 * 1024 * 1024
+COPIAS = 3
+
+_NULO = contextlib.nullcontext()
+_logger = None
+# Mediciones en curso del hilo o tarea asyncio actual (la última es la más interna)
+_pila = contextvars.ContextVar("metricas_pila", default=())
+# Mediciones en curso de todos los hilos: reset_peak es global y borra el pico de todas
+_abiertas = set()
+_lock_abiertas = threading.Lock()
+
+
+def _registro():
+    global _logger
+    if _logger is None:
+        _logger = logging.getLogger("proyecto1.metricas")
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(ARCHIVO, maxBytes=MAX_BYTES, backupCount=COPIAS,
+                                                       encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+        if MEMORIA and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    return _logger
+
+
+class Medicion:
+    """Mide un bloque; `filas` puede asignarse dentro del bloque.
+
+    El pico de un bloque anidado se suma solo al bloque que lo contiene en el
+    mismo hilo (o tarea asyncio). tracemalloc mide todo el proceso: con hilos
+    concurrentes el pico incluye lo que asignan los otros mientras está abierto.
+    """
+
+    def __init__(self, operacion, filas=None, **extra):
+        self.operacion = operacion
+        self.filas = filas
+        self.extra = extra
+
+    def __enter__(self):
+        _registro()
+        if MEMORIA:
+            with _lock_abiertas:
+                # reset_peak borra el pico de los bloques abiertos (de cualquier hilo): se guarda antes
+                pico = tracemalloc.get_traced_memory()[1]
+                for abierta in _abiertas:
+                    abierta._pico = max(abierta._pico, pico)
+                tracemalloc.reset_peak()
+                self._mem_inicio, self._pico = tracemalloc.get_traced_memory()
+                _abiertas.add(self)
+            pila = _pila.get()
+            self._padre = pila[-1] if pila else None
+            self._token = _pila.set(pila + (self,))
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        segundos = time.perf_counter() - self._t0
+        datos = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "operacion": self.operacion,
+                 "segundos": round(segundos, 6), "filas": self.filas}
+        if MEMORIA:
+            # Pico desde el inicio del bloque, incluidos los bloques anidados
+            with _lock_abiertas:
+                pico = max(self._pico, tracemalloc.get_traced_memory()[1])
+                _abiertas.discard(self)
+                if self._padre is not None:
+                    self._padre._pico = max(self._padre._pico, pico)
+            _pila.reset(self._token)
+            datos["memoria_pico_kb"] = round((pico - self._mem_inicio) / 1024, 1)
+        if tipo is not None:
+            datos["error"] = tipo.__name__
+        datos.update(self.extra)
+        _registro().info(json.dumps(datos, ensure_ascii=False, default=str))
+        return False
+
+
+def bloque(operacion, filas=None, **extra):
+    """Context manager para medir un tramo de código: `with bloque("menu.agregar") as m:`."""
+    if not ACTIVO:
+        return _NULO
+    return Medicion(operacion, filas, **extra)
+
+
+def medir(operacion, filas=None):
+    """Decorador. `filas(resultado, args, kwargs)` devuelve las filas tocadas por la llamada."""
+    def decorador(funcion):
+        if not ACTIVO:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with Medicion(operacion) as m:
+                resultado = funcion(*args, **kwargs)
+                if filas is not None:
+                    try:
+                        m.filas = filas(resultado, args, kwargs)
+                    except Exception:
+                        pass
+            return resultado
+        return envoltura
+    return decorador
+
+
+# Contadores de filas reutilizables
+def filas_del_resultado(resultado, args, kwargs):
+    return sum(len(t) for t in resultado.values()) if isinstance(resultado, dict) else len(resultado)
+
+
+def filas_primer_argumento(resultado, args, kwargs):
+    primero = args[0]
+    return sum(len(t) for t in primero.values()) if isinstance(primero, dict) else len(primero)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+def resumen(archivo=ARCHIVO):
+    """Lee el archivo y sus copias rotadas y devuelve estadísticas por operación."""
+    por_operacion = {}
+    for ruta in [f"{archivo}.{i}" for i in range(COPIAS, 0, -1)] + [archivo]:
+        if not os.path.exists(ruta):
+            continue
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    d = json.loads(linea)
+                except ValueError:
+                    continue
+                por_operacion.setdefault(d["operacion"], []).append(d)
+
+    filas = []
+    for operacion, datos in sorted(por_operacion.items()):
+        tiempos = [d["segundos"] for d in datos]
+        n_filas = [d["filas"] for d in datos if isinstance(d.get("filas"), (int, float))]
+        memoria = [d["memoria_pico_kb"] for d in datos if "memoria_pico_kb" in d]
+        filas.append({
+            "operacion": operacion,
+            "llamadas": len(datos),
+            "p50_ms": round(_percentil(tiempos, 50) * 1000, 2),
+            "p95_ms": round(_percentil(tiempos, 95) * 1000, 2),
+            "total_s": round(sum(tiempos), 3),
+            "filas_prom": round(sum(n_filas) / len(n_filas), 1) if n_filas else "-",
+            "memoria_pico_kb": max(memoria) if memoria else "-",
+        })
+    return filas
+
+
+if __name__ == "__main__":
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="Resumen de métricas por operación (p50/p95)")
+    parser.add_argument("--archivo", default=ARCHIVO)
+    args = parser.parse_args()
+    filas = resumen(args.archivo)
+    if not filas:
+        print(f"❌ No hay métricas en {args.archivo} (¿PROYECTO1_METRICAS=1?)")
+    else:
+        print(tabulate(filas, headers="keys", tablefmt="grid"))
@@ -0,0 +1,235 @@
+# para migrar : py particiones.py --migrar --carpeta "d:\Desarrollo de sistemas\bd-ejercicio\proyecto1"
+"""Almacenamiento particionado por mes de facturaenc, facturadet y ventas.
+
+Estructura en disco (dentro de CARPETA):
+
+    particiones/facturaenc/2025-03.csv
+    particiones/facturadet/2025-03.csv   <- líneas de las facturas de 2025-03
+    particiones/ventas/2025-03.csv
+
+El mes lo define `facturaenc.fecha`; las filas de facturadet y ventas van a
+la partición de su encabezado (por id_facturaENC). Las filas sin fecha válida
+o sin encabezado conocido van a la partición `sin_fecha`.
+
+La carga admite un rango de fechas y solo lee los archivos de los meses del
+rango. Al guardar se compara la huella de cada partición con la de la carga
+y solo se reescriben las particiones que cambiaron. Una carga con rango es
+para consultas y no debe guardarse: los IDs nuevos se calculan sobre las
+filas cargadas, y si una fila cae en un mes existente que no se cargó el
+guardado se rechaza (ParticionNoCargada) en lugar de pisar ese archivo.
+"""
+import argparse
+import hashlib
+import os
+
+import pandas as pd
+
+TABLAS_PARTICIONADAS = ("facturaenc", "facturadet", "ventas")
+CARPETA_PARTICIONES = "particiones"
+CLAVE_FACTURA = "id_facturaENC"
+CAMPO_FECHA = "fecha"
+SIN_FECHA = "sin_fecha"
+
+# Huellas {(carpeta, tabla, partición): hash} de lo último leído/escrito
+_huellas = {}
+# Particiones presentes en la última carga {(carpeta, tabla): {partición, ...}}
+_cargadas = {}
+
+
+class ParticionNoCargada(Exception):
+    """Se intentó reescribir un mes que existe en disco pero no estaba en la carga."""
+
+    def __init__(self, rutas):
+        super().__init__("Hay filas en meses que no se cargaron (carga con rango): "
+                         + ", ".join(rutas) + ". Cargue sin rango para guardar.")
+        self.rutas = rutas
+
+
+def hay_particiones(carpeta):
+    return os.path.isdir(os.path.join(carpeta, CARPETA_PARTICIONES, TABLAS_PARTICIONADAS[0]))
+
+
+def particion_de_fecha(fecha):
+    """'2025-03-21' -> '2025-03'; valores no interpretables -> 'sin_fecha'."""
+    ts = pd.to_datetime(fecha, errors="coerce")
+    if pd.isna(ts):
+        return SIN_FECHA
+    return f"{ts.year:04d}-{ts.month:02d}"
+
+
+def _ruta(carpeta, tabla, particion):
+    return os.path.join(carpeta, CARPETA_PARTICIONES, tabla, f"{particion}.csv")
+
+
+def _clave_factura(valor):
+    try:
+        f = float(valor)
+        return int(f) if f.is_integer() else f
+    except (TypeError, ValueError):
+        return None
+
+
+def _en_rango(particion, desde, hasta):
+    if particion == SIN_FECHA:
+        return desde is None and hasta is None
+    if desde is not None and particion < particion_de_fecha(desde):
+        return False
+    if hasta is not None and particion > particion_de_fecha(hasta):
+        return False
+    return True
+
+
+def listar_particiones(carpeta, tabla, desde=None, hasta=None):
+    """Nombres de partición existentes para `tabla` que caen en el rango."""
+    directorio = os.path.join(carpeta, CARPETA_PARTICIONES, tabla)
+    if not os.path.isdir(directorio):
+        return []
+    nombres = sorted(os.path.splitext(f)[0] for f in os.listdir(directorio) if f.endswith(".csv"))
+    return [p for p in nombres if _en_rango(p, desde, hasta)]
+
+
+def _huella(registros):
+    if not registros:
+        return "vacia"
+    df = pd.DataFrame(registros)
+    h = hashlib.md5(",".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def agrupar(tablas):
+    """Devuelve {tabla: {partición: [registros]}} para las tablas particionadas."""
+    encabezados = tablas.get("facturaenc", [])
+    mes_factura = {}
+    grupos = {t: {} for t in TABLAS_PARTICIONADAS}
+    for registro in encabezados:
+        particion = particion_de_fecha(registro.get(CAMPO_FECHA))
+        mes_factura[_clave_factura(registro.get(CLAVE_FACTURA))] = particion
+        grupos["facturaenc"].setdefault(particion, []).append(registro)
+    for tabla in ("facturadet", "ventas"):
+        for registro in tablas.get(tabla, []):
+            particion = mes_factura.get(_clave_factura(registro.get(CLAVE_FACTURA)), SIN_FECHA)
+            grupos[tabla].setdefault(particion, []).append(registro)
+    return grupos
+
+
+def cargar_particiones(carpeta, desde=None, hasta=None):
+    """Lee solo las particiones del rango y las presenta como una tabla lógica por nombre.
+
+    Con `desde`/`hasta` el resultado es solo para consulta: guardar_particiones
+    rechaza escribir meses que existen en disco y quedaron fuera del rango.
+    """
+    tablas = {}
+    for tabla in TABLAS_PARTICIONADAS:
+        registros = []
+        cargadas = set()
+        for particion in listar_particiones(carpeta, tabla, desde, hasta):
+            ruta = _ruta(carpeta, tabla, particion)
+            try:
+                parte = pd.read_csv(ruta).to_dict(orient="records")
+            except pd.errors.EmptyDataError:
+                parte = []
+            except Exception as e:
+                print(f" Error leyendo {ruta}: {e}")
+                continue
+            _huellas[(carpeta, tabla, particion)] = _huella(parte)
+            registros.extend(parte)
+            cargadas.add(particion)
+        tablas[tabla] = registros
+        _cargadas[(carpeta, tabla)] = cargadas
+    return tablas
+
+
+def guardar_particiones(tablas, carpeta, solo=None, reemplazar=False):
+    """Reescribe solo las particiones cuyo contenido cambió desde la última carga.
+
+    `solo` limita las tablas a guardar (ej. ["facturadet"]). Devuelve la lista
+    de rutas escritas. Si alguna fila cae en un mes que existe en disco pero no
+    se cargó (carga con rango) lanza ParticionNoCargada sin escribir nada;
+    `reemplazar=True` (migración) pisa esos archivos.
+    """
+    grupos = {t: p for t, p in agrupar(tablas).items() if solo is None or t in solo}
+    if not reemplazar:
+        ajenas = [_ruta(carpeta, tabla, particion)
+                  for tabla, particiones in grupos.items()
+                  for particion in sorted(particiones)
+                  if particion not in _cargadas.get((carpeta, tabla), set())
+                  and os.path.exists(_ruta(carpeta, tabla, particion))]
+        if ajenas:
+            raise ParticionNoCargada(ajenas)
+    escritas = []
+    for tabla, particiones in grupos.items():
+        # Particiones cargadas que quedaron sin filas (ej. se cambió la fecha de la factura)
+        cargadas = _cargadas.setdefault((carpeta, tabla), set())
+        for particion in sorted(cargadas - set(particiones)):
+            ruta = _ruta(carpeta, tabla, particion)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+                escritas.append(ruta)
+            _huellas.pop((carpeta, tabla, particion), None)
+        cargadas.intersection_update(particiones)
+        for particion, registros in particiones.items():
+            clave = (carpeta, tabla, particion)
+            huella = _huella(registros)
+            if _huellas.get(clave) == huella:
+                continue
+            ruta = _ruta(carpeta, tabla, particion)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            temporal = ruta + ".tmp"
+            pd.DataFrame(registros).to_csv(temporal, index=False)
+            os.replace(temporal, ruta)
+            _huellas[clave] = huella
+            cargadas.add(particion)
+            escritas.append(ruta)
+    return escritas
+
+
+def migrar(carpeta):
+    """Convierte facturaenc/facturadet/ventas.csv completos al formato particionado."""
+    tablas = {}
+    for tabla in TABLAS_PARTICIONADAS:
+        ruta = os.path.join(carpeta, f"{tabla}.csv")
+        tablas[tabla] = pd.read_csv(ruta).to_dict(orient="records") if os.path.exists(ruta) else []
+    escritas = guardar_particiones(tablas, carpeta, reemplazar=True)
+    print(f" {len(escritas)} particiones escritas en {os.path.join(carpeta, CARPETA_PARTICIONES)}")
+
+
+def consultar_facturas(carpeta, desde=None, hasta=None):
+    """Encabezados, líneas y ventas de las facturas con fecha en [desde, hasta].
+
+    Solo lee los meses del rango y después filtra por día exacto.
+    """
+    tablas = cargar_particiones(carpeta, desde, hasta)
+    enc = pd.DataFrame(tablas["facturaenc"])
+    if not enc.empty:
+        fechas = pd.to_datetime(enc[CAMPO_FECHA], errors="coerce")
+        mascara = pd.Series(True, index=enc.index)
+        if desde is not None:
+            mascara &= fechas >= pd.Timestamp(desde)
+        if hasta is not None:
+            mascara &= fechas <= pd.Timestamp(hasta)
+        enc = enc[mascara]
+    resultado = {"facturaenc": enc}
+    ids = set(enc[CLAVE_FACTURA]) if not enc.empty else set()
+    for tabla in ("facturadet", "ventas"):
+        df = pd.DataFrame(tablas[tabla])
+        resultado[tabla] = df[df[CLAVE_FACTURA].isin(ids)] if not df.empty else df
+    return resultado
+
+
+if __name__ == "__main__":
+    import Proyecto1 as p1
+
+    parser = argparse.ArgumentParser(description="Particiones mensuales de las tablas de facturas")
+    parser.add_argument("--carpeta", default=p1.CARPETA)
+    parser.add_argument("--migrar", action="store_true", help="crear particiones desde los CSV completos")
+    parser.add_argument("--desde")
+    parser.add_argument("--hasta")
+    args = parser.parse_args()
+    if args.migrar:
+        migrar(args.carpeta)
+    else:
+        r = consultar_facturas(args.carpeta, args.desde, args.hasta)
+        print(f" Particiones leídas: {listar_particiones(args.carpeta, 'facturaenc', args.desde, args.hasta)}")
+        for tabla, df in r.items():
+            print(f"  {tabla:12} {len(df)} registros")
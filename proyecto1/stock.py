@@ -0,0 +1,216 @@
+"""Libro de stock: reserva y descuento de stock por línea de factura.
+
+Cada producto tiene su propio contador con su propio lock, de modo que dos
+facturas sobre productos distintos nunca compiten entre sí. Una línea de
+factura primero *reserva* la cantidad (no puede quedar stock disponible
+negativo) y después *confirma* el descuento o *cancela* la reserva.
+
+Los movimientos se acumulan en memoria por producto y se vuelcan cada
+cierto tiempo a `stock_movimientos.csv` (en CARPETA).
+"""
+import csv
+import itertools
+import os
+import threading
+import time
+from collections import namedtuple
+
+import Proyecto1 as p1
+
+ARCHIVO_MOVIMIENTOS = "stock_movimientos.csv"
+COLUMNAS_MOVIMIENTOS = ["fecha", "id_reserva", "id_producto", "tipo", "cantidad", "stock", "referencia"]
+
+Reserva = namedtuple("Reserva", ["id_reserva", "id_producto", "cantidad"])
+
+
+class StockInsuficiente(Exception):
+    """No hay stock disponible para cubrir la reserva."""
+
+    def __init__(self, id_producto, pedido, disponible):
+        super().__init__(f"Stock insuficiente para producto {id_producto}: pedido {pedido}, disponible {disponible}")
+        self.id_producto = id_producto
+        self.pedido = pedido
+        self.disponible = disponible
+
+
+def _entero(valor):
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ContadorStock:
+    """Stock físico y reservado de un producto, protegido por su propio lock."""
+
+    def __init__(self, id_producto, registro):
+        self.id_producto = id_producto
+        self.registro = registro
+        self.lock = threading.Lock()
+        self.stock = _entero(registro.get("stock"))
+        self.reservado = 0
+        self.reservas = {}
+        self.movimientos = []
+
+    @property
+    def disponible(self):
+        return self.stock - self.reservado
+
+    def _anotar(self, id_reserva, tipo, cantidad, referencia):
+        self.movimientos.append((time.strftime("%Y-%m-%d %H:%M:%S"), id_reserva, self.id_producto,
+                                 tipo, cantidad, self.stock, referencia))
+
+
+class LibroStock:
+    """Contadores atómicos por producto sobre la tabla `productos` (lista de dicts)."""
+
+    def __init__(self, productos, carpeta=None):
+        self.productos = productos
+        self.carpeta = carpeta
+        self.contadores = {}
+        self._secuencia = itertools.count(1)
+        self._lock_volcado = threading.Lock()
+        self._lock_altas = threading.Lock()
+        self._hilo = None
+        self._detener = threading.Event()
+        for registro in productos:
+            self.registrar(registro)
+
+    def _id_field(self):
+        return p1.get_main_id_field(self.productos[0]) if self.productos else None
+
+    def registrar(self, registro):
+        """Crea el contador de un producto (ej. recién agregado); si ya existe lo devuelve."""
+        id_field = self._id_field()
+        clave = p1.normalize_id_value(registro.get(id_field)) if id_field else None
+        if clave is None:
+            return None
+        with self._lock_altas:
+            contador = self.contadores.get(clave)
+            if contador is None:
+                contador = self.contadores[clave] = ContadorStock(clave, registro)
+        return contador
+
+    def _contador(self, id_producto):
+        clave = p1.normalize_id_value(id_producto)
+        contador = self.contadores.get(clave)
+        if contador is None and clave is not None:
+            # Producto agregado a la tabla después de armar el libro (menú o API)
+            id_field = self._id_field()
+            for registro in reversed(self.productos):
+                if p1.normalize_id_value(registro.get(id_field)) == clave:
+                    contador = self.registrar(registro)
+                    break
+        if contador is None:
+            raise KeyError(f"Producto inexistente: {id_producto}")
+        return contador
+
+    def disponible(self, id_producto):
+        contador = self._contador(id_producto)
+        with contador.lock:
+            return contador.disponible
+
+    def reservar(self, id_producto, cantidad, referencia=""):
+        """Reserva `cantidad` unidades; lanza StockInsuficiente si no alcanza."""
+        cantidad = _entero(cantidad)
+        if cantidad <= 0:
+            raise ValueError(f"Cantidad inválida: {cantidad}")
+        contador = self._contador(id_producto)
+        id_reserva = next(self._secuencia)
+        with contador.lock:
+            if contador.disponible < cantidad:
+                raise StockInsuficiente(id_producto, cantidad, contador.disponible)
+            contador.reservado += cantidad
+            contador.reservas[id_reserva] = (cantidad, referencia)
+            contador._anotar(id_reserva, "RESERVA", cantidad, referencia)
+        return Reserva(id_reserva, contador.id_producto, cantidad)
+
+    def confirmar(self, reserva):
+        """Descuenta del stock físico una reserva y actualiza el registro del producto."""
+        contador = self._contador(reserva.id_producto)
+        with contador.lock:
+            cantidad, referencia = contador.reservas.pop(reserva.id_reserva)
+            contador.reservado -= cantidad
+            contador.stock -= cantidad
+            contador.registro["stock"] = contador.stock
+            contador._anotar(reserva.id_reserva, "CONFIRMA", cantidad, referencia)
+
+    def cancelar(self, reserva):
+        contador = self._contador(reserva.id_producto)
+        with contador.lock:
+            pendiente = contador.reservas.pop(reserva.id_reserva, None)
+            if pendiente is None:
+                return
+            cantidad, referencia = pendiente
+            contador.reservado -= cantidad
+            contador._anotar(reserva.id_reserva, "CANCELA", cantidad, referencia)
+
+    def ajustar(self, id_producto, nuevo_stock, referencia="ajuste manual"):
+        """Registra un cambio de stock hecho fuera del libro (ej. (M)odificar o PUT en la API)."""
+        contador = self._contador(id_producto)
+        with contador.lock:
+            nuevo = _entero(nuevo_stock)
+            diferencia = nuevo - contador.stock
+            contador.stock = nuevo
+            if _entero(contador.registro.get("stock")) != nuevo:   # un stock vaciado queda vacío
+                contador.registro["stock"] = nuevo
+            contador._anotar("", "AJUSTE", diferencia, referencia)
+
+    def reservar_lineas(self, lineas, referencia=""):
+        """Reserva todas las líneas [(id_producto, cantidad), ...] o ninguna."""
+        reservas = []
+        try:
+            for id_producto, cantidad in lineas:
+                reservas.append(self.reservar(id_producto, cantidad, referencia))
+        except Exception:
+            for r in reservas:
+                self.cancelar(r)
+            raise
+        return reservas
+
+    # Persistencia
+    def volcar(self):
+        """Agrega al CSV de movimientos lo acumulado desde el último volcado."""
+        pendientes = []
+        for contador in self.contadores.values():
+            with contador.lock:
+                if contador.movimientos:
+                    pendientes.extend(contador.movimientos)
+                    contador.movimientos = []
+        if not pendientes:
+            return 0
+        pendientes.sort(key=lambda m: (m[0], str(m[1])))
+        carpeta = self.carpeta or p1.CARPETA
+        ruta = os.path.join(carpeta, ARCHIVO_MOVIMIENTOS)
+        with self._lock_volcado:
+            nuevo = not os.path.exists(ruta)
+            with open(ruta, "a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if nuevo:
+                    w.writerow(COLUMNAS_MOVIMIENTOS)
+                w.writerows(pendientes)
+        return len(pendientes)
+
+    def iniciar_volcado_periodico(self, intervalo=5.0):
+        """Vuelca los movimientos cada `intervalo` segundos en un hilo daemon."""
+        if self._hilo is not None:
+            return
+
+        def ciclo():
+            while not self._detener.wait(intervalo):
+                try:
+                    self.volcar()
+                except Exception as e:
+                    print(f" Error volcando movimientos de stock: {e}")
+
+        self._detener.clear()
+        self._hilo = threading.Thread(target=ciclo, name="volcado-stock", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el volcado periódico y vuelca lo pendiente."""
+        if self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.volcar()
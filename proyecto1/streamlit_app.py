@@ -2,110 +2,61 @@
 import streamlit as st
 import pandas as pd
 import pandas.api.types as pat
+import numpy as np
 import os
-import json
 import time
 
+import metricas
+import admin_tablas
+
 # Carpeta del proyecto (ajustar si hace falta)
 CARPETA = r"D:\Desarrollo de sistemas\bd-ejercicio\proyecto1"
 CSV_LIST = [
     "clientes.csv", "localidades.csv", "provincias.csv", "productos.csv",
     "proveedores.csv", "rubros.csv", "sucursales.csv",
-    "facturaenc.csv", "d_facturadet.csv", "ventas.csv"
+    "facturaenc.csv", "facturadet.csv", "ventas.csv"
 ]
+# Opciones de tamaño de página de la grilla
+TAMANOS_PAGINA = [25, 50, 100, 250, 500]
+SIN_ORDEN = "(sin orden)"
 
 st.set_page_config(page_title="Administrador CSV", layout="wide")
 
 
-def is_id_field(colname: str) -> bool:
-    n = str(colname).strip().lower()
-    return n == "id" or n.startswith("id_") or n.startswith("id") or n.endswith("_id") or ("_id" in n)
+@metricas.medir("streamlit.load_tables", filas=metricas.filas_del_resultado)
+def load_tables():
+    # Tipos inferidos en una pasada y guardados en tipos_inferidos.json:
+    # las cargas siguientes parsean directo con read_csv(dtype=...)
+    return admin_tablas.cargar_tablas_df(CARPETA, CSV_LIST)
 
 
-@st.cache_data(ttl=60)
-def load_tables():
-    tablas = {}
-    for f in CSV_LIST:
-        ruta = os.path.join(CARPETA, f)
-        key = os.path.splitext(f)[0]
-        if os.path.exists(ruta):
-            try:
-                df = pd.read_csv(ruta, dtype=str).replace({"": pd.NA, "nan": pd.NA})
-                # intentar normalizar columnas
-                for col in df.columns:
-                    if is_id_field(col):
-                        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
-                    else:
-                        coerced = pd.to_numeric(df[col], errors="coerce")
-                        non_na = coerced.notna().sum()
-                        total = len(coerced)
-                        if total > 0 and non_na / max(1, total) > 0.6:
-                            # mayoría numérica -> elegir Int64 o float64
-                            non_na_vals = coerced.dropna()
-                            if (non_na_vals % 1 == 0).all():
-                                df[col] = coerced.astype("Int64")
-                            else:
-                                df[col] = coerced.astype("float64")
-                        else:
-                            df[col] = df[col].astype("string")
-                tablas[key] = df
-            except Exception:
-                tablas[key] = pd.DataFrame()
-        else:
-            tablas[key] = pd.DataFrame()
-    return tablas
+@st.cache_resource
+def shared_store():
+    # Una sola copia de las tablas por proceso, compartida por todas las sesiones
+    return admin_tablas.AlmacenCompartido(load_tables())
 
 
-def save_tables(tablas):
+@metricas.medir("streamlit.save_tables", filas=metricas.filas_del_resultado)
+def save_tables(almacen):
+    # Solo reescribe las tablas que cambiaron desde el último guardado (temporal + rename)
     os.makedirs(CARPETA, exist_ok=True)
-    for name, df in tablas.items():
-        ruta = os.path.join(CARPETA, f"{name}.csv")
-        # convertir tipos pandas a serializables al guardar
-        s = df.copy()
-        for c in s.columns:
-            # Int64 -> convert to floats for CSV missing or to ints where possible
-            if pat.is_integer_dtype(s[c].dtype):
-                s[c] = s[c].astype("Int64")
-            # string dtype -> convert to python str with <NA> -> ""
-            if pd.api.types.is_string_dtype(s[c].dtype):
-                s[c] = s[c].fillna("")
-        s.to_csv(ruta, index=False)
+    return almacen.guardar(CARPETA)
 
 
 def export_json(tablas, name):
-    df = tablas[name].copy()
-    # convertir NA/NaT a None y numpy/pandas tipos a nativos
-    df = df.where(pd.notnull(df), None)
-    records = []
-    for rec in df.to_dict(orient="records"):
-        clean = {}
-        for k, v in rec.items():
-            if v is None:
-                clean[k] = None
-            else:
-                # pandas Int64 are python ints or numpy ints -> convertir
-                try:
-                    if pd.isna(v):
-                        clean[k] = None
-                        continue
-                except Exception:
-                    pass
-                if hasattr(v, "item"):
-                    try:
-                        clean[k] = v.item()
-                        continue
-                    except Exception:
-                        pass
-                clean[k] = v
-        records.append(clean)
-    ruta = os.path.join(CARPETA, f"{name}.json")
-    with open(ruta, "w", encoding="utf-8") as f:
-        json.dump(records, f, ensure_ascii=False, indent=2)
+    # Codificación por columna y escritura por bloques (mismo JSON indentado que antes),
+    # sobre una copia tomada bajo el lock del almacén: otra sesión puede guardar mientras tanto
+    admin_tablas.exportar_json(tablas[name].instantanea(), os.path.join(CARPETA, f"{name}.json"))
 
 
 def safe_rerun():
-    """Intenta forzar rerun; si experimental_rerun no existe usa query params como fallback."""
-    if hasattr(st, "experimental_rerun"):
+    """Fuerza un rerun de toda la página (también desde un fragmento).
+
+    Usa st.rerun; en versiones viejas experimental_rerun y, si no existe, query params.
+    """
+    if hasattr(st, "rerun"):
+        st.rerun()
+    elif hasattr(st, "experimental_rerun"):
         try:
             st.experimental_rerun()
         except Exception:
@@ -114,9 +65,172 @@ def safe_rerun():
         st.experimental_set_query_params(_updated=str(time.time()))
 
 
-# Inicializar tablas en session_state (persistente durante la sesión)
+def filtros_sidebar(tabla, nombre):
+    """Filtros de la tabla en la barra lateral: igualdad/rango en números, contiene/empieza con en texto.
+
+    Devuelve la lista de filtros para TablaAdmin.filtrar (se responden con
+    índices por columna, cacheados por versión de la tabla).
+    """
+    filtros = []
+    with st.sidebar:
+        st.header("Filtros")
+        columnas = st.multiselect("Columnas a filtrar", tabla.columnas, key=f"filtro_cols_{nombre}")
+        for c in columnas:
+            dtype = tabla.dtypes.get(c)
+            clave = f"filtro_{nombre}_{c}"
+            if pat.is_numeric_dtype(dtype) and not pat.is_bool_dtype(dtype):
+                modo = st.radio(c, ["Igual a", "Rango"], horizontal=True, key=f"{clave}_modo")
+                if modo == "Igual a":
+                    valor = admin_tablas.convertir_valor(st.text_input(f"{c} =", key=f"{clave}_igual"), dtype)
+                    if valor is not pd.NA:
+                        filtros.append((c, "iguales", valor))
+                else:
+                    desde = admin_tablas.convertir_valor(st.text_input(f"{c} desde", key=f"{clave}_desde"), dtype)
+                    hasta = admin_tablas.convertir_valor(st.text_input(f"{c} hasta", key=f"{clave}_hasta"), dtype)
+                    if desde is not pd.NA or hasta is not pd.NA:
+                        filtros.append((c, "rango", None if desde is pd.NA else desde,
+                                        None if hasta is pd.NA else hasta))
+            else:
+                modo = st.radio(c, ["Contiene", "Empieza con"], horizontal=True, key=f"{clave}_modo")
+                texto = st.text_input(f"{c} {modo.lower()}", key=f"{clave}_texto")
+                if texto:
+                    filtros.append((c, "contiene" if modo == "Contiene" else "prefijo", texto))
+    return filtros
+
+
+def elegir_fila(etiqueta, tabla, posiciones, key):
+    """Pide el ID real de la fila y lo valida con el índice hash de la columna ID.
+
+    `posiciones` son las filas filtradas (None = sin filtros). Devuelve la
+    posición de la fila, o None si no existe (o no cumple los filtros). No
+    arma una opción por fila: el costo no depende del tamaño de la tabla.
+    """
+    filtrada = posiciones is not None
+    primera = int(posiciones[0]) if filtrada else 0
+    col_id = admin_tablas.columna_id(tabla.columnas)
+    if col_id is None:
+        pos = st.number_input(f"{etiqueta} (fila 0..{len(tabla) - 1})", min_value=0, max_value=len(tabla) - 1,
+                              value=primera, step=1, key=key)
+        encontradas, buscado = np.array([pos]), f"fila {pos}"
+    else:
+        defecto = tabla.fila(primera)[col_id]
+        valor = st.number_input(f"{etiqueta} ({col_id})", value=0 if pd.isna(defecto) else int(defecto),
+                                step=1, key=key)
+        encontradas, buscado = tabla.indice(col_id).iguales(int(valor)), f"{col_id} = {valor}"
+    if filtrada:
+        encontradas = encontradas[np.isin(encontradas, posiciones)]
+    if not len(encontradas):
+        st.warning(f"No hay ninguna fila con {buscado}" + (" que cumpla los filtros." if filtrada else "."))
+        return None
+    if len(encontradas) > 1:
+        st.caption(f"{len(encontradas)} filas con {buscado}: se usa la primera (fila {encontradas[0]}).")
+    return int(encontradas[0])
+
+
+@st.fragment
+def vista_tabla(tabla, nombre, posiciones):
+    """Grilla paginada y su edición en lote. Cambiar de página u orden reejecuta solo este fragmento."""
+    st.subheader(nombre)
+    # Paginado del lado del servidor: solo se copia y se envía la página visible
+    c_tam, c_pag, c_orden, c_dir = st.columns(4)
+    por_pagina = c_tam.selectbox("Filas por página", TAMANOS_PAGINA, index=1, key=f"por_pagina_{nombre}")
+    filtrada = posiciones is not None
+    paginas = tabla.paginas(por_pagina, len(posiciones) if filtrada else None)
+    if st.session_state.get(f"pagina_{nombre}", 1) > paginas:
+        st.session_state[f"pagina_{nombre}"] = paginas
+    pagina = c_pag.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"pagina_{nombre}")
+    orden = c_orden.selectbox("Ordenar por", [SIN_ORDEN] + tabla.columnas, key=f"orden_{nombre}")
+    ascendente = c_dir.radio("Dirección", ["Asc", "Desc"], horizontal=True, key=f"dir_{nombre}") == "Asc"
+    ventana = tabla.ventana(pagina, por_pagina, None if orden == SIN_ORDEN else orden, ascendente, posiciones)
+    coincidencias = f"{len(posiciones)} de {len(tabla)} filas (filtradas)" if filtrada else f"{len(tabla)} filas"
+
+    if not st.toggle("Editar esta página", key=f"editar_{nombre}", disabled=tabla.vacia):
+        st.dataframe(ventana.reset_index(), width="stretch", hide_index=True)
+        st.caption(f"Página {pagina} de {paginas} · {coincidencias}")
+        return
+
+    st.caption(f"Página {pagina} de {paginas} · {coincidencias} · edite las celdas y aplique todos los cambios juntos")
+    # La clave incluye la página y la versión: después de aplicar, la grilla arranca limpia
+    clave_grilla = f"grilla_{nombre}_{pagina}_{por_pagina}_{orden}_{ascendente}_{tabla.version}"
+    with st.form("form_grid"):
+        editado = st.data_editor(ventana, num_rows="fixed", width="stretch", key=clave_grilla)
+        submitted = st.form_submit_button("Aplicar cambios")
+    if submitted:
+        # Validación por columna (vectorizada) y un solo lote de cambios
+        cambios, errores = admin_tablas.diferencias(ventana, editado, tabla.dtypes)
+        if errores:
+            detalle = ", ".join(f"ID {i} · {c} = {v!r}" for i, c, v in errores[:10])
+            st.error(f"{len(errores)} celdas con valores inválidos, no se aplicó ningún cambio: {detalle}")
+        elif not cambios:
+            st.info("No hay cambios para aplicar.")
+        else:
+            tabla.modificar_lote(cambios)
+            st.success(f"{sum(len(v) for v in cambios.values())} celdas modificadas en {len(cambios)} filas.")
+            safe_rerun()
+
+
+@st.fragment
+def operaciones(tabla, nombre, posiciones):
+    """Agregar / Modificar / Borrar. Elegir la acción o el ID reejecuta solo este fragmento;
+    después de un cambio se reejecuta la página para actualizar la grilla."""
+    st.subheader("Operaciones sobre la tabla")
+    op = st.radio("Acción", ["Agregar", "Modificar", "Borrar (vaciar campos)"], horizontal=True)
+
+    if op == "Agregar":
+        st.info("Agregar nueva fila. Si la tabla está vacía, primero asegúrate de tener los encabezados en el CSV.")
+        if tabla.vacia:
+            st.warning("Tabla vacía: no se pueden generar campos automáticamente.")
+        else:
+            with st.form("form_add"):
+                values = {}
+                for c in tabla.columnas:
+                    values[c] = st.text_input(c, value="")
+                submitted = st.form_submit_button("Agregar")
+            if submitted:
+                # La fila va al buffer de altas de la tabla (sin copiar la tabla)
+                tabla.agregar({c: admin_tablas.convertir_valor(v, tabla.dtypes.get(c)) for c, v in values.items()})
+                st.success("Fila agregada.")
+                safe_rerun()
+
+    elif op == "Modificar":
+        if tabla.vacia:
+            st.warning("Tabla vacía: no hay registros para modificar.")
+        elif posiciones is not None and not len(posiciones):
+            st.warning("Ninguna fila cumple los filtros.")
+        else:
+            idx = elegir_fila("ID a modificar", tabla, posiciones, key=f"modificar_{nombre}")
+            if idx is not None:
+                row = tabla.fila(idx)
+                with st.form("form_edit"):
+                    newvals = {}
+                    for c in tabla.columnas:
+                        display = "" if pd.isna(row[c]) else str(row[c])
+                        newvals[c] = st.text_input(c, value=display)
+                    submitted = st.form_submit_button("Guardar cambios")
+                if submitted:
+                    tabla.modificar(idx, {c: admin_tablas.convertir_valor(s, tabla.dtypes.get(c))
+                                          for c, s in newvals.items()})
+                    st.success("Registro modificado.")
+                    safe_rerun()
+
+    elif op == "Borrar (vaciar campos)":
+        if tabla.vacia:
+            st.warning("Tabla vacía.")
+        elif posiciones is not None and not len(posiciones):
+            st.warning("Ninguna fila cumple los filtros.")
+        else:
+            idx = elegir_fila("ID a vaciar", tabla, posiciones, key=f"borrar_{nombre}")
+            if idx is not None and st.button("Vaciar campos"):
+                tabla.vaciar(idx)
+                st.success(f"Registro {idx} vaciado.")
+                safe_rerun()
+
+
+# La sesión guarda solo sus cambios sin confirmar (VistaSesion) sobre el
+# almacén compartido; "Guardar todos" los confirma y escribe los CSV.
+almacen = shared_store()
 if "tablas" not in st.session_state:
-    st.session_state["tablas"] = load_tables()
+    st.session_state["tablas"] = almacen.sesion()
 
 st.title("Administrador de CSV (Web)")
 
@@ -127,106 +241,26 @@ col1, col2 = st.columns([1, 3])
 with col1:
     selected = st.selectbox("Seleccione tabla", table_names)
     st.write("Filas:", len(tablas[selected]))
+    pendientes = sum(t.pendientes for t in tablas.values())
+    if pendientes:
+        st.caption(f"{pendientes} cambios sin guardar en esta sesión")
     if st.button("Guardar todos (CSV)"):
-        save_tables(tablas)
-        st.success("CSV guardados.")
+        with almacen.lock:
+            almacen.confirmar(tablas)
+            escritas = save_tables(almacen)
+        st.success(f"CSV guardados: {', '.join(escritas)}." if escritas else "No hay cambios para guardar.")
     if st.button("Exportar tabla a JSON"):
         export_json(tablas, selected)
         st.success(f"{selected}.json creado.")
 
+tabla = tablas[selected]
+filtros = filtros_sidebar(tabla, selected)
+# Filas que cumplen los filtros (None = todas)
+posiciones = tabla.filtrar(filtros) if filtros else None
+
+# Grilla y operaciones son fragmentos: sus widgets reejecutan solo su parte de la página
 with col2:
-    df = tablas[selected]
-    st.subheader(selected)
-    st.dataframe(df.reset_index(drop=False).rename(columns={"index": "ID"}), width="stretch")
+    vista_tabla(tabla, selected, posiciones)
 
 st.markdown("---")
-st.subheader("Operaciones sobre la tabla")
-
-op = st.radio("Acción", ["Agregar", "Modificar", "Borrar (vaciar campos)"], horizontal=True)
-
-if op == "Agregar":
-    st.info("Agregar nueva fila. Si la tabla está vacía, primero asegúrate de tener los encabezados en el CSV.")
-    if df.empty:
-        st.warning("Tabla vacía: no se pueden generar campos automáticamente.")
-    else:
-        with st.form("form_add"):
-            values = {}
-            for c in df.columns:
-                values[c] = st.text_input(c, value="")
-            submitted = st.form_submit_button("Agregar")
-        if submitted:
-            normalized = {}
-            for c, v in values.items():
-                if v == "" or v is None:
-                    normalized[c] = pd.NA
-                else:
-                    col_dtype = tablas[selected].dtypes.get(c)
-                    if pat.is_integer_dtype(col_dtype):
-                        try:
-                            normalized[c] = int(v)
-                        except Exception:
-                            normalized[c] = pd.NA
-                    elif pat.is_float_dtype(col_dtype):
-                        try:
-                            normalized[c] = float(v)
-                        except Exception:
-                            normalized[c] = pd.NA
-                    else:
-                        normalized[c] = v
-            new_row = pd.DataFrame([normalized])
-            # respetar dtypes cuando sea posible
-            for col, dtype in tablas[selected].dtypes.items():
-                try:
-                    new_row[col] = new_row[col].astype(dtype)
-                except Exception:
-                    pass
-            tablas[selected] = pd.concat([df, new_row], ignore_index=True)
-            st.session_state["tablas"] = tablas
-            st.success("Fila agregada.")
-            safe_rerun()
-
-elif op == "Modificar":
-    if df.empty:
-        st.warning("Tabla vacía: no hay registros para modificar.")
-    else:
-        idx = st.selectbox("Elija ID (índice 0..n-1)", list(range(len(df))))
-        row = df.loc[idx]
-        with st.form("form_edit"):
-            newvals = {}
-            for c in df.columns:
-                display = "" if pd.isna(row[c]) else str(row[c])
-                newvals[c] = st.text_input(c, value=display)
-            submitted = st.form_submit_button("Guardar cambios")
-        if submitted:
-            for c, s in newvals.items():
-                if s == "" or s is None:
-                    tablas[selected].at[idx, c] = pd.NA
-                else:
-                    col_dtype = tablas[selected].dtypes.get(c)
-                    if pat.is_integer_dtype(col_dtype):
-                        try:
-                            tablas[selected].at[idx, c] = int(s)
-                        except Exception:
-                            tablas[selected].at[idx, c] = pd.NA
-                    elif pat.is_float_dtype(col_dtype):
-                        try:
-                            tablas[selected].at[idx, c] = float(s)
-                        except Exception:
-                            tablas[selected].at[idx, c] = pd.NA
-                    else:
-                        tablas[selected].at[idx, c] = s
-            st.session_state["tablas"] = tablas
-            st.success("Registro modificado.")
-            safe_rerun()
-
-elif op == "Borrar (vaciar campos)":
-    if df.empty:
-        st.warning("Tabla vacía.")
-    else:
-        idx = st.selectbox("Elija ID a vaciar", list(range(len(df))))
-        if st.button("Vaciar campos"):
-            for c in df.columns:
-                tablas[selected].at[idx, c] = pd.NA
-            st.session_state["tablas"] = tablas
-            st.success(f"Registro {idx} vaciado.")
-            safe_rerun()
\ No newline at end of file
+operaciones(tabla, selected, posiciones)
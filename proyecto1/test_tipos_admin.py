@@ -0,0 +1,86 @@
+# para ejecutar : py -m pytest test_tipos_admin.py   (o py test_tipos_admin.py, sin pytest)
+"""Los tipos guardados en tipos_inferidos.json no hacen perder datos.
+
+Si el CSV se edita fuera de la app (texto en una columna que se guardó como
+numérica) la carga no debe convertir esas celdas en nulos: se vuelven a
+inferir los tipos y el valor sobrevive a cargar y guardar. Lo mismo con un
+archivo grande cuyos tipos salieron de una muestra que no lo representa.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+import admin_tablas
+
+
+def _carpeta_con(nombre, df):
+    carpeta = tempfile.mkdtemp(prefix="test_tipos_")
+    df.to_csv(os.path.join(carpeta, nombre), index=False)
+    return carpeta
+
+
+def _editar_csv(ruta, fila, columna, valor):
+    """Cambia una celda como lo haría un editor externo (todo como texto)."""
+    df = pd.read_csv(ruta, dtype=str, keep_default_na=False)
+    df.at[fila, columna] = valor
+    time.sleep(0.01)   # que cambie la fecha de modificación aun en sistemas de archivos con poca resolución
+    df.to_csv(ruta, index=False)
+
+
+def test_texto_en_columna_numerica_guardada():
+    carpeta = _carpeta_con("productos.csv", pd.DataFrame({"id_producto": [1, 2], "codigo": [100, 200]}))
+    try:
+        tablas = admin_tablas.cargar_tablas_df(carpeta, ["productos.csv"])
+        assert str(tablas["productos"]["codigo"].dtype) == "Int64"
+        assert admin_tablas.cargar_tipos(carpeta)["productos.csv"]["tipos"]["codigo"] == "Int64"
+
+        _editar_csv(os.path.join(carpeta, "productos.csv"), 1, "codigo", "A-7")
+        almacen = admin_tablas.AlmacenCompartido(admin_tablas.cargar_tablas_df(carpeta, ["productos.csv"]))
+        assert almacen.tablas["productos"].df["codigo"].tolist() == ["100", "A-7"]
+
+        vista = almacen.sesion()["productos"]
+        vista.modificar(0, {"codigo": "B-1"})
+        almacen.confirmar({"productos": vista})
+        assert list(almacen.guardar(carpeta)) == ["productos"]
+        releida = admin_tablas.cargar_tablas_df(carpeta, ["productos.csv"])["productos"]
+        assert releida["codigo"].tolist() == ["B-1", "A-7"]
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def test_tipos_guardados_no_convierten_texto_en_nulo():
+    """Aunque tamaño y fecha coincidan, un texto en una columna numérica hace inferir de nuevo."""
+    carpeta = _carpeta_con("rubros.csv", pd.DataFrame({"id_rubro": [1, 2], "orden": ["10", "diez"]}))
+    try:
+        ruta = os.path.join(carpeta, "rubros.csv")
+        cache = {"rubros.csv": {"columnas": ["id_rubro", "orden"], "tipos": {"id_rubro": "Int64", "orden": "Int64"},
+                                "archivo": admin_tablas.huella_archivo(ruta)}}
+        df, cambio = admin_tablas.cargar_tabla_csv(ruta, cache)
+        assert cambio and cache["rubros.csv"]["tipos"]["orden"] == "string"
+        assert df["orden"].tolist() == ["10", "diez"]
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def test_muestra_que_no_representa_al_archivo():
+    """Archivo "grande" cuya muestra es toda numérica y el resto es texto."""
+    umbral, muestra = admin_tablas.UMBRAL_MUESTRA_BYTES, admin_tablas.MUESTRA_FILAS
+    admin_tablas.UMBRAL_MUESTRA_BYTES, admin_tablas.MUESTRA_FILAS = 0, 5
+    df = pd.DataFrame({"id_sucursal": range(1, 11), "telefono": [str(n) for n in range(5)] + ["s/d"] * 5})
+    carpeta = _carpeta_con("sucursales.csv", df)
+    try:
+        tabla = admin_tablas.cargar_tablas_df(carpeta, ["sucursales.csv"])["sucursales"]
+        assert tabla["telefono"].tolist() == df["telefono"].tolist()
+    finally:
+        admin_tablas.UMBRAL_MUESTRA_BYTES, admin_tablas.MUESTRA_FILAS = umbral, muestra
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_"):
+            prueba()
+            print(f" ✅ {nombre}")
@@ -0,0 +1,434 @@
+# para ejecutar : py arbol_por_bloques.py clientes.parquet --datos compras --comparar
+"""Árbol de decisión entrenado por bloques, para bases que no entran en memoria.
+
+Nunca se arma el DataFrame completo. La entrada (CSV o Parquet, con las
+columnas de Compras.py o de Ejercicio.py) se lee por bloques con
+puntuar_clientes.leer_bloques, y cada bloque se codifica con ingesta:
+
+  1. Primera pasada: un reservorio uniforme de `--evaluacion` filas que
+     quedan afuera del entrenamiento, otro de TAM_MUESTRA_BINS filas para
+     los cuantiles, y los valores distintos de cada feature. Cada feature
+     queda con hasta MAX_BINS umbrales candidatos: los puntos medios entre
+     valores distintos si son pocos (los mismos que probaría sklearn), o
+     cuantiles de la muestra si no.
+  2. Segunda pasada: cada bloque, sin las filas de evaluación, se pasa a
+     códigos de bin (1 byte por valor) y se agrega a un archivo temporal.
+  3. Una pasada por nivel del árbol sobre ese archivo: un solo bincount da el
+     histograma de clases por nodo x feature x bin, y cada hoja del nivel se
+     divide en el umbral de menor Gini.
+
+La memoria queda acotada por el bloque y los reservorios, no por el archivo.
+Con --comparar también se entrena el DecisionTreeClassifier en memoria sobre
+las mismas filas, y se compara exactitud y memoria pico (cada modo corre en
+su propio proceso). No contempla valores faltantes en las features.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+import ingesta
+from busqueda_arbol import CARPETA_MODELOS, FEATURES_COMPRAS, FEATURES_GIMNASIO
+from puntuar_clientes import TAM_BLOQUE, leer_bloques
+
+try:
+    import resource
+except ImportError:   # Windows: memoria pico con GetProcessMemoryInfo (ver _pico_windows)
+    resource = None
+
+MAX_BINS = 255   # umbrales por feature: los códigos de bin entran en un uint8
+TAM_EVALUACION = 100000
+TAM_MUESTRA_BINS = 200000
+MAX_CELDAS_HISTOGRAMA = 1 << 24   # nodos x features x bins x clases por pasada (128 MB)
+TEST_SIZE = 0.2   # con archivos chicos la evaluación se recorta a esta fracción
+SEMILLA = 42
+
+# (codificación de cada bloque, features, objetivo, max_depth de Compras.py / Ejercicio.py)
+DATOS = {
+    "compras": (ingesta.codificar_clientes, FEATURES_COMPRAS, "Recompra", 3),
+    "gimnasio": (ingesta.codificar_gimnasio, FEATURES_GIMNASIO, "Canceló", 4),
+}
+
+
+class Reservorio:
+    """Muestra uniforme de `capacidad` filas de un flujo de largo desconocido (algoritmo R)."""
+
+    def __init__(self, capacidad, columnas, semilla=SEMILLA):
+        self.capacidad = capacidad
+        self.filas = np.empty((capacidad, columnas))
+        self.indices = np.empty(capacidad, dtype=np.int64)   # posición de cada fila en el flujo
+        self.vistas = 0
+        self._rnd = np.random.default_rng(semilla)
+
+    def agregar(self, filas):
+        m = len(filas)
+        libres = min(max(self.capacidad - self.vistas, 0), m)
+        self.filas[self.vistas:self.vistas + libres] = filas[:libres]
+        self.indices[self.vistas:self.vistas + libres] = np.arange(self.vistas, self.vistas + libres)
+        # La fila i del flujo ocupa un lugar al azar con probabilidad capacidad / (i + 1)
+        resto = np.arange(libres, m)
+        lugar = self._rnd.integers(0, self.vistas + resto + 1)
+        entra = lugar < self.capacidad
+        lugar, resto = lugar[entra][::-1], resto[entra][::-1]
+        lugar, ultima = np.unique(lugar, return_index=True)   # mismo lugar dos veces: queda la última fila
+        self.filas[lugar] = filas[resto[ultima]]
+        self.indices[lugar] = self.vistas + resto[ultima]
+        self.vistas += m
+
+    def muestra(self):
+        n = min(self.vistas, self.capacidad)
+        return self.filas[:n], self.indices[:n]
+
+    def recortar(self, n):
+        """Deja n filas al azar de la muestra (sigue siendo uniforme)."""
+        filas, indices = self.muestra()
+        if n < len(filas):
+            elegidas = np.sort(self._rnd.choice(len(filas), n, replace=False))
+            self.filas, self.indices = filas[elegidas], indices[elegidas]
+            self.capacidad = n
+
+
+def umbrales_candidatos(distintos, muestra, max_bins=MAX_BINS):
+    """Umbrales de una feature: puntos medios entre sus valores, o cuantiles si hay más de max_bins."""
+    if distintos is not None:
+        return (distintos[:-1] + distintos[1:]) / 2
+    return np.unique(np.quantile(muestra, np.linspace(0, 1, max_bins + 1)[1:-1]))
+
+
+def a_bins(X, umbrales):
+    """Códigos de bin (features x filas, uint8): x <= umbrales[j][b]  <=>  código <= b."""
+    codigos = np.empty((X.shape[1], len(X)), dtype=np.uint8)
+    for j, u in enumerate(umbrales):
+        codigos[j] = np.searchsorted(u, X[:, j], side="left")
+    return codigos
+
+
+def _gini(conteos):
+    n = conteos.sum(axis=-1)
+    return 1 - (conteos ** 2).sum(axis=-1) / np.maximum(n, 1) ** 2
+
+
+class ArbolPorBloques:
+    """Árbol armado por histogramas. predict/predict_proba/classes_ como DecisionTreeClassifier."""
+
+    def __init__(self, features, clases, umbrales, max_depth):
+        self.features = list(features)
+        self.classes_ = np.asarray(clases)
+        self.umbrales = umbrales
+        self.max_depth = max_depth
+        self.bins = max(len(u) for u in umbrales) + 1
+        self.izquierda, self.derecha, self.columna, self.bin, self.umbral = [], [], [], [], []
+        self.valor = []
+        self.profundidad = 0
+        self._decrecimiento = np.zeros(len(self.features))
+
+    def _nuevo_nodo(self, conteos):
+        nodo = len(self.valor)
+        self.izquierda.append(nodo)   # una hoja apunta a sí misma
+        self.derecha.append(nodo)
+        self.columna.append(0)
+        self.bin.append(0)
+        self.umbral.append(0.0)
+        self.valor.append(np.asarray(conteos, dtype=np.float64))
+        return nodo
+
+    def _recorrer(self, filas, elegir):
+        """Nodo final de cada fila; `elegir(columna, i)` devuelve un array True = va a la izquierda."""
+        izquierda, derecha = np.array(self.izquierda), np.array(self.derecha)
+        columna = np.array(self.columna)
+        nodo = np.zeros(filas, dtype=np.intp)
+        for _ in range(self.profundidad):
+            nodo = np.where(elegir(columna[nodo], nodo), izquierda[nodo], derecha[nodo])
+        return nodo
+
+    def _nodos_bins(self, codigos):
+        bins = np.array(self.bin)
+        filas = np.arange(codigos.shape[1])
+        return self._recorrer(codigos.shape[1], lambda col, nodo: codigos[col, filas] <= bins[nodo])
+
+    def _histogramas(self, bloques, frontera):
+        """Conteo de clases por (nodo de la frontera, feature, bin), en una pasada por los bloques."""
+        lugar = np.full(len(self.valor), -1)
+        lugar[frontera] = np.arange(len(frontera))
+        f, b, c = len(self.features), self.bins, len(self.classes_)
+        desplazamiento = (np.arange(f)[:, None] * b) * c
+        hist = np.zeros(len(frontera) * f * b * c)
+        for codigos, y in bloques():
+            posicion = lugar[self._nodos_bins(codigos)]
+            activas = posicion >= 0
+            codigos, y, posicion = codigos[:, activas], y[activas], posicion[activas]
+            indice = desplazamiento + codigos.astype(np.int64) * c + (posicion * f * b * c + y)
+            hist += np.bincount(indice.ravel(), minlength=hist.size)
+        return hist.reshape(len(frontera), f, b, c)
+
+    def _dividir(self, hist):
+        """Mejor corte (feature, bin) del nodo por Gini; None si ninguno separa filas."""
+        izquierda = np.cumsum(hist, axis=1)
+        derecha = izquierda[:, -1:, :] - izquierda
+        n_izq, n_der = izquierda.sum(axis=-1), derecha.sum(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Minimizar n_izq * gini_izq + n_der * gini_der = maximizar sum(izq²)/n_izq + sum(der²)/n_der
+            puntaje = (izquierda ** 2).sum(axis=-1) / n_izq + (derecha ** 2).sum(axis=-1) / n_der
+        puntaje[(n_izq == 0) | (n_der == 0)] = -np.inf
+        j, b = np.unravel_index(np.argmax(puntaje), puntaje.shape)
+        if not np.isfinite(puntaje[j, b]):
+            return None
+        return j, b, izquierda[j, b], derecha[j, b]
+
+    def ajustar(self, bloques, conteo_total):
+        """Crece el árbol por niveles; `bloques()` recorre (códigos, y) de las filas de entrenamiento."""
+        def _divisible(conteos):
+            return conteos.sum() >= 2 and _gini(conteos) > 0
+
+        raiz = self._nuevo_nodo(conteo_total)
+        frontera = [raiz] if _divisible(conteo_total) else []
+        por_pasada = max(1, MAX_CELDAS_HISTOGRAMA // (len(self.features) * self.bins * len(self.classes_)))
+        while frontera and (self.max_depth is None or self.profundidad < self.max_depth):
+            siguiente = []
+            # Con muchas hojas en el nivel, el histograma se arma en varias pasadas
+            grupos = [frontera[i:i + por_pasada] for i in range(0, len(frontera), por_pasada)]
+            for nodo, h in ((n, h) for grupo in grupos for n, h in zip(grupo, self._histogramas(bloques, grupo))):
+                corte = self._dividir(h)
+                if corte is None:
+                    continue
+                j, b, izq, der = corte
+                n = self.valor[nodo].sum()
+                self._decrecimiento[j] += (n * _gini(self.valor[nodo]) - izq.sum() * _gini(izq)
+                                           - der.sum() * _gini(der))
+                self.columna[nodo], self.bin[nodo] = int(j), int(b)
+                self.umbral[nodo] = float(self.umbrales[j][b])
+                self.izquierda[nodo] = self._nuevo_nodo(izq)
+                self.derecha[nodo] = self._nuevo_nodo(der)
+                siguiente += [h for h in (self.izquierda[nodo], self.derecha[nodo]) if _divisible(self.valor[h])]
+            self.profundidad += 1
+            frontera = siguiente
+        self.valor = np.array(self.valor)
+        return self
+
+    @property
+    def feature_importances_(self):
+        total = self._decrecimiento.sum()
+        return self._decrecimiento / total if total > 0 else self._decrecimiento
+
+    def apply(self, X):
+        if hasattr(X, "columns"):
+            X = X[self.features]
+        X = np.asarray(X, dtype=np.float64)
+        umbral = np.array(self.umbral)
+        filas = np.arange(len(X))
+        return self._recorrer(len(X), lambda col, nodo: X[filas, col] <= umbral[nodo])
+
+    def predict_proba(self, X):
+        valor = self.valor[self.apply(X)]
+        return valor / valor.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.valor[self.apply(X)].argmax(axis=1)]
+
+
+def _bloques_codificados(ruta, datos, tam):
+    """(X, y) de cada bloque ya codificado, con las filas en el mismo orden en cada pasada."""
+    codificar, features, objetivo, _ = DATOS[datos]
+    for df in leer_bloques(ruta, features + [objetivo], tam):
+        df = codificar(df)
+        yield df[features].to_numpy(dtype=np.float64), df[objetivo].to_numpy()
+
+
+def entrenar_por_bloques(ruta, datos="compras", tam=TAM_BLOQUE, tam_evaluacion=TAM_EVALUACION,
+                         max_depth=-1, semilla=SEMILLA):
+    """Entrena sin cargar el archivo completo. Devuelve (modelo, X_eval, y_eval, indices_eval, info).
+
+    max_depth=-1 usa el de Compras.py / Ejercicio.py; None crece hasta hojas puras.
+    """
+    _, features, _, profundidad = DATOS[datos]
+    max_depth = profundidad if max_depth == -1 else max_depth
+    f = len(features)
+    info = {"pasadas": []}
+
+    t0 = time.perf_counter()
+    evaluacion = Reservorio(tam_evaluacion, f + 1, semilla)
+    muestra = Reservorio(TAM_MUESTRA_BINS, f, semilla + 1)
+    distintos = [np.array([])] * f
+    clases = np.array([])
+    tipo_objetivo = None
+    for X, y in _bloques_codificados(ruta, datos, tam):
+        tipo_objetivo = y.dtype
+        evaluacion.agregar(np.column_stack([X, y]))
+        muestra.agregar(X)
+        clases = np.union1d(clases, y)
+        for j in range(f):
+            if distintos[j] is not None:
+                distintos[j] = np.union1d(distintos[j], X[:, j])
+                if len(distintos[j]) > MAX_BINS + 1:
+                    distintos[j] = None
+    filas = evaluacion.vistas
+    if not filas:
+        raise ValueError(f"{ruta} no tiene filas válidas para {datos}")
+    evaluacion.recortar(min(tam_evaluacion, int(round(TEST_SIZE * filas))))
+    umbrales = [umbrales_candidatos(d, muestra.muestra()[0][:, j]) for j, d in enumerate(distintos)]
+    info["pasadas"].append(("muestreo y bins", time.perf_counter() - t0))
+    print(f"   pasada 1 (muestreo y bins): {filas:,} filas en {info['pasadas'][-1][1]:.1f} s")
+
+    filas_eval, indices_eval = evaluacion.muestra()
+    excluidas = np.sort(indices_eval)
+    clases = clases.astype(tipo_objetivo)
+    y_eval = clases[np.searchsorted(clases, filas_eval[:, -1])]
+
+    with tempfile.TemporaryDirectory(prefix="arbol_bloques_") as carpeta:
+        ruta_bins = os.path.join(carpeta, "bins.u8")
+        ruta_y = os.path.join(carpeta, "y.u8")
+        largos = []
+        conteo_total = np.zeros(len(clases))
+        t0 = time.perf_counter()
+        inicio = 0
+        with open(ruta_bins, "wb") as salida_bins, open(ruta_y, "wb") as salida_y:
+            for X, y in _bloques_codificados(ruta, datos, tam):
+                entra = np.ones(len(X), dtype=bool)
+                desde, hasta = np.searchsorted(excluidas, [inicio, inicio + len(X)])
+                entra[excluidas[desde:hasta] - inicio] = False
+                inicio += len(X)
+                codigos_y = np.searchsorted(clases, y[entra]).astype(np.uint8)
+                a_bins(X[entra], umbrales).tofile(salida_bins)
+                codigos_y.tofile(salida_y)
+                conteo_total += np.bincount(codigos_y, minlength=len(clases))
+                largos.append(len(codigos_y))
+        if inicio != filas:
+            raise ValueError(f"{ruta} cambió entre pasadas ({filas:,} filas y después {inicio:,})")
+        info["pasadas"].append(("bins a disco", time.perf_counter() - t0))
+        print(f"   pasada 2 (bins a disco): {sum(largos):,} filas de entrenamiento en {info['pasadas'][-1][1]:.1f} s")
+
+        def bloques():
+            with open(ruta_bins, "rb") as entrada_bins, open(ruta_y, "rb") as entrada_y:
+                for m in largos:
+                    codigos = np.fromfile(entrada_bins, dtype=np.uint8, count=f * m).reshape(f, m)
+                    yield codigos, np.fromfile(entrada_y, dtype=np.uint8, count=m).astype(np.int64)
+
+        t0 = time.perf_counter()
+        modelo = ArbolPorBloques(features, clases, umbrales, max_depth).ajustar(bloques, conteo_total)
+        info["pasadas"].append((f"{modelo.profundidad} niveles", time.perf_counter() - t0))
+        print(f"   pasadas 3-{modelo.profundidad + 2} (un nivel cada una): {len(modelo.valor)} nodos en "
+              f"{info['pasadas'][-1][1]:.1f} s")
+
+    info.update(filas=filas, filas_entrenamiento=sum(largos))
+    return modelo, filas_eval[:, :-1], y_eval, indices_eval, info
+
+
+def entrenar_en_memoria(ruta, datos, indices_eval, max_depth=-1, semilla=SEMILLA):
+    """El camino de Compras.py / Ejercicio.py: todo el archivo en un DataFrame y DecisionTreeClassifier."""
+    codificar, features, objetivo, profundidad = DATOS[datos]
+    columnas = features + [objetivo]
+    if os.path.splitext(ruta)[1].lower() == ".parquet":
+        df = pd.read_parquet(ruta, columns=columnas)
+    else:
+        df = pd.read_csv(ruta, usecols=columnas)
+    df = codificar(df)
+    entrenamiento = np.ones(len(df), dtype=bool)
+    entrenamiento[indices_eval] = False
+    modelo = DecisionTreeClassifier(max_depth=profundidad if max_depth == -1 else max_depth,
+                                    random_state=semilla)
+    modelo.fit(df.loc[entrenamiento, features], df.loc[entrenamiento, objetivo])
+    return modelo.predict(df.iloc[indices_eval][features])   # en el orden del reservorio
+
+
+def _pico_windows():
+    """PeakWorkingSetSize del proceso actual en bytes (psapi, sin dependencias)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class Contadores(ctypes.Structure):   # PROCESS_MEMORY_COUNTERS
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (campo, ctypes.c_size_t) for campo in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(Contadores), wintypes.DWORD]
+    contadores = Contadores()
+    contadores.cb = ctypes.sizeof(contadores)
+    if not kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(contadores), contadores.cb):
+        raise ctypes.WinError()
+    return contadores.PeakWorkingSetSize
+
+
+def memoria_pico_mb():
+    """Memoria pico del proceso en MB: RSS máximo (Linux/macOS) o peak working set (Windows)."""
+    if resource is None:
+        return _pico_windows() / 2 ** 20
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2 ** 20 if sys.platform == "darwin" else pico / 1024   # macOS: bytes; Linux: KB
+
+
+def _medir(funcion, *args, **kwargs):
+    """Corre funcion en este proceso y devuelve (resultado, segundos, memoria pico en MB)."""
+    t0 = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - t0, memoria_pico_mb()
+
+
+def en_proceso_nuevo(funcion, *args, **kwargs):
+    """_medir en un proceso nuevo (spawn), para que la memoria pico sea solo la de esa función."""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as ejecutor:
+        base = ejecutor.submit(memoria_pico_mb).result()   # intérprete + imports
+        return (*ejecutor.submit(_medir, funcion, *args, **kwargs).result(), base)
+
+
+def guardar(modelo, datos, exactitud):
+    """modelos/arbol_<datos>_bloques.joblib, con el formato de busqueda_arbol.py (lo lee puntuar_clientes.py)."""
+    os.makedirs(CARPETA_MODELOS, exist_ok=True)
+    ruta = os.path.join(CARPETA_MODELOS, f"arbol_{datos}_bloques.joblib")
+    joblib.dump({
+        "modelo": modelo,
+        "features": modelo.features,
+        "parametros": {"max_depth": modelo.max_depth, "max_bins": MAX_BINS},
+        "metrica": "accuracy",
+        "puntaje_evaluacion": exactitud,
+    }, ruta)
+    return ruta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Árbol de decisión entrenado por bloques (sin cargar todo el archivo)")
+    parser.add_argument("entrada", help="CSV o Parquet con las columnas de Compras.py o de Ejercicio.py")
+    parser.add_argument("--datos", choices=sorted(DATOS), default="compras")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE)
+    parser.add_argument("--evaluacion", type=int, default=TAM_EVALUACION, help="filas del reservorio de evaluación")
+    parser.add_argument("--comparar", action="store_true", help="entrenar también en memoria y comparar")
+    parser.add_argument("--guardar", action="store_true", help="guardar en modelos/arbol_<datos>_bloques.joblib")
+    args = parser.parse_args()
+    # Las funciones y el árbol se toman del módulo importado (no de __main__): así se
+    # pueden mandar al proceso nuevo y el joblib guardado se puede cargar desde otros scripts
+    import arbol_por_bloques
+
+    print(f"\n🌳 Entrenando por bloques de {args.bloque:,} filas: {args.entrada}")
+    (modelo, X_eval, y_eval, indices_eval, info), segundos, pico, base = en_proceso_nuevo(
+        arbol_por_bloques.entrenar_por_bloques, args.entrada, args.datos, args.bloque, args.evaluacion)
+    pred = modelo.predict(X_eval)
+    exactitud = float((pred == y_eval).mean())
+    resultados = [("por bloques", exactitud, segundos, pico, base)]
+
+    if args.comparar:
+        print("\n🧠 Entrenando en memoria (archivo completo en un DataFrame)...")
+        pred_memoria, segundos, pico, base = en_proceso_nuevo(arbol_por_bloques.entrenar_en_memoria, args.entrada, args.datos,
+                                                              indices_eval)
+        resultados.append(("en memoria", float((pred_memoria == y_eval).mean()), segundos, pico, base))
+
+    print(f"\n {info['filas']:,} filas: {info['filas_entrenamiento']:,} de entrenamiento y {len(y_eval):,} "
+          f"de evaluación (reservorio)\n")
+    print(f" {'modo':<13}{'exactitud':>10}{'segundos':>10}{'memoria pico':>14}{'sobre la base':>15}")
+    for modo, acc, seg, pico, base in resultados:
+        print(f" {modo:<13}{acc:>10.4f}{seg:>10.1f}{pico:>11,.0f} MB{pico - base:>12,.0f} MB")
+    if args.comparar:
+        print(f"\n  Predicciones iguales al árbol en memoria: {(pred == pred_memoria).mean():.2%}")
+    print("\n  Importancia: " + ", ".join(f"{c}={v:.2f}" for c, v in zip(modelo.features, modelo.feature_importances_)))
+
+    if args.guardar:
+        print(f"\n✅ Modelo guardado en {guardar(modelo, args.datos, exactitud)}")
@@ -0,0 +1,86 @@
+# para ejecutar : py bench_arbol_compilado.py --filas 1000000
+"""Árbol compilado (compilar_arbol.py) vs sklearn: velocidad.
+
+Mide un registro suelto y un lote de `--filas` filas para el árbol de
+Compras.py (max_depth=3), el de Ejercicio.py (max_depth=4) y uno profundo
+sobre datos continuos. Que den exactamente lo mismo que sklearn lo verifica
+test_compilar_arbol.py.
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+import Compras
+import Ejercicio
+import ingesta
+from compilar_arbol import compilar
+
+
+def arboles():
+    """(nombre, modelo, features, X de prueba) para cada árbol a comparar."""
+    clientes = ingesta.leer_clientes()
+    compras = DecisionTreeClassifier(**Compras.PARAMETROS_MODELO)
+    compras.fit(clientes[Compras.FEATURES], clientes["Recompra"])
+
+    gimnasio, _, _ = Ejercicio.entrenar_modelo(Ejercicio.cargar_datos())
+
+    rnd = np.random.default_rng(0)
+    X = rnd.normal(size=(5000, 6)) * [1, 10, 100, 1e-3, 1e4, 1]
+    y = (X[:, 0] + X[:, 1] / 10 + rnd.normal(size=len(X)) > 0).astype(int) + (X[:, 2] > 50)
+    profundo = DecisionTreeClassifier(max_depth=10, random_state=0).fit(X, y)
+    columnas = [f"x{i}" for i in range(X.shape[1])]
+
+    return [
+        ("compras", compras, Compras.FEATURES, clientes[Compras.FEATURES].to_numpy(dtype=float)),
+        ("gimnasio", gimnasio, Ejercicio.FEATURES, Ejercicio.cargar_datos()[Ejercicio.FEATURES].to_numpy(dtype=float)),
+        ("profundo (3 clases)", profundo, columnas, X),
+    ]
+
+
+def _mejor(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del árbol compilado contra sklearn")
+    parser.add_argument("--filas", type=int, default=1000000)
+    args = parser.parse_args()
+    # Se pasa a sklearn tanto ndarray como DataFrame a propósito: sin avisos de nombres de features
+    warnings.filterwarnings("ignore", message="X (does not have valid|has) feature names")
+
+    resultados = []
+    for nombre, modelo, features, X in arboles():
+        evaluador = compilar(modelo, features, nombre)
+        registro = dict(zip(features, X[0]))
+        fila_df = pd.DataFrame([registro])
+        fila_np = X[:1]
+        vueltas = 2000
+        t_df = _mejor(lambda: [modelo.predict_proba(fila_df) for _ in range(vueltas)], 3) / vueltas
+        t_np = _mejor(lambda: [modelo.predict_proba(fila_np) for _ in range(vueltas)], 3) / vueltas
+        t_py = _mejor(lambda: [evaluador["predecir_proba_registro"](registro) for _ in range(vueltas)], 3) / vueltas
+
+        grande = X[np.random.default_rng(1).integers(0, len(X), args.filas)]
+        t_lote_sk = _mejor(lambda: modelo.predict_proba(grande), 3)
+        t_lote_np = _mejor(lambda: evaluador["predecir_proba"](grande), 3)
+        grande_df = pd.DataFrame(grande, columns=features)
+        t_tabla_sk = _mejor(lambda: modelo.predict_proba(grande_df), 3)
+        t_tabla_np = _mejor(lambda: evaluador["predecir_proba"](grande_df), 3)
+        resultados.append((nombre, modelo.get_depth(), t_df, t_np, t_py, t_lote_sk, t_lote_np, t_tabla_sk, t_tabla_np))
+
+    print(f"\n Registro suelto (µs por llamada)\n")
+    print(f" {'árbol':<20}{'prof':>5}{'sk DataFrame':>14}{'sk ndarray':>12}{'compilado':>11}")
+    for nombre, prof, t_df, t_np, t_py, *_ in resultados:
+        print(f" {nombre:<20}{prof:>5}{t_df * 1e6:>14.1f}{t_np * 1e6:>12.1f}{t_py * 1e6:>11.2f}")
+    print(f"\n Lote de {args.filas:,} filas (s)\n")
+    print(f" {'árbol':<20}{'sk ndarray':>12}{'compilado':>11}{'sk DataFrame':>14}{'compilado':>11}")
+    for nombre, _, _, _, _, t_sk, t_w, t_tsk, t_tw in resultados:
+        print(f" {nombre:<20}{t_sk:>12.3f}{t_w:>11.3f}{t_tsk:>14.3f}{t_tw:>11.3f}")
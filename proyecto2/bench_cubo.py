@@ -0,0 +1,109 @@
+# para ejecutar : py bench_cubo.py --filas 5000000
+"""Cubo de segmentos (cubo.py) vs los groupby y filtros que usaba Compras.py.
+
+Sobre clientes sintéticos con la forma del Excel ya codificado mide:
+  - anterior: df.copy() + pd.cut + un groupby por dimensión + un filtro
+    booleano por cada tasa del resumen, las conclusiones y la consola
+  - cubo: armar el cubo en una pasada + las mismas consultas sobre el cubo
+y verifica que todas las respuestas coincidan.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import Compras
+
+
+def clientes_sinteticos(n, semilla=42):
+    rnd = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "Cliente_ID": np.arange(1, n + 1),
+        "Genero": rnd.integers(0, 2, n).astype(np.int8),
+        "Edad": rnd.integers(18, 81, n),
+        "Recibio_Promo": rnd.integers(0, 2, n).astype(np.int8),
+        "Monto_Promo": rnd.choice([0, 5000, 10000, 20000], n),
+        "Recompra": rnd.integers(0, 2, n).astype(np.int8),
+        "Total_Compras": rnd.integers(1, 30, n),
+        "Ingreso_Mensual": rnd.integers(300000, 3000000, n),
+    })
+
+
+def consultas_anteriores(df):
+    """Los cálculos tal como estaban en las páginas y la consola de Compras.py."""
+    df_temp = df.copy()
+    df_temp["Grupo_Edad"] = pd.cut(df_temp["Edad"], bins=Compras.BORDES_EDAD, labels=Compras.GRUPOS_EDAD)
+    r = {
+        "por_edad": df_temp.groupby("Grupo_Edad", observed=True)["Recompra"].mean(),
+        "por_genero": df.groupby("Genero")["Recompra"].mean(),
+        "por_promo": df.groupby("Recibio_Promo")["Recompra"].mean(),
+        "global": df["Recompra"].mean(),
+        "con_promo": df[df["Recibio_Promo"] == 1]["Recompra"].mean(),
+        "sin_promo": df[df["Recibio_Promo"] == 0]["Recompra"].mean(),
+        "recibieron": df["Recibio_Promo"].sum(),
+        "inversion": df["Monto_Promo"].sum(),
+        "edad": df["Edad"].mean(),
+        "ingreso": df["Ingreso_Mensual"].mean(),
+        "mujeres": df["Genero"].value_counts()[0],
+        "edad_recompra": df[df["Recompra"] == 1]["Edad"].mean(),
+        "edad_no_recompra": df[df["Recompra"] == 0]["Edad"].mean(),
+        "ingreso_recompra": df[df["Recompra"] == 1]["Ingreso_Mensual"].mean(),
+        "ingreso_no_recompra": df[df["Recompra"] == 0]["Ingreso_Mensual"].mean(),
+        "tasa_mujeres": df[df["Genero"] == 0]["Recompra"].mean(),
+        "tasa_hombres": df[df["Genero"] == 1]["Recompra"].mean(),
+    }
+    return r
+
+
+def consultas_cubo(df):
+    cubo = Compras.armar_cubo.__wrapped__(df, Compras.BORDES_EDAD, Compras.GRUPOS_EDAD)
+    return {
+        "por_edad": cubo.media("Recompra", por="Grupo_Edad"),
+        "por_genero": cubo.media("Recompra", por="Genero"),
+        "por_promo": cubo.media("Recompra", por="Recibio_Promo"),
+        "global": cubo.media("Recompra"),
+        "con_promo": cubo.media("Recompra", Recibio_Promo=1),
+        "sin_promo": cubo.media("Recompra", Recibio_Promo=0),
+        "recibieron": cubo.conteo(Recibio_Promo=1),
+        "inversion": cubo.suma("Monto_Promo"),
+        "edad": cubo.media("Edad"),
+        "ingreso": cubo.media("Ingreso_Mensual"),
+        "mujeres": cubo.conteo(Genero=0),
+        "edad_recompra": cubo.media("Edad", Recompra=1),
+        "edad_no_recompra": cubo.media("Edad", Recompra=0),
+        "ingreso_recompra": cubo.media("Ingreso_Mensual", Recompra=1),
+        "ingreso_no_recompra": cubo.media("Ingreso_Mensual", Recompra=0),
+        "tasa_mujeres": cubo.media("Recompra", Genero=0),
+        "tasa_hombres": cubo.media("Recompra", Genero=1),
+    }
+
+
+def _tiempo(funcion, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del cubo de segmentos de Compras.py")
+    parser.add_argument("--filas", type=int, default=5000000)
+    args = parser.parse_args()
+
+    df = clientes_sinteticos(args.filas)
+    anterior, t_anterior = _tiempo(lambda: consultas_anteriores(df))
+    nuevo, t_cubo = _tiempo(lambda: consultas_cubo(df))
+
+    for clave, esperado in anterior.items():
+        if isinstance(esperado, pd.Series):
+            np.testing.assert_allclose(nuevo[clave].to_numpy(), esperado.to_numpy(), rtol=1e-12, err_msg=clave)
+            assert [str(i) for i in nuevo[clave].index] == [str(i) for i in esperado.index], clave
+        else:
+            np.testing.assert_allclose(nuevo[clave], esperado, rtol=1e-12, err_msg=clave)
+
+    print(f"\n Clientes sintéticos: {args.filas:,} filas, {len(anterior)} consultas (todas iguales)\n")
+    print(f"  Anterior (copy + pd.cut + groupby + filtros): {t_anterior:7.2f} s")
+    print(f"  Cubo (una pasada + consultas)               : {t_cubo:7.2f} s  ({t_anterior / t_cubo:.1f}x)")
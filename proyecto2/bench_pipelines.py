@@ -0,0 +1,212 @@
+# para ejecutar : py bench_pipelines.py --salida bench.json   (--anterior bench_viejo.json para comparar)
+"""Tiempos por etapa de Compras.py y Ejercicio.py según la cantidad de filas.
+
+Para cada esquema (compras, gimnasio) y cada tamaño (10^3 a 10^7 filas por
+defecto) genera un archivo con sinteticos.py (con semilla fija, reutilizado
+entre corridas desde `--carpeta`) y corre las etapas de cada script en un
+proceso nuevo:
+
+  carga        pd.read_csv / read_parquet del archivo sin codificar
+  codificacion ingesta.codificar_clientes / codificar_gimnasio
+  division     Compras.dividir_datos / Ejercicio.dividir_datos
+  ajuste       Compras.entrenar_modelo / DecisionTreeClassifier de Ejercicio
+  prediccion   Compras.evaluar_modelo / predict + confusion_matrix + classification_report
+  reporte      compras: cubo + PDF de 8 páginas (un proceso); gimnasio: plot_tree a PNG
+
+Las etapas de Compras.py se llaman sin la caché de etapas.py (`__wrapped__`).
+De cada etapa queda el mejor tiempo de `--repeticiones` y la memoria pico del
+proceso al terminarla (acumulada: RSS máximo hasta ese punto). También quedan
+la exactitud y el AUC sobre el conjunto de prueba. Todo va a un JSON con
+claves ordenadas, para comparar versiones con `--anterior` o con diff.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import ingesta
+import sinteticos
+from arbol_por_bloques import en_proceso_nuevo, memoria_pico_mb
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_DATOS = os.path.join(CARPETA, ".cache_bench")
+TAMANOS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+MAX_FILAS_REPORTE = 10 ** 7
+ETAPAS = ["carga", "codificacion", "division", "ajuste", "prediccion", "reporte"]
+
+
+def archivo_sintetico(esquema, filas, formato="csv", semilla=sinteticos.SEMILLA, carpeta=CARPETA_DATOS):
+    """Ruta del archivo sintético; se genera solo si no existe."""
+    ruta = os.path.join(carpeta, f"{esquema}_{filas}_{semilla}.{formato}")
+    if not os.path.exists(ruta):
+        os.makedirs(carpeta, exist_ok=True)
+        print(f"   generando {os.path.basename(ruta)}...")
+        sinteticos.escribir(ruta, esquema, filas, semilla)
+    return ruta
+
+
+def _leer(ruta):
+    if ruta.endswith(".parquet"):
+        return pd.read_parquet(ruta)
+    return pd.read_csv(ruta)
+
+
+def _etapas_compras(ruta, con_reporte):
+    import Compras
+    df = yield "carga", lambda: _leer(ruta)
+    df = yield "codificacion", lambda: ingesta.codificar_clientes(df)
+    division = yield "division", lambda: Compras.dividir_datos.__wrapped__(
+        df, Compras.FEATURES, Compras.TEST_SIZE, Compras.RANDOM_STATE)
+    modelo = yield "ajuste", lambda: Compras.entrenar_modelo.__wrapped__(division, Compras.PARAMETROS_MODELO)
+    evaluacion = yield "prediccion", lambda: Compras.evaluar_modelo.__wrapped__(modelo, division)
+    if con_reporte:
+        def reporte():
+            with tempfile.TemporaryDirectory() as carpeta:
+                ruta_pdf = os.path.join(carpeta, "reporte.pdf")
+                cubo = Compras.armar_cubo.__wrapped__(df, Compras.BORDES_EDAD, Compras.GRUPOS_EDAD)
+                Compras.generar_reporte_completo(df, modelo, evaluacion, cubo, ruta_pdf, procesos=1)
+                return os.path.getsize(ruta_pdf)
+        yield "reporte", reporte
+    yield None, (modelo, division["X_test"], division["y_test"])
+
+
+def _etapas_gimnasio(ruta, con_reporte):
+    import Ejercicio
+    from sklearn.metrics import classification_report, confusion_matrix
+    from sklearn.tree import DecisionTreeClassifier
+    df = yield "carga", lambda: _leer(ruta)
+    df = yield "codificacion", lambda: ingesta.codificar_gimnasio(df)
+    X_train, X_test, y_train, y_test = yield "division", lambda: Ejercicio.dividir_datos(df)
+    modelo = yield "ajuste", lambda: DecisionTreeClassifier(**Ejercicio.PARAMETROS_MODELO).fit(X_train, y_train)
+
+    def prediccion():
+        y_pred = modelo.predict(X_test)
+        return confusion_matrix(y_test, y_pred), classification_report(y_test, y_pred)
+    yield "prediccion", prediccion
+    if con_reporte:
+        def reporte():
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+            from sklearn.tree import plot_tree
+            fig = plt.figure(figsize=(12, 8))
+            plot_tree(modelo, feature_names=Ejercicio.FEATURES, class_names=["Activo", "Canceló"], filled=True)
+            salida = io.BytesIO()
+            fig.savefig(salida, format="png")
+            plt.close(fig)
+            return salida.tell()
+        yield "reporte", reporte
+    yield None, (modelo, X_test, y_test)
+
+
+# Cada pipeline es un generador: entrega (etapa, función sin argumentos), recibe el resultado
+# de la función y al final entrega (None, (modelo, X_test, y_test))
+PIPELINES = {"compras": _etapas_compras, "gimnasio": _etapas_gimnasio}
+
+
+def medir_pipeline(esquema, ruta, repeticiones=1, con_reporte=True):
+    """Corre las etapas `repeticiones` veces: mejor tiempo y memoria pico de cada una, y calidad del modelo."""
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")   # emojis del PDF
+    etapas = {}
+    for _ in range(repeticiones):
+        pasos = PIPELINES[esquema](ruta, con_reporte)
+        nombre, funcion = next(pasos)
+        while nombre is not None:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):   # los print de Compras.py
+                resultado = funcion()
+            segundos = time.perf_counter() - t0
+            anterior = etapas.get(nombre, {"segundos": float("inf")})
+            etapas[nombre] = {"segundos": min(segundos, anterior["segundos"]), "memoria_pico_mb": memoria_pico_mb()}
+            if nombre == "reporte":
+                etapas[nombre]["bytes"] = resultado
+            nombre, funcion = pasos.send(resultado)
+    modelo, X_test, y_test = funcion
+    calidad = {"exactitud": float(accuracy_score(y_test, modelo.predict(X_test)))}
+    if len(np.unique(y_test)) == 2:
+        calidad["auc"] = float(roc_auc_score(y_test, modelo.predict_proba(X_test)[:, 1]))
+    return {"etapas": etapas, "calidad": calidad, "filas_prueba": int(len(y_test))}
+
+
+def _version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=CARPETA,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior):
+    """Filas de (esquema, filas, etapa, segundos antes, ahora, ahora/antes) para lo que está en los dos JSON."""
+    previos = {(r["esquema"], r["filas"]): r for r in anterior["resultados"]}
+    filas = []
+    for r in actual["resultados"]:
+        previo = previos.get((r["esquema"], r["filas"]))
+        if previo is None:
+            continue
+        for etapa in ETAPAS:
+            if etapa in r["etapas"] and etapa in previo["etapas"]:
+                antes, ahora = previo["etapas"][etapa]["segundos"], r["etapas"][etapa]["segundos"]
+                filas.append((r["esquema"], r["filas"], etapa, antes, ahora, ahora / antes))
+    return filas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark por etapas de Compras.py y Ejercicio.py")
+    parser.add_argument("--esquemas", nargs="+", choices=sorted(PIPELINES), default=sorted(PIPELINES))
+    parser.add_argument("--tamanos", nargs="+", type=int, default=TAMANOS)
+    parser.add_argument("--formato", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--max-filas-reporte", type=int, default=MAX_FILAS_REPORTE)
+    parser.add_argument("--semilla", type=int, default=sinteticos.SEMILLA)
+    parser.add_argument("--carpeta", default=CARPETA_DATOS, help="dónde guardar los archivos sintéticos")
+    parser.add_argument("--salida", default="bench_pipelines.json")
+    parser.add_argument("--anterior", help="JSON de una corrida anterior para comparar tiempos")
+    args = parser.parse_args()
+    # medir_pipeline se toma del módulo importado para poder mandarla al proceso nuevo
+    import bench_pipelines
+
+    informe = {
+        "version": _version(),
+        "fecha": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(),
+                    "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__,
+                    "cpus": os.cpu_count()},
+        "parametros": {"formato": args.formato, "repeticiones": args.repeticiones, "semilla": args.semilla,
+                       "max_filas_reporte": args.max_filas_reporte},
+        "resultados": [],
+    }
+    print()
+    for esquema in args.esquemas:
+        for filas in args.tamanos:
+            ruta = archivo_sintetico(esquema, filas, args.formato, args.semilla, args.carpeta)
+            con_reporte = filas <= args.max_filas_reporte
+            medicion, segundos, pico, base = en_proceso_nuevo(bench_pipelines.medir_pipeline, esquema, ruta,
+                                                              args.repeticiones, con_reporte)
+            informe["resultados"].append({"esquema": esquema, "filas": filas, "archivo_mb": os.path.getsize(ruta) / 2 ** 20,
+                                          "memoria_base_mb": base, **medicion})
+            tiempos = "  ".join(f"{e} {medicion['etapas'][e]['segundos']:.3f}s" for e in ETAPAS if e in medicion["etapas"])
+            print(f" {esquema:<9}{filas:>11,} filas  {tiempos}  pico {pico:,.0f} MB  "
+                  f"exactitud {medicion['calidad']['exactitud']:.3f}")
+            with open(args.salida, "w", encoding="utf-8") as f:   # se reescribe tras cada tamaño
+                json.dump(informe, f, indent=2, sort_keys=True)
+
+    print(f"\n✅ Resultados en '{args.salida}'")
+    if args.anterior:
+        with open(args.anterior, encoding="utf-8") as f:
+            filas_comparadas = comparar(informe, json.load(f))
+        print(f"\n Comparación con {args.anterior} (ahora / antes: < 1 es más rápido)\n")
+        print(f" {'esquema':<10}{'filas':>11}  {'etapa':<13}{'antes':>9}{'ahora':>9}{'relación':>10}")
+        for esquema, filas, etapa, antes, ahora, relacion in filas_comparadas:
+            print(f" {esquema:<10}{filas:>11,}  {etapa:<13}{antes:>9.3f}{ahora:>9.3f}{relacion:>9.2f}x")
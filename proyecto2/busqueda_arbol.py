@@ -0,0 +1,229 @@
+# para ejecutar : py busqueda_arbol.py --datos compras   (o --datos gimnasio)
+"""Búsqueda de hiperparámetros del árbol con validación cruzada y successive halving.
+
+Compras.py (max_depth=3) y Ejercicio.py (max_depth=4) evalúan una sola
+configuración con un único split 80/20, así que la exactitud es muy ruidosa
+(en el gimnasio da un 100% engañoso). Acá se prueban todas las combinaciones
+de GRILLA con k-fold estratificado repetido:
+
+  - ronda 0: todos los candidatos con `pliegues` folds (un k-fold completo)
+  - cada ronda siguiente: se queda el mejor 1/FACTOR y se le triplican los
+    folds (nuevas repeticiones del k-fold), hasta `pliegues * repeticiones`
+
+Los folds se reparten entre procesos (uno por núcleo). Cada resultado se
+agrega a .cache_busqueda/<datos>-<clave>.jsonl apenas termina, así que una
+búsqueda interrumpida retoma donde quedó. La clave depende de los datos, la
+grilla, la métrica y el esquema de folds.
+
+Al final muestra la tabla ordenada y guarda el mejor árbol (reentrenado con
+todos los datos) en modelos/arbol_<datos>.joblib.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import RepeatedStratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+import ingesta
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_CACHE = os.path.join(CARPETA, ".cache_busqueda")
+CARPETA_MODELOS = os.path.join(CARPETA, "modelos")
+
+GRILLA = {
+    "max_depth": [2, 3, 4, 5, 6, None],
+    "min_samples_leaf": [1, 2, 5, 10],
+    "criterion": ["gini", "entropy"],
+    "class_weight": [None, "balanced"],
+}
+FACTOR = 3
+SEMILLA = 42
+
+# Mismas variables que Compras.py / Ejercicio.py
+FEATURES_COMPRAS = ["Genero", "Edad", "Recibio_Promo", "Monto_Promo", "Total_Compras", "Ingreso_Mensual"]
+FEATURES_GIMNASIO = ["Edad", "Frecuencia_Asistencia", "Pagos_Puntuales", "Meses_Suscrito"]
+DATOS = {
+    "compras": (ingesta.leer_clientes, FEATURES_COMPRAS, "Recompra"),
+    "gimnasio": (ingesta.leer_gimnasio, FEATURES_GIMNASIO, "Canceló"),
+}
+
+
+def ruta_modelo(datos):
+    return os.path.join(CARPETA_MODELOS, f"arbol_{datos}.joblib")
+
+
+def candidatos(grilla=GRILLA):
+    nombres = list(grilla)
+    return [dict(zip(nombres, valores)) for valores in itertools.product(*grilla.values())]
+
+
+def _clave_candidato(parametros):
+    return json.dumps(parametros, sort_keys=True)
+
+
+# Estado de cada proceso (se carga una vez en el initializer)
+_X = _Y = _PLIEGUES = _METRICA = None
+
+
+def _iniciar_trabajador(X, y, pliegues, metrica):
+    global _X, _Y, _PLIEGUES, _METRICA
+    _X, _Y, _PLIEGUES, _METRICA = X, y, pliegues, metrica
+
+
+def _evaluar(parametros, indices):
+    """Entrena y puntúa un candidato en los folds indicados: [(fold, puntaje), ...]."""
+    puntuar = get_scorer(_METRICA)
+    resultados = []
+    for i in indices:
+        entrenamiento, prueba = _PLIEGUES[i]
+        modelo = DecisionTreeClassifier(random_state=SEMILLA, **parametros)
+        modelo.fit(_X[entrenamiento], _Y[entrenamiento])
+        resultados.append((i, float(puntuar(modelo, _X[prueba], _Y[prueba]))))
+    return resultados
+
+
+class CacheFolds:
+    """Puntajes por (candidato, fold) guardados en un JSONL que solo crece."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.puntajes = {}
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    if linea.strip():
+                        r = json.loads(linea)
+                        self.puntajes.setdefault(r["candidato"], {})[r["fold"]] = r["puntaje"]
+
+    def faltantes(self, parametros, n_folds):
+        hechos = self.puntajes.get(_clave_candidato(parametros), {})
+        return [i for i in range(n_folds) if i not in hechos]
+
+    def agregar(self, parametros, resultados):
+        clave = _clave_candidato(parametros)
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            for i, puntaje in resultados:
+                self.puntajes.setdefault(clave, {})[i] = puntaje
+                f.write(json.dumps({"candidato": clave, "fold": i, "puntaje": puntaje}) + "\n")
+
+    def resumen(self, parametros, n_folds):
+        valores = [self.puntajes[_clave_candidato(parametros)][i] for i in range(n_folds)]
+        return float(np.mean(valores)), float(np.std(valores))
+
+
+def buscar(X, y, pliegues=5, repeticiones=9, metrica="accuracy", procesos=None, ruta_cache=None, grilla=GRILLA):
+    """Successive halving sobre la grilla. Devuelve la tabla ordenada (DataFrame)."""
+    esquema = list(RepeatedStratifiedKFold(n_splits=pliegues, n_repeats=repeticiones,
+                                           random_state=SEMILLA).split(X, y))
+    cache = CacheFolds(ruta_cache) if ruta_cache else CacheFolds(os.devnull)
+    procesos = procesos or os.cpu_count() or 1
+
+    vivos = candidatos(grilla)
+    n_folds = pliegues
+    evaluados = {}   # clave -> (parámetros, folds de su última ronda)
+    ronda = 0
+    pool = None
+    if procesos > 1:
+        pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                   initargs=(X, y, esquema, metrica))
+    else:
+        _iniciar_trabajador(X, y, esquema, metrica)
+    try:
+        while True:
+            pendientes = [(c, cache.faltantes(c, n_folds)) for c in vivos]
+            pendientes = [(c, f) for c, f in pendientes if f]
+            en_cache = len(vivos) - len(pendientes)
+            t0 = time.perf_counter()
+            if pool is None:
+                for c, faltan in pendientes:
+                    cache.agregar(c, _evaluar(c, faltan))
+            else:
+                futuros = {pool.submit(_evaluar, c, faltan): c for c, faltan in pendientes}
+                for futuro in as_completed(futuros):
+                    cache.agregar(futuros[futuro], futuro.result())
+            print(f"   ronda {ronda}: {len(vivos)} candidatos x {n_folds} folds "
+                  f"({en_cache} ya en caché) en {time.perf_counter() - t0:.2f} s")
+
+            for c in vivos:
+                evaluados[_clave_candidato(c)] = (c, n_folds)
+            if n_folds >= len(esquema) or len(vivos) <= 1:
+                break
+            # Orden estable: ante empate gana el que aparece antes en la grilla (árboles más simples)
+            vivos.sort(key=lambda c: -cache.resumen(c, n_folds)[0])
+            vivos = vivos[:max(1, math.ceil(len(vivos) / FACTOR))]
+            n_folds = min(n_folds * FACTOR, len(esquema))
+            ronda += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    filas = []
+    for c, n in evaluados.values():
+        media, desvio = cache.resumen(c, n)
+        filas.append({**c, "folds": n, metrica: round(media, 4), "desvio": round(desvio, 4)})
+    # dtype object para que max_depth=None y los enteros se vean (y se guarden) tal cual
+    tabla = pd.DataFrame(filas, dtype=object).astype({"folds": int, metrica: float, "desvio": float})
+    tabla = tabla.sort_values(["folds", metrica, "desvio"], ascending=[False, False, True], kind="stable")
+    tabla.insert(0, "puesto", range(1, len(tabla) + 1))
+    return tabla.reset_index(drop=True)
+
+
+def guardar_mejor(tabla, X, y, features, datos, metrica):
+    """Reentrena el mejor candidato con todos los datos y lo guarda con sus metadatos."""
+    mejor = tabla.iloc[0]
+    parametros = {k: mejor[k] for k in GRILLA}
+    modelo = DecisionTreeClassifier(random_state=SEMILLA, **parametros).fit(X, y)
+    os.makedirs(CARPETA_MODELOS, exist_ok=True)
+    ruta = ruta_modelo(datos)
+    joblib.dump({
+        "modelo": modelo,
+        "features": features,
+        "parametros": parametros,
+        "metrica": metrica,
+        "puntaje_cv": float(mejor[metrica]),
+        "folds": int(mejor["folds"]),
+    }, ruta)
+    return ruta, parametros
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros del árbol de decisión")
+    parser.add_argument("--datos", choices=list(DATOS), default="compras")
+    parser.add_argument("--pliegues", type=int, default=5)
+    parser.add_argument("--repeticiones", type=int, default=9, help="repeticiones del k-fold para la última ronda")
+    parser.add_argument("--metrica", default="accuracy", help="scorer de sklearn (accuracy, balanced_accuracy, f1, ...)")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    leer, features, objetivo = DATOS[args.datos]
+    df = leer()
+    X = df[features].to_numpy(dtype=float)
+    y = df[objetivo].to_numpy()
+
+    clave = hashlib.md5(json.dumps([
+        int(pd.util.hash_pandas_object(df[features + [objetivo]], index=False).sum()),
+        GRILLA, args.metrica, args.pliegues, args.repeticiones, SEMILLA,
+    ]).encode("utf-8")).hexdigest()
+    os.makedirs(CARPETA_CACHE, exist_ok=True)
+    ruta_cache = os.path.join(CARPETA_CACHE, f"{args.datos}-{clave}.jsonl")
+
+    print(f"\n🔎 Búsqueda en '{args.datos}': {len(df)} filas, {len(candidatos())} candidatos, "
+          f"{args.pliegues}-fold x hasta {args.repeticiones} repeticiones, métrica {args.metrica}")
+    t0 = time.perf_counter()
+    tabla = buscar(X, y, args.pliegues, args.repeticiones, args.metrica, args.procesos, ruta_cache)
+    print(f"⏱️  Total: {time.perf_counter() - t0:.2f} s\n")
+    print(tabla.head(args.top).to_string(index=False))
+
+    ruta, parametros = guardar_mejor(tabla, X, y, features, args.datos, args.metrica)
+    print(f"\n💾 Mejor árbol {parametros} guardado en '{os.path.relpath(ruta, CARPETA)}'")
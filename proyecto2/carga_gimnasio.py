@@ -0,0 +1,89 @@
+# para ejecutar : py carga_gimnasio.py --clientes 32 --segundos 10   (con servicio_gimnasio.py corriendo)
+"""Prueba de carga del servicio de riesgo del gimnasio.
+
+Abre `--clientes` conexiones persistentes, cada una en su hilo, que mandan
+pedidos sin pausa durante `--segundos` (registros sueltos o micro-lotes de
+`--lote` socios tomados de clientes_gimnasio.csv). Informa latencia p50/p99,
+pedidos/s y filas/s, y cuántos pedidos agrupó el servicio por predict_proba.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+import Ejercicio
+
+URL = "http://127.0.0.1:8765"
+
+
+def _get(url, ruta):
+    destino = urlparse(url)
+    conexion = http.client.HTTPConnection(destino.hostname, destino.port)
+    conexion.request("GET", ruta)
+    datos = json.loads(conexion.getresponse().read())
+    conexion.close()
+    return datos
+
+
+def _cliente(url, cuerpos, fin, latencias, errores):
+    destino = urlparse(url)
+    conexion = http.client.HTTPConnection(destino.hostname, destino.port)
+    cabeceras = {"Content-Type": "application/json"}
+    i = 0
+    while time.perf_counter() < fin:
+        cuerpo = cuerpos[i % len(cuerpos)]
+        t0 = time.perf_counter()
+        conexion.request("POST", "/puntuar", cuerpo, cabeceras)
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        latencias.append(time.perf_counter() - t0)
+        if respuesta.status != 200:
+            errores.append(respuesta.status)
+        i += 1
+    conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de servicio_gimnasio.py")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--clientes", type=int, default=32, help="conexiones concurrentes")
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--lote", type=int, default=1, help="registros por pedido (1 = registro suelto)")
+    args = parser.parse_args()
+
+    socios = pd.read_csv(Ejercicio.ARCHIVO_CSV)[Ejercicio.FEATURES].to_dict("records")
+    if args.lote == 1:
+        cuerpos = [json.dumps(s) for s in socios]
+    else:
+        cuerpos = [json.dumps([socios[(i + j) % len(socios)] for j in range(args.lote)]) for i in range(len(socios))]
+    # En bytes: http.client manda encabezado y cuerpo en un solo send (evita el retardo de Nagle)
+    cuerpos = [c.encode("utf-8") for c in cuerpos]
+
+    antes = _get(args.url, "/estado")
+    latencias, errores = [], []
+    fin = time.perf_counter() + args.segundos
+    hilos = [threading.Thread(target=_cliente, args=(args.url, cuerpos, fin, latencias, errores))
+             for _ in range(args.clientes)]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    duracion = time.perf_counter() - t0
+    despues = _get(args.url, "/estado")
+
+    ms = np.array(latencias) * 1000
+    lotes = despues["lotes"] - antes["lotes"]
+    pedidos = despues["pedidos"] - antes["pedidos"]
+    print(f"\n🏋️ {args.clientes} clientes x {args.segundos:.0f} s, {args.lote} registro(s) por pedido\n")
+    print(f"  Pedidos        : {len(ms):,} ({len(errores)} con error)")
+    print(f"  Latencia p50   : {np.percentile(ms, 50):7.2f} ms")
+    print(f"  Latencia p99   : {np.percentile(ms, 99):7.2f} ms")
+    print(f"  Pedidos/s      : {len(ms) / duracion:9,.0f}")
+    print(f"  Filas/s        : {len(ms) * args.lote / duracion:9,.0f}")
+    print(f"  Pedidos x lote : {pedidos / max(1, lotes):7.2f}  ({lotes:,} predict_proba)")
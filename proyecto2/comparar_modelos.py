@@ -0,0 +1,194 @@
+# para ejecutar : py comparar_modelos.py --datos compras   (--entrada clientes.parquet para un archivo grande)
+"""Árbol, regresión logística, random forest y gradient boosting sobre los mismos folds.
+
+Compras.py y Ejercicio.py evalúan un solo árbol. Acá se comparan los
+MODELOS con k-fold estratificado (mismos folds para todos) y se arma una
+tabla de posiciones con tiempo de ajuste, tiempo de predicción y métricas.
+
+La matriz de features ya codificada, el objetivo y el número de fold de
+cada fila se copian una sola vez a memoria compartida
+(multiprocessing.shared_memory). Cada proceso del pool abre esos bloques al
+iniciar y los usa como arrays de numpy sin copiarlos: no viajan pickleados
+en cada tarea ni en los argumentos del inicializador. Cada tarea es un
+(modelo, fold) y solo arma las filas de su fold.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+import arbol_por_bloques
+import busqueda_arbol
+
+SEMILLA = 42
+
+# Cada candidato se arma a partir del max_depth del árbol del script (Compras.py: 3, Ejercicio.py: 4)
+MODELOS = {
+    "arbol": lambda profundidad: DecisionTreeClassifier(max_depth=profundidad, random_state=SEMILLA),
+    "logistica": lambda profundidad: make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+    # Sin max_depth, con un millón de filas cada bosque ocupa ~3 GB
+    "random_forest": lambda profundidad: RandomForestClassifier(n_estimators=100, max_depth=12,
+                                                                random_state=SEMILLA, n_jobs=1),
+    "gradient_boosting": lambda profundidad: HistGradientBoostingClassifier(random_state=SEMILLA),
+}
+METRICAS = ["auc", "exactitud", "f1"]
+
+
+class MemoriaCompartida:
+    """Copia arrays de numpy a bloques de memoria compartida; los procesos los abren con `abrir`."""
+
+    def __init__(self, arrays):
+        self._bloques = []
+        self.descriptores = {}   # nombre -> (bloque, forma, dtype): es lo único que viaja a los procesos
+        for nombre, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            bloque = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=bloque.buf)[...] = array
+            self._bloques.append(bloque)
+            self.descriptores[nombre] = (bloque.name, array.shape, array.dtype.str)
+
+    @property
+    def megabytes(self):
+        return sum(b.size for b in self._bloques) / 2 ** 20
+
+    def cerrar(self):
+        for bloque in self._bloques:
+            bloque.close()
+            bloque.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+_BLOQUES = []   # abiertos mientras viva el proceso (las vistas de numpy apuntan a ellos)
+_DATOS = None
+_PROFUNDIDAD = None
+
+
+def abrir(descriptores):
+    """Vistas de numpy (sin copia) sobre los bloques de MemoriaCompartida.descriptores."""
+    arrays = {}
+    for nombre, (bloque, forma, tipo) in descriptores.items():
+        abierto = shared_memory.SharedMemory(name=bloque)
+        _BLOQUES.append(abierto)
+        arrays[nombre] = np.ndarray(forma, np.dtype(tipo), buffer=abierto.buf)
+    return arrays
+
+
+def _iniciar_trabajador(descriptores, profundidad, hilos=None):
+    global _DATOS, _PROFUNDIDAD
+    _DATOS, _PROFUNDIDAD = abrir(descriptores), profundidad
+    if hilos:
+        # Un hilo por proceso: gradient boosting usa OpenMP y con varios procesos se pisarían
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(hilos)
+
+
+def _evaluar(nombre, fold):
+    """Ajusta un modelo en todos los folds menos `fold` y lo evalúa en ese."""
+    X, y, pliegue = _DATOS["X"], _DATOS["y"], _DATOS["pliegue"]
+    prueba = pliegue == fold
+    modelo = MODELOS[nombre](_PROFUNDIDAD)
+    t0 = time.perf_counter()
+    modelo.fit(X[~prueba], y[~prueba])
+    t_ajuste = time.perf_counter() - t0
+    X_prueba, y_prueba = X[prueba], y[prueba]
+    t0 = time.perf_counter()
+    proba = modelo.predict_proba(X_prueba)
+    t_prediccion = time.perf_counter() - t0
+    y_pred = modelo.classes_[proba.argmax(axis=1)]
+    resultado = {"modelo": nombre, "fold": fold, "ajuste_s": t_ajuste, "prediccion_s": t_prediccion,
+                 "exactitud": accuracy_score(y_prueba, y_pred)}
+    if len(modelo.classes_) == 2:
+        positiva = modelo.classes_[1]
+        resultado["f1"] = f1_score(y_prueba, y_pred, pos_label=positiva)
+        resultado["auc"] = roc_auc_score(y_prueba == positiva, proba[:, 1])
+    return resultado
+
+
+def asignar_folds(y, pliegues=5, semilla=SEMILLA):
+    """Número de fold (0..pliegues-1) de cada fila, estratificado por y."""
+    pliegue = np.empty(len(y), dtype=np.int8)
+    for i, (_, prueba) in enumerate(StratifiedKFold(pliegues, shuffle=True, random_state=semilla).split(y, y)):
+        pliegue[prueba] = i
+    return pliegue
+
+
+def comparar(X, y, profundidad, pliegues=5, modelos=None, procesos=None):
+    """Tabla de posiciones (DataFrame) y resultados por (modelo, fold)."""
+    modelos = modelos or list(MODELOS)
+    procesos = procesos or os.cpu_count() or 1
+    tareas = [(m, f) for m in modelos for f in range(pliegues)]
+    resultados = []
+    with MemoriaCompartida({"X": X, "y": y, "pliegue": asignar_folds(y, pliegues)}) as compartida:
+        print(f"   memoria compartida: {compartida.megabytes:,.1f} MB, una sola copia para {procesos} proceso(s)")
+        t0 = time.perf_counter()
+        if procesos <= 1:
+            _iniciar_trabajador(compartida.descriptores, profundidad)
+            resultados = [_evaluar(*t) for t in tareas]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                     initargs=(compartida.descriptores, profundidad, 1)) as pool:
+                futuros = [pool.submit(_evaluar, *t) for t in tareas]
+                for futuro in as_completed(futuros):
+                    resultados.append(futuro.result())
+        print(f"   {len(tareas)} ajustes ({len(modelos)} modelos x {pliegues} folds) en {time.perf_counter() - t0:.2f} s")
+
+    folds = pd.DataFrame(resultados).sort_values(["modelo", "fold"]).reset_index(drop=True)
+    metricas = [m for m in METRICAS if m in folds.columns]
+    tabla = folds.groupby("modelo").agg(
+        **{m: (m, "mean") for m in metricas},
+        desvio=(metricas[0], "std"),
+        ajuste_s=("ajuste_s", "mean"),
+        prediccion_s=("prediccion_s", "mean"),
+    )
+    tabla = tabla.sort_values([metricas[0], "ajuste_s"], ascending=[False, True]).reset_index()
+    tabla.insert(0, "puesto", range(1, len(tabla) + 1))
+    return tabla, folds
+
+
+def cargar(datos, entrada=None):
+    """(X, y) codificados: el archivo de ejemplo de cada script o un CSV/Parquet con sus columnas."""
+    codificar, features, objetivo, _ = arbol_por_bloques.DATOS[datos]
+    if entrada is None:
+        df = busqueda_arbol.DATOS[datos][0]()
+    elif entrada.lower().endswith(".parquet"):
+        df = codificar(pd.read_parquet(entrada, columns=features + [objetivo]))
+    else:
+        df = codificar(pd.read_csv(entrada, usecols=features + [objetivo]))
+    return df[features].to_numpy(dtype=np.float64), df[objetivo].to_numpy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara árbol, logística, random forest y gradient boosting")
+    parser.add_argument("--datos", choices=sorted(arbol_por_bloques.DATOS), default="compras")
+    parser.add_argument("--entrada", help="CSV o Parquet con las columnas del script (por defecto, el de ejemplo)")
+    parser.add_argument("--pliegues", type=int, default=5)
+    parser.add_argument("--modelos", nargs="+", choices=list(MODELOS), default=list(MODELOS))
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--salida", help="CSV con la tabla de posiciones")
+    args = parser.parse_args()
+
+    X, y = cargar(args.datos, args.entrada)
+    profundidad = arbol_por_bloques.DATOS[args.datos][3]
+    print(f"\n🏁 Comparando {len(args.modelos)} modelos en '{args.datos}': {len(y):,} filas, {args.pliegues} folds")
+    tabla, _ = comparar(X, y, profundidad, args.pliegues, args.modelos, args.procesos)
+    print()
+    print(tabla.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if args.salida:
+        tabla.to_csv(args.salida, index=False)
+        print(f"\n✅ Tabla guardada en '{args.salida}'")
@@ -0,0 +1,175 @@
+# para ejecutar : py compilar_arbol.py modelos/arbol_gimnasio.joblib arbol_gimnasio_compilado.py
+"""Compila un DecisionTreeClassifier entrenado a un módulo Python independiente.
+
+El código generado solo importa numpy (nada de sklearn) y trae:
+
+  - hoja(registro) / predecir_proba_registro / predecir_registro: un registro
+    (dict o Series) recorre el árbol con if/else de Python puro.
+  - hojas(X) / predecir_proba / predecir: un lote (matriz o DataFrame con las
+    columnas FEATURES). Árboles chicos (hasta MAX_NODOS_WHERE nodos): np.where
+    anidados sobre cada columna contigua. Árboles más grandes: recorrido por
+    niveles con tablas de nodos (np.where anidados evalúan todos los nodos
+    para todas las filas y con profundidad 10 son ~10x más lentos).
+    La probabilidad y la clase salen de tablas por hoja.
+
+sklearn compara float32(x) <= umbral. Para dar exactamente lo mismo sin
+convertir la entrada, cada umbral se reemplaza por el mayor float64 u tal
+que x <= u equivale a float32(x) <= umbral (ver _umbral_equivalente).
+No contempla valores faltantes (el árbol se entrenó sin nulos).
+"""
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+HOJA = -1   # tree_.children_left de una hoja (sklearn.tree._tree.TREE_LEAF)
+MAX_NODOS_WHERE = 31   # árbol completo de profundidad 4
+
+
+def _umbral_equivalente(umbral):
+    """Mayor float64 u tal que, para todo x float64, x <= u  <=>  float32(x) <= umbral."""
+    a = np.float32(umbral)
+    if float(a) > umbral:
+        a = np.nextafter(a, np.float32(-np.inf))
+    b = np.nextafter(a, np.float32(np.inf))
+    medio = (float(a) + float(b)) / 2   # exacto en float64
+    # En el punto medio float32() redondea al par: si `a` es impar, el medio ya sube a `b`
+    par = int(a.view(np.uint32)) % 2 == 0
+    return medio if par else float(np.nextafter(medio, -np.inf))
+
+
+def _lote_where(arbol, features, hojas):
+    """hojas(X) con np.where anidados; cada columna usada se copia contigua una vez."""
+    def _where(nodo):
+        if arbol.children_left[nodo] == HOJA:
+            return str(hojas[nodo])
+        umbral = repr(_umbral_equivalente(arbol.threshold[nodo]))
+        return (f"np.where(c{arbol.feature[nodo]} <= {umbral}, "
+                f"{_where(arbol.children_left[nodo])}, {_where(arbol.children_right[nodo])})")
+
+    usadas = sorted({int(f) for f in arbol.feature[arbol.children_left != HOJA]})
+    de_tabla = "".join(f"\n        c{j} = np.asarray(X[{features[j]!r}], dtype=np.float64)" for j in usadas)
+    de_matriz = "".join(f"\n        c{j} = np.ascontiguousarray(X[:, {j}])" for j in usadas)
+    expresion = _where(0) if arbol.node_count > 1 else "np.zeros(len(X), dtype=np.intp)"
+    return f'''def hojas(X):
+    """Número de hoja de cada fila de X (matriz en el orden de FEATURES, o DataFrame)."""
+    if hasattr(X, "columns"):{de_tabla or " pass"}
+    else:
+        X = np.asarray(X, dtype=np.float64){de_matriz}
+    return {expresion}'''
+
+
+def _lote_niveles(arbol, hojas):
+    """hojas(X) recorriendo el árbol por niveles: las hojas apuntan a sí mismas."""
+    nodos = np.arange(arbol.node_count)
+    es_hoja = arbol.children_left == HOJA
+    izquierda = np.where(es_hoja, nodos, arbol.children_left)
+    derecha = np.where(es_hoja, nodos, arbol.children_right)
+    columna = np.where(es_hoja, 0, arbol.feature)
+    umbral = [0.0 if h else _umbral_equivalente(u) for h, u in zip(es_hoja, arbol.threshold)]
+    hoja_de_nodo = [hojas.get(n, -1) for n in range(arbol.node_count)]
+    return f'''_IZQUIERDA = np.array({izquierda.tolist()!r})
+_DERECHA = np.array({derecha.tolist()!r})
+_COLUMNA = np.array({columna.tolist()!r})
+_UMBRAL = np.array({umbral!r})
+_HOJA_DE_NODO = np.array({hoja_de_nodo!r})
+PROFUNDIDAD = {arbol.max_depth}
+
+
+def hojas(X):
+    """Número de hoja de cada fila de X (matriz en el orden de FEATURES, o DataFrame)."""
+    if hasattr(X, "columns"):
+        X = X[FEATURES]
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    plano = X.ravel()
+    inicio_fila = np.arange(len(X)) * X.shape[1]
+    nodo = np.zeros(len(X), dtype=np.intp)
+    for _ in range(PROFUNDIDAD):
+        nodo = np.where(plano[inicio_fila + _COLUMNA[nodo]] <= _UMBRAL[nodo], _IZQUIERDA[nodo], _DERECHA[nodo])
+    return _HOJA_DE_NODO[nodo]'''
+
+
+def generar_codigo(modelo, features, origen="modelo"):
+    """Código fuente del evaluador (str) para un DecisionTreeClassifier entrenado."""
+    arbol = modelo.tree_
+    if arbol.n_outputs != 1:
+        raise ValueError("Solo árboles de una salida")
+    if len(features) != arbol.n_features:
+        raise ValueError(f"El árbol usa {arbol.n_features} features y se pasaron {len(features)}")
+    # Hojas numeradas 0..n-1 en el orden de los nodos del árbol
+    nodos_hoja = np.flatnonzero(arbol.children_left == HOJA)
+    hojas = {int(nodo): i for i, nodo in enumerate(nodos_hoja)}
+    valores = arbol.value[nodos_hoja, 0, :]
+    proba = valores / valores.sum(axis=1, keepdims=True)
+    clase_hoja = proba.argmax(axis=1)   # como predict: ante empate, la primera clase
+
+    def _python(nodo, sangria):
+        pad = "    " * sangria
+        if arbol.children_left[nodo] == HOJA:
+            return [f"{pad}return {hojas[nodo]}"]
+        col = features[arbol.feature[nodo]]
+        umbral = repr(_umbral_equivalente(arbol.threshold[nodo]))
+        return ([f"{pad}if registro[{col!r}] <= {umbral}:"]
+                + _python(arbol.children_left[nodo], sangria + 1)
+                + _python(arbol.children_right[nodo], sangria))
+
+    clases = [c.item() if hasattr(c, "item") else c for c in modelo.classes_]
+    return f'''"""Árbol compilado por compilar_arbol.py desde {origen}: no editar a mano.
+
+Profundidad {modelo.get_depth()}, {len(hojas)} hojas. Solo requiere numpy.
+"""
+import numpy as np
+
+FEATURES = {list(features)!r}
+CLASES = {clases!r}
+PROBA_HOJA = {proba.tolist()!r}
+CLASE_HOJA = {clase_hoja.tolist()!r}
+_PROBA = np.array(PROBA_HOJA)
+_CLASES = np.array(CLASES)
+_CLASE_HOJA = np.array(CLASE_HOJA)
+
+
+def hoja(registro):
+    """Número de hoja de un registro (dict o Series con las FEATURES)."""
+{chr(10).join(_python(0, 1))}
+
+
+def predecir_proba_registro(registro):
+    return PROBA_HOJA[hoja(registro)]
+
+
+def predecir_registro(registro):
+    return CLASES[CLASE_HOJA[hoja(registro)]]
+
+
+{_lote_where(arbol, features, hojas) if arbol.node_count <= MAX_NODOS_WHERE else _lote_niveles(arbol, hojas)}
+
+
+def predecir_proba(X):
+    return _PROBA[hojas(X)]
+
+
+def predecir(X):
+    return _CLASES[_CLASE_HOJA[hojas(X)]]
+'''
+
+
+def compilar(modelo, features, origen="modelo"):
+    """Ejecuta el código generado y devuelve su espacio de nombres (dict con hoja, predecir, ...)."""
+    espacio = {}
+    exec(compile(generar_codigo(modelo, features, origen), f"<árbol {origen}>", "exec"), espacio)
+    return espacio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compila un árbol guardado a un módulo Python sin sklearn")
+    parser.add_argument("modelo", help="joblib de busqueda_arbol.py (dict con 'modelo' y 'features')")
+    parser.add_argument("salida", help="archivo .py a generar")
+    args = parser.parse_args()
+
+    guardado = joblib.load(args.modelo)
+    codigo = generar_codigo(guardado["modelo"], guardado["features"], os.path.basename(args.modelo))
+    with open(args.salida, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    print(f"✅ {args.salida}: {codigo.count(chr(10))} líneas, sin dependencia de sklearn")
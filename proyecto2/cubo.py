@@ -0,0 +1,114 @@
+"""Cubo OLAP chico: conteo y sumas para todas las combinaciones de dimensiones.
+
+Cada dimensión llega como códigos enteros 0..k-1 (ver codigos_categoria y
+codigos_intervalo; -1 = nulo / fuera de rango). El cubo se arma en una sola
+pasada: el código combinado de cada fila (ravel_multi_index) y un bincount
+por medida. Después cualquier marginal o corte sale del arreglo del cubo,
+sin volver a los datos:
+
+    cubo = Cubo({"Genero": (codigos, [0, 1]), ...}, {"Recompra": df["Recompra"]})
+    cubo.media("Recompra")                           # tasa global
+    cubo.media("Recompra", Recibio_Promo=1)          # con promoción
+    cubo.media("Recompra", por="Grupo_Edad")         # Series por grupo
+    cubo.conteo(por=("Genero", "Recompra"))          # Series con MultiIndex
+
+Cada dimensión tiene una posición extra para los nulos: cuentan en los
+totales pero no aparecen en las Series por dimensión (como groupby, que
+descarta los NaN de la clave).
+"""
+import numpy as np
+import pandas as pd
+
+# Valores enteros con un rango menor a esto se codifican con una tabla (un índice por fila)
+MAX_RANGO_TABLA = 1 << 20
+
+
+def codigos_categoria(valores, categorias):
+    """Posición de cada valor en `categorias` (-1 si no está o es nulo)."""
+    categorias = np.asarray(categorias)
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.integer) and np.array_equal(categorias, np.arange(len(categorias))):
+        # Categorías 0..k-1 sobre una columna entera: el valor ya es el código
+        return np.where((valores >= 0) & (valores < len(categorias)), valores, -1)
+    orden = np.argsort(categorias, kind="stable")
+    ordenadas = categorias[orden]
+    pos = np.clip(np.searchsorted(ordenadas, valores), 0, len(ordenadas) - 1)
+    return np.where(ordenadas[pos] == valores, orden[pos], -1)
+
+
+def codigos_intervalo(valores, bordes):
+    """Índice del intervalo (bordes[i], bordes[i+1]] de cada valor, como pd.cut (-1 si queda afuera)."""
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.integer) and len(valores):
+        minimo, maximo = int(valores.min()), int(valores.max())
+        if maximo - minimo < MAX_RANGO_TABLA:
+            # Enteros de rango chico (ej. edades): se codifica cada valor posible una vez
+            tabla = codigos_intervalo(np.arange(minimo, maximo + 1, dtype=np.float64), bordes)
+            return tabla[valores - minimo]
+    valores = valores.astype(np.float64)
+    codigo = np.searchsorted(bordes, valores, side="left") - 1
+    return np.where((codigo >= 0) & (codigo < len(bordes) - 1), codigo, -1)
+
+
+class Cubo:
+    def __init__(self, dimensiones, medidas):
+        """`dimensiones`: {nombre: (códigos, etiquetas)}; `medidas`: {nombre: valores numéricos}."""
+        self.nombres = list(dimensiones)
+        self.etiquetas = {nombre: list(etiquetas) for nombre, (_, etiquetas) in dimensiones.items()}
+        forma = tuple(len(e) + 1 for e in self.etiquetas.values())   # +1: posición de nulos
+        columnas = []
+        for (codigos, etiquetas) in dimensiones.values():
+            codigos = np.asarray(codigos, dtype=np.int64)
+            columnas.append(np.where((codigos >= 0) & (codigos < len(etiquetas)), codigos, len(etiquetas)))
+        plano = np.ravel_multi_index(columnas, forma)
+        tam = int(np.prod(forma))
+        self.n = np.bincount(plano, minlength=tam).reshape(forma)
+        self.sumas = {nombre: np.bincount(plano, weights=np.asarray(valores, dtype=np.float64),
+                                          minlength=tam).reshape(forma)
+                      for nombre, valores in medidas.items()}
+
+    def _posicion(self, dimension, valor):
+        try:
+            return self.etiquetas[dimension].index(valor)
+        except KeyError:
+            raise KeyError(f"Dimensión desconocida: {dimension} (hay {', '.join(self.nombres)})")
+        except ValueError:
+            raise KeyError(f"{dimension} no tiene el valor {valor!r} (hay {self.etiquetas[dimension]})")
+
+    def _reducir(self, arreglo, por, fijas):
+        """Suma `arreglo` fijando `fijas` y dejando solo los ejes de `por` (escalar si por=None)."""
+        por = () if por is None else (por,) if isinstance(por, str) else tuple(por)
+        for nombre in (*por, *fijas):
+            if nombre not in self.etiquetas:
+                raise KeyError(f"Dimensión desconocida: {nombre} (hay {', '.join(self.nombres)})")
+        indice = tuple(self._posicion(n, fijas[n]) if n in fijas else slice(None) for n in self.nombres)
+        restantes = [n for n in self.nombres if n not in fijas]
+        corte = arreglo[indice]
+        otros = tuple(i for i, n in enumerate(restantes) if n not in por)
+        corte = corte.sum(axis=otros) if otros else corte
+        if not por:
+            return float(corte)
+        # Ejes en el orden de `por` y sin la posición de nulos
+        quedan = [n for n in restantes if n in por]
+        corte = np.transpose(corte, [quedan.index(n) for n in por])
+        corte = corte[tuple(slice(0, len(self.etiquetas[n])) for n in por)]
+        if len(por) == 1:
+            indice = pd.Index(self.etiquetas[por[0]], name=por[0])
+        else:
+            indice = pd.MultiIndex.from_product([self.etiquetas[n] for n in por], names=list(por))
+        return pd.Series(corte.ravel(), index=indice)
+
+    def conteo(self, por=None, **fijas):
+        resultado = self._reducir(self.n, por, fijas)
+        return int(resultado) if por is None else resultado.astype(np.int64)
+
+    def suma(self, medida, por=None, **fijas):
+        return self._reducir(self.sumas[medida], por, fijas)
+
+    def media(self, medida, por=None, **fijas):
+        """Promedio de la medida; por dimensión solo quedan las celdas con filas (como observed=True)."""
+        n = self._reducir(self.n, por, fijas)
+        suma = self._reducir(self.sumas[medida], por, fijas)
+        if por is None:
+            return suma / n if n else float("nan")
+        return (suma / n)[n > 0]
@@ -0,0 +1,137 @@
+"""Etapas cacheadas en disco para los análisis de proyecto2.
+
+Cada etapa es una función decorada con `@etapa`. Llamarla no la ejecuta:
+devuelve un `Resultado` cuya clave combina el código de la función, sus
+parámetros, sus dependencias declaradas y las claves de las etapas de
+entrada. El valor se calcula (o se lee de .cache_etapas/) recién cuando
+alguien lo pide con `.valor`, así que si una etapa posterior ya está en
+disco las anteriores ni se cargan.
+
+    datos = cargar(Archivo("datos.xlsx"))
+    modelo = entrenar(datos, max_depth=3)
+    modelo.valor   # entrena una vez; en la próxima corrida lo lee del disco
+
+La clave solo ve el código de la propia función. Lo que use por fuera
+(funciones auxiliares, diccionarios de otro módulo) se declara con
+`@etapa(depende=[funcion, CONSTANTE, ...])`: de las funciones y módulos
+entra su código y del resto su repr al momento de llamar. Una constante que
+se pueda reasignar conviene pasarla como parámetro. `version="2"` fuerza una
+clave nueva cuando el cambio no se ve en ningún código.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import time
+
+import joblib
+
+CARPETA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_etapas")
+# Desactivar con la variable de entorno PROYECTO2_SIN_CACHE=1 (o usar_cache(False))
+_USAR_CACHE = os.environ.get("PROYECTO2_SIN_CACHE", "") in ("", "0")
+
+
+def usar_cache(activo=True):
+    global _USAR_CACHE
+    _USAR_CACHE = activo
+
+
+def _md5(*partes):
+    h = hashlib.md5()
+    for parte in partes:
+        h.update(str(parte).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def huella_archivo(ruta, bloque=1024 * 1024):
+    """md5 del contenido del archivo (cambia si cambia el archivo, no si solo se toca la fecha)."""
+    h = hashlib.md5()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+class Archivo:
+    """Archivo de entrada de una etapa: su clave es el hash del contenido y su valor la ruta."""
+
+    def __init__(self, ruta):
+        self.valor = ruta
+        self.clave = huella_archivo(ruta)
+
+
+class Resultado:
+    """Salida (perezosa) de una etapa."""
+
+    def __init__(self, nombre, clave, calcular):
+        self.nombre = nombre
+        self.clave = clave
+        self._calcular = calcular
+        self._listo = False
+        self._valor = None
+
+    @property
+    def ruta(self):
+        return os.path.join(CARPETA_CACHE, f"{self.nombre}-{self.clave}.joblib")
+
+    @property
+    def en_cache(self):
+        return _USAR_CACHE and os.path.exists(self.ruta)
+
+    @property
+    def valor(self):
+        if not self._listo:
+            t0 = time.perf_counter()
+            if self.en_cache:
+                self._valor = joblib.load(self.ruta)
+                print(f"   ⚡ {self.nombre}: desde caché ({time.perf_counter() - t0:.2f} s)")
+            else:
+                self._valor = self._calcular()
+                print(f"   ⚙️  {self.nombre}: ejecutada ({time.perf_counter() - t0:.2f} s)")
+                if _USAR_CACHE:
+                    os.makedirs(CARPETA_CACHE, exist_ok=True)
+                    temporal = self.ruta + ".tmp"
+                    joblib.dump(self._valor, temporal)
+                    os.replace(temporal, self.ruta)
+            self._listo = True
+        return self._valor
+
+
+def _clave_de(valor):
+    if isinstance(valor, (Resultado, Archivo)):
+        return valor.clave
+    return repr(valor)
+
+
+def _valor_de(valor):
+    return valor.valor if isinstance(valor, (Resultado, Archivo)) else valor
+
+
+def huella_dependencia(dependencia):
+    """Código de una función/clase/módulo, o repr de cualquier otro valor."""
+    if inspect.isfunction(dependencia) or inspect.ismodule(dependencia) or inspect.isclass(dependencia):
+        return _md5(inspect.getsource(dependencia))
+    return repr(dependencia)
+
+
+def etapa(funcion=None, *, depende=(), version=None):
+    """Decorador: convierte la función en una etapa cacheada (ver docstring del módulo).
+
+    Se usa como `@etapa` o `@etapa(depende=[...], version="...")`.
+    """
+    if funcion is None:
+        return functools.partial(etapa, depende=depende, version=version)
+    codigo = _md5(inspect.getsource(funcion))
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        clave = _md5(funcion.__name__, codigo, version,
+                     *[huella_dependencia(d) for d in depende],
+                     *[_clave_de(a) for a in args],
+                     *[f"{k}={_clave_de(v)}" for k, v in sorted(kwargs.items())])
+
+        def calcular():
+            return funcion(*[_valor_de(a) for a in args], **{k: _valor_de(v) for k, v in kwargs.items()})
+        return Resultado(funcion.__name__, clave, calcular)
+    return envoltura
@@ -0,0 +1,167 @@
+# para ejecutar : py ingesta.py   (convierte el Excel y compara tiempos de lectura)
+"""Ingesta del Excel de clientes a una caché columnar tipada.
+
+`pd.read_excel` (openpyxl) es de las lecturas más lentas de pandas. La
+primera vez se lee el libro, se aplican las codificaciones de Compras.py
+(Genero F/M -> 0/1, Recibio_Promo y Recompra Si/No -> 1/0, sin filas con
+Recompra nula) y se guarda en .cache_ingesta/ como Parquet (o Feather).
+Las lecturas siguientes van directo a ese archivo.
+
+La caché se invalida cuando cambia el libro: si tamaño y fecha coinciden con
+los guardados se usa sin más; si no, se compara el md5 del contenido (así
+copiar o tocar el archivo sin cambiarlo no obliga a reconvertir). También se
+invalida si cambian CODIFICACIONES o el código que las aplica (ver
+huella_codificacion).
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from etapas import huella_archivo, huella_dependencia
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_CACHE = os.path.join(CARPETA, ".cache_ingesta")
+ARCHIVO_EXCEL = os.path.join(CARPETA, "Mini_Proyecto_Clientes_Promociones.xlsx")
+ARCHIVO_GIMNASIO = os.path.join(CARPETA, "clientes_gimnasio.csv")
+FORMATO = "parquet"   # "parquet" o "feather" (ambos requieren pyarrow)
+
+CODIFICACIONES = {
+    "Genero": {"F": 0, "M": 1},
+    "Recibio_Promo": {"Si": 1, "No": 0},
+    "Recompra": {"Si": 1, "No": 0},
+}
+PAGOS_PUNTUALES = {"Sí": 1, "No": 0}   # clientes_gimnasio.csv
+
+
+def codificar_columnas(df):
+    """Aplica en el lugar las CODIFICACIONES a las columnas de texto presentes en df.
+
+    Las columnas ausentes (ej. Recompra al puntuar clientes nuevos) o ya
+    numéricas quedan igual; un valor desconocido queda como nulo.
+    """
+    for col, mapa in CODIFICACIONES.items():
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].map(mapa)
+    return df
+
+
+def codificar_clientes(df):
+    """Aplica las codificaciones y descarta filas sin Recompra (igual que Compras.py)."""
+    df = codificar_columnas(df.copy())
+    df = df.dropna(subset=["Recompra"])
+    # Enteros chicos cuando no quedan nulos (una columna con nulos queda float64)
+    for col in CODIFICACIONES:
+        if not df[col].isna().any():
+            df[col] = df[col].astype("int8")
+    return df.reset_index(drop=True)
+
+
+def codificar_gimnasio(df):
+    """Codificación de Ejercicio.py: Pagos_Puntuales Sí/No -> 1/0, sin filas con nulos."""
+    df = df.copy()
+    df["Pagos_Puntuales"] = df["Pagos_Puntuales"].map(PAGOS_PUNTUALES)
+    return df.dropna().reset_index(drop=True)
+
+
+def leer_gimnasio(ruta=ARCHIVO_GIMNASIO):
+    """Clientes del gimnasio ya codificados (CSV chico: se lee directo, sin caché)."""
+    return codificar_gimnasio(pd.read_csv(ruta))
+
+
+def huella_codificacion():
+    """md5 de CODIFICACIONES y del código de codificar_columnas/codificar_clientes."""
+    h = hashlib.md5()
+    for parte in (CODIFICACIONES, codificar_columnas, codificar_clientes):
+        h.update(huella_dependencia(parte).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _rutas(ruta_excel, formato):
+    base = os.path.splitext(os.path.basename(ruta_excel))[0]
+    datos = os.path.join(CARPETA_CACHE, f"{base}.{formato}")
+    return datos, datos + ".json"
+
+
+def _firma(ruta):
+    st = os.stat(ruta)
+    return {"tamano": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _cache_vigente(ruta_excel, ruta_datos, ruta_meta):
+    if not (os.path.exists(ruta_datos) and os.path.exists(ruta_meta)):
+        return False
+    with open(ruta_meta, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("codificacion") != huella_codificacion():
+        return False
+    firma = _firma(ruta_excel)
+    if {k: meta.get(k) for k in firma} == firma:
+        return True
+    if meta.get("md5") != huella_archivo(ruta_excel):
+        return False
+    # Mismo contenido con otra fecha: actualizar la firma para no volver a hashear
+    meta.update(firma)
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return True
+
+
+def _leer(ruta, formato):
+    if formato == "feather":
+        return pd.read_feather(ruta)
+    return pd.read_parquet(ruta)
+
+
+def _escribir(df, ruta, formato):
+    temporal = ruta + ".tmp"
+    if formato == "feather":
+        df.to_feather(temporal)
+    else:
+        df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+def leer_clientes(ruta_excel=ARCHIVO_EXCEL, formato=FORMATO):
+    """DataFrame de clientes ya codificado, desde la caché columnar si está vigente."""
+    ruta_datos, ruta_meta = _rutas(ruta_excel, formato)
+    if _cache_vigente(ruta_excel, ruta_datos, ruta_meta):
+        return _leer(ruta_datos, formato)
+
+    print(f"📥 Convirtiendo {os.path.basename(ruta_excel)} a {formato}...")
+    df = codificar_clientes(pd.read_excel(ruta_excel))
+    os.makedirs(CARPETA_CACHE, exist_ok=True)
+    _escribir(df, ruta_datos, formato)
+    meta = {**_firma(ruta_excel), "md5": huella_archivo(ruta_excel), "codificacion": huella_codificacion(),
+            "filas": len(df)}
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return df
+
+
+def _tiempo(funcion, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte el Excel de clientes a la caché columnar")
+    parser.add_argument("--excel", default=ARCHIVO_EXCEL)
+    parser.add_argument("--formato", choices=["parquet", "feather"], default=FORMATO)
+    args = parser.parse_args()
+
+    excel, t_excel = _tiempo(lambda: codificar_clientes(pd.read_excel(args.excel)))
+    leer_clientes(args.excel, args.formato)
+    cache, t_cache = _tiempo(lambda: leer_clientes(args.excel, args.formato))
+    pd.testing.assert_frame_equal(cache, excel)
+
+    print(f"\n {os.path.basename(args.excel)}: {len(cache)} filas, tipos {dict(cache.dtypes.astype(str))}\n")
+    print(f"  read_excel + codificación : {t_excel:7.3f} s")
+    print(f"  caché {args.formato:<8}          : {t_cache:7.3f} s  ({t_excel / t_cache:.1f}x)")
@@ -0,0 +1,139 @@
+# para ejecutar : py puntuar_clientes.py clientes.csv probabilidades.csv
+"""Puntúa una base de clientes completa con el modelo de recompra guardado.
+
+Lee la entrada (CSV o Parquet) por bloques de `--bloque` filas, aplica las
+mismas codificaciones que el entrenamiento (ingesta.codificar_columnas),
+calcula predict_proba del bloque entero de una vez y agrega el resultado a
+la salida (CSV o Parquet) antes de leer el siguiente. La memoria queda
+acotada por el tamaño del bloque, no por el del archivo.
+
+El modelo es el que guarda busqueda_arbol.py (modelos/arbol_compras.joblib):
+un dict con el árbol y la lista de features con que se entrenó.
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import ingesta
+from busqueda_arbol import ruta_modelo
+
+TAM_BLOQUE = 200000
+COLUMNA_ID = "Cliente_ID"
+
+
+def _extension(ruta):
+    return os.path.splitext(ruta)[1].lower()
+
+
+def leer_bloques(ruta, columnas, tam=TAM_BLOQUE):
+    """Genera DataFrames de hasta `tam` filas con las columnas pedidas que existan en el archivo."""
+    if _extension(ruta) == ".parquet":
+        import pyarrow.parquet as pq
+        # Sin pre_buffer: con él pyarrow retiene lecturas adelantadas y la memoria crece con el archivo
+        archivo = pq.ParquetFile(ruta, pre_buffer=False)
+        presentes = [c for c in columnas if c in archivo.schema_arrow.names]
+        for lote in archivo.iter_batches(batch_size=tam, columns=presentes):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, chunksize=tam, usecols=lambda c: c in columnas)
+
+
+def leer_encabezado(ruta, columnas):
+    """DataFrame sin filas con las columnas pedidas que existan en el archivo (y sus tipos)."""
+    if _extension(ruta) == ".parquet":
+        import pyarrow.parquet as pq
+        esquema = pq.read_schema(ruta)
+        return esquema.empty_table().select([c for c in columnas if c in esquema.names]).to_pandas()
+    return pd.read_csv(ruta, nrows=0, usecols=lambda c: c in columnas)
+
+
+class EscritorBloques:
+    """Agrega bloques a un CSV (con encabezado solo la primera vez) o a un Parquet.
+
+    Si no llega ningún bloque, `cerrar` escribe `vacio` (un DataFrame sin filas
+    con las columnas de la salida): queda un archivo con solo el encabezado.
+    """
+
+    def __init__(self, ruta, vacio=None):
+        self.ruta = ruta
+        self.vacio = pd.DataFrame() if vacio is None else vacio
+        self.temporal = ruta + ".tmp"
+        self._parquet = None
+        self._primero = True
+
+    def escribir(self, df):
+        if _extension(self.ruta) == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.temporal, tabla.schema)
+            self._parquet.write_table(tabla)
+        else:
+            df.to_csv(self.temporal, mode="w" if self._primero else "a", header=self._primero, index=False)
+        self._primero = False
+
+    def cerrar(self):
+        if self._primero:
+            self.escribir(self.vacio)
+        if self._parquet is not None:
+            self._parquet.close()
+        os.replace(self.temporal, self.ruta)
+
+
+def puntuar_bloque(modelo, features, df):
+    """DataFrame de salida del bloque: ID (si viene), probabilidad y predicción."""
+    ingesta.codificar_columnas(df)
+    X = df[features].to_numpy(dtype=np.float64)
+    # sklearn no acepta 0 filas: un bloque vacío da la salida vacía con las mismas columnas
+    probabilidad = modelo.predict_proba(X)[:, list(modelo.classes_).index(1)] if len(X) else np.empty(0)
+    salida = pd.DataFrame({"prob_recompra": probabilidad, "prediccion": (probabilidad >= 0.5).astype(np.int8)})
+    if COLUMNA_ID in df.columns:
+        salida.insert(0, COLUMNA_ID, df[COLUMNA_ID].to_numpy())
+    return salida, int(np.isnan(X).any(axis=1).sum())
+
+
+def puntuar_archivo(entrada, salida, ruta_modelo_guardado, tam=TAM_BLOQUE):
+    guardado = joblib.load(ruta_modelo_guardado)
+    modelo, features = guardado["modelo"], guardado["features"]
+    encabezado = leer_encabezado(entrada, features + [COLUMNA_ID])
+    faltan = [c for c in features if c not in encabezado.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas en {entrada}: {', '.join(faltan)}")
+    # Si la entrada no tiene filas la salida queda con el mismo encabezado que con filas
+    escritor = EscritorBloques(salida, vacio=puntuar_bloque(modelo, features, encabezado)[0])
+    filas = incompletas = bloques = 0
+    t0 = time.perf_counter()
+    for df in leer_bloques(entrada, features + [COLUMNA_ID], tam):
+        if df.empty:   # archivo con solo el encabezado: sklearn no acepta 0 filas
+            continue
+        resultado, nulos = puntuar_bloque(modelo, features, df)
+        escritor.escribir(resultado)
+        filas += len(df)
+        incompletas += nulos
+        bloques += 1
+        segundos = time.perf_counter() - t0
+        print(f"   bloque {bloques}: {filas:,} filas ({filas / segundos:,.0f} filas/s)")
+    escritor.cerrar()
+    return filas, incompletas, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilidad de recompra para una base de clientes")
+    parser.add_argument("entrada", help="CSV o Parquet con las columnas de Compras.py")
+    parser.add_argument("salida", help="CSV o Parquet de salida")
+    parser.add_argument("--modelo", default=ruta_modelo("compras"))
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE)
+    args = parser.parse_args()
+    if not os.path.exists(args.modelo):
+        parser.error(f"No existe {args.modelo}: generarlo con 'python busqueda_arbol.py --datos compras'")
+
+    print(f"\n🎯 Puntuando {args.entrada} en bloques de {args.bloque:,} filas...")
+    filas, incompletas, segundos = puntuar_archivo(args.entrada, args.salida, args.modelo, args.bloque)
+    print(f"\n✅ {filas:,} filas en {segundos:.2f} s ({filas / max(segundos, 1e-9):,.0f} filas/s) -> '{args.salida}'")
+    if incompletas:
+        print(f"⚠️  {incompletas:,} filas con valores faltantes o códigos desconocidos")
@@ -0,0 +1,203 @@
+# para ejecutar : py servicio_gimnasio.py --puerto 8765
+"""Servicio HTTP local con el riesgo de cancelación de los socios del gimnasio.
+
+El árbol se entrena (Ejercicio.entrenar_modelo) o se carga (--modelo, el
+joblib de busqueda_arbol.py) una sola vez al arrancar.
+
+    POST /puntuar  {"Edad": 30, "Frecuencia_Asistencia": 2, "Pagos_Puntuales": "No", "Meses_Suscrito": 6}
+                   -> {"riesgo": 0.83}
+    POST /puntuar  [{...}, {...}]            -> {"riesgos": [0.83, 0.05]}
+    GET  /estado   lotes y filas procesadas
+
+Cada pedido corre en su hilo, pero no llama a predict_proba por su cuenta:
+deja sus filas en una cola y un único hilo (Agrupador) junta todo lo que
+llegó mientras calculaba el lote anterior, hace un solo predict_proba y
+reparte los resultados. Con poca carga cada lote es un pedido (sin espera
+extra); con mucha, los pedidos concurrentes se agrupan solos.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import Ejercicio
+import ingesta
+
+PUERTO = 8765
+MAX_FILAS_LOTE = 4096
+MAX_FILAS_PEDIDO = 10000
+
+
+def registros_a_matriz(registros, features=Ejercicio.FEATURES):
+    """Lista de dicts -> matriz float (filas x features), con Pagos_Puntuales Sí/No -> 1/0."""
+    X = np.empty((len(registros), len(features)), dtype=np.float64)
+    for i, registro in enumerate(registros):
+        for j, col in enumerate(features):
+            if col not in registro:
+                raise ValueError(f"Falta '{col}' en el registro {i}")
+            valor = registro[col]
+            if col == "Pagos_Puntuales" and isinstance(valor, str):
+                if valor not in ingesta.PAGOS_PUNTUALES:
+                    raise ValueError(f"Pagos_Puntuales debe ser 'Sí' o 'No' (registro {i})")
+                valor = ingesta.PAGOS_PUNTUALES[valor]
+            X[i, j] = float(valor)
+    return X
+
+
+class _Pedido:
+    def __init__(self, X):
+        self.X = X
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class Agrupador:
+    """Junta los pedidos concurrentes en un predict_proba por lote (un solo hilo de cálculo)."""
+
+    def __init__(self, modelo, max_filas=MAX_FILAS_LOTE, espera=0.0):
+        self.modelo = modelo
+        self.max_filas = max_filas
+        self.espera = espera
+        self._clase = list(modelo.classes_).index(1)
+        # Un modelo entrenado con un DataFrame recibe el lote con los mismos nombres de columna
+        columnas = getattr(modelo, "feature_names_in_", None)
+        self._columnas = None if columnas is None else list(columnas)
+        self._cola = queue.Queue()
+        self.lotes = 0
+        self.filas = 0
+        self.pedidos = 0
+        threading.Thread(target=self._bucle, daemon=True).start()
+
+    def predecir(self, X):
+        pedido = _Pedido(X)
+        self._cola.put(pedido)
+        pedido.listo.wait()
+        if pedido.error is not None:
+            raise pedido.error
+        return pedido.resultado
+
+    def _juntar(self):
+        lote = [self._cola.get()]
+        filas = len(lote[0].X)
+        limite = time.perf_counter() + self.espera
+        while filas < self.max_filas:
+            try:
+                restante = limite - time.perf_counter()
+                pedido = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            lote.append(pedido)
+            filas += len(pedido.X)
+        return lote
+
+    def _bucle(self):
+        while True:
+            lote = self._juntar()
+            try:
+                X = lote[0].X if len(lote) == 1 else np.vstack([p.X for p in lote])
+                if self._columnas is not None:
+                    X = pd.DataFrame(X, columns=self._columnas, copy=False)
+                riesgo = self.modelo.predict_proba(X)[:, self._clase]
+                inicio = 0
+                for pedido in lote:
+                    pedido.resultado = riesgo[inicio:inicio + len(pedido.X)]
+                    inicio += len(pedido.X)
+            except Exception as e:
+                for pedido in lote:
+                    pedido.error = e
+            self.lotes += 1
+            self.pedidos += len(lote)
+            self.filas += sum(len(p.X) for p in lote)
+            for pedido in lote:
+                pedido.listo.set()
+
+    def estado(self):
+        return {"lotes": self.lotes, "pedidos": self.pedidos, "filas": self.filas,
+                "pedidos_por_lote": round(self.pedidos / max(1, self.lotes), 2)}
+
+
+class ManejadorPuntuar(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # conexiones persistentes (keep-alive)
+    disable_nagle_algorithm = True  # encabezado y cuerpo salen en writes separados: sin esto, +40 ms por pedido
+    agrupador = None
+
+    def _responder(self, codigo, datos):
+        cuerpo = json.dumps(datos).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        if self.path == "/estado":
+            self._responder(200, self.agrupador.estado())
+        else:
+            self._responder(404, {"error": "ruta desconocida"})
+
+    def do_POST(self):
+        if self.path != "/puntuar":
+            self._responder(404, {"error": "ruta desconocida"})
+            return
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+            datos = json.loads(self.rfile.read(largo))
+            individual = isinstance(datos, dict)
+            registros = [datos] if individual else datos
+            if not isinstance(registros, list) or not 0 < len(registros) <= MAX_FILAS_PEDIDO:
+                raise ValueError(f"Se espera un registro o una lista de 1 a {MAX_FILAS_PEDIDO} registros")
+            X = registros_a_matriz(registros)
+        except (ValueError, TypeError) as e:
+            self._responder(400, {"error": str(e)})
+            return
+        try:
+            riesgo = self.agrupador.predecir(X)
+        except Exception as e:
+            self._responder(500, {"error": str(e)})
+            return
+        if individual:
+            self._responder(200, {"riesgo": float(riesgo[0])})
+        else:
+            self._responder(200, {"riesgos": riesgo.tolist()})
+
+    def log_message(self, formato, *args):
+        pass   # sin una línea por pedido
+
+
+class ServidorPuntuar(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # el valor por defecto (5) corta conexiones con muchos clientes a la vez
+
+
+def cargar_modelo(ruta=None):
+    if ruta:
+        guardado = joblib.load(ruta)
+        if list(guardado["features"]) != Ejercicio.FEATURES:
+            raise ValueError(f"{ruta} no es un modelo del gimnasio (features {guardado['features']})")
+        return guardado["modelo"]
+    modelo, _, _ = Ejercicio.entrenar_modelo(Ejercicio.cargar_datos())
+    return modelo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio de riesgo de cancelación del gimnasio")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--modelo", default=None, help="joblib de busqueda_arbol.py (por defecto, entrena el de Ejercicio.py)")
+    parser.add_argument("--espera-ms", type=float, default=0.0, help="espera extra para llenar cada lote")
+    parser.add_argument("--max-filas-lote", type=int, default=MAX_FILAS_LOTE, help="1 = sin agrupar (un predict_proba por pedido)")
+    args = parser.parse_args()
+
+    ManejadorPuntuar.agrupador = Agrupador(cargar_modelo(args.modelo), args.max_filas_lote, args.espera_ms / 1000)
+    servidor = ServidorPuntuar(("127.0.0.1", args.puerto), ManejadorPuntuar)
+    print(f"🏋️ Servicio de riesgo en http://127.0.0.1:{args.puerto}/puntuar (Ctrl+C para salir)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido")
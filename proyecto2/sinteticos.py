@@ -0,0 +1,87 @@
+# para ejecutar : py sinteticos.py compras 10000000 clientes.parquet
+"""Archivos sintéticos grandes con el mismo formato que los de ejemplo.
+
+- compras: columnas del Excel de promociones, con los textos sin codificar
+  (Genero F/M, Recibio_Promo y Recompra Si/No).
+- gimnasio: columnas de clientes_gimnasio.csv (Pagos_Puntuales Sí/No).
+
+El objetivo depende de las features con reglas simples más ruido, para que
+un árbol tenga algo que aprender. La misma semilla genera siempre el mismo
+archivo, y se escribe por bloques con EscritorBloques (CSV o Parquet según
+la extensión), así que la memoria no depende de la cantidad de filas.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from puntuar_clientes import TAM_BLOQUE, EscritorBloques
+
+SEMILLA = 42
+
+
+def _si_no(valores, si="Si"):
+    return np.where(valores, si, "No")
+
+
+def clientes(n, rnd, inicio=0):
+    """n clientes con las columnas de Mini_Proyecto_Clientes_Promociones.xlsx."""
+    edad = rnd.integers(18, 81, n)
+    promo = rnd.random(n) < 0.5
+    monto = rnd.integers(1, 10, n) * 100
+    compras = rnd.integers(1, 11, n)
+    ingreso = rnd.integers(15000, 120001, n)
+    prob = (0.25 + 0.35 * (promo & (monto >= 500)) + 0.15 * (compras >= 3)
+            - 0.10 * (ingreso < 30000) + 0.05 * (edad > 60))
+    return pd.DataFrame({
+        "Cliente_ID": np.arange(inicio + 1, inicio + n + 1),
+        "Genero": np.where(rnd.random(n) < 0.5, "F", "M"),
+        "Edad": edad,
+        "Recibio_Promo": _si_no(promo),
+        "Monto_Promo": monto,
+        "Recompra": _si_no(rnd.random(n) < prob),
+        "Total_Compras": compras,
+        "Ingreso_Mensual": ingreso,
+    })
+
+
+def socios(n, rnd, inicio=0):
+    """n socios con las columnas de clientes_gimnasio.csv."""
+    frecuencia = rnd.integers(0, 8, n)
+    puntuales = rnd.random(n) < 0.7
+    meses = rnd.integers(1, 37, n)
+    prob = 0.05 + 0.55 * (frecuencia <= 2) + 0.25 * ~puntuales - 0.10 * (meses > 12)
+    return pd.DataFrame({
+        "Edad": rnd.integers(18, 66, n),
+        "Frecuencia_Asistencia": frecuencia,
+        "Pagos_Puntuales": _si_no(puntuales, "Sí"),
+        "Meses_Suscrito": meses,
+        "Canceló": (rnd.random(n) < prob).astype(np.int8),
+    })
+
+
+ESQUEMAS = {"compras": clientes, "gimnasio": socios}
+
+
+def escribir(ruta, esquema, filas, semilla=SEMILLA, tam=TAM_BLOQUE):
+    """Escribe `filas` filas del esquema en `ruta`, de a bloques de `tam`."""
+    generar = ESQUEMAS[esquema]
+    rnd = np.random.default_rng(semilla)
+    escritor = EscritorBloques(ruta, vacio=generar(0, np.random.default_rng(semilla)))   # filas=0: solo encabezado
+    for inicio in range(0, filas, tam):
+        escritor.escribir(generar(min(tam, filas - inicio), rnd, inicio))
+    escritor.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un archivo sintético de clientes o socios")
+    parser.add_argument("esquema", choices=sorted(ESQUEMAS))
+    parser.add_argument("filas", type=int)
+    parser.add_argument("salida", help="archivo .csv o .parquet")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    escribir(args.salida, args.esquema, args.filas, args.semilla)
+    print(f"✅ {args.salida}: {args.filas:,} filas de {args.esquema} en {time.perf_counter() - t0:.1f} s")
@@ -0,0 +1,118 @@
+# para ejecutar : py -m pytest test_compilar_arbol.py   (o py test_compilar_arbol.py, sin pytest)
+"""El árbol compilado (compilar_arbol.py) da exactamente lo mismo que sklearn.
+
+Compara hoja/predecir_proba/predecir (lote con np.where o por niveles, y
+registro suelto en Python puro) contra apply/predict_proba/predict en:
+  - árboles de profundidad 3 y 4 (los de Compras.py y Ejercicio.py) sobre
+    datos de sinteticos.py con las mismas codificaciones,
+  - un árbol de profundidad 10 y 3 clases sobre datos continuos,
+agregando filas con cada feature justo en un umbral y en el float64/float32
+anterior y siguiente (donde importa la comparación en float32 de sklearn).
+Tarda unos segundos: no necesita el Excel ni el CSV del gimnasio.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+import ingesta
+import sinteticos
+from busqueda_arbol import FEATURES_COMPRAS, FEATURES_GIMNASIO
+from compilar_arbol import MAX_NODOS_WHERE, compilar
+
+FILAS = 5000
+
+
+def arbol_compras():
+    df = ingesta.codificar_clientes(sinteticos.clientes(FILAS, np.random.default_rng(1)))
+    X = df[FEATURES_COMPRAS].to_numpy(dtype=float)
+    return DecisionTreeClassifier(max_depth=3, random_state=42).fit(X, df["Recompra"]), FEATURES_COMPRAS, X
+
+
+def arbol_gimnasio():
+    df = ingesta.codificar_gimnasio(sinteticos.socios(FILAS, np.random.default_rng(2)))
+    X = df[FEATURES_GIMNASIO].to_numpy(dtype=float)
+    return DecisionTreeClassifier(max_depth=4, random_state=42).fit(X, df["Canceló"]), FEATURES_GIMNASIO, X
+
+
+def arbol_profundo():
+    rnd = np.random.default_rng(0)
+    X = rnd.normal(size=(FILAS, 6)) * [1, 10, 100, 1e-3, 1e4, 1]
+    y = (X[:, 0] + X[:, 1] / 10 + rnd.normal(size=len(X)) > 0).astype(int) + (X[:, 2] > 50)
+    modelo = DecisionTreeClassifier(max_depth=10, random_state=0).fit(X, y)
+    return modelo, [f"x{i}" for i in range(X.shape[1])], X
+
+
+def casos_borde(modelo, X):
+    """Filas de X con cada feature puesta en el umbral de algún nodo y en sus vecinos float64/float32."""
+    arbol = modelo.tree_
+    internos = np.flatnonzero(arbol.children_left != -1)
+    filas = []
+    for nodo in internos:
+        umbral = arbol.threshold[nodo]
+        umbral32 = np.float32(umbral)
+        for valor in (umbral, np.nextafter(umbral, np.inf), np.nextafter(umbral, -np.inf), float(umbral32),
+                      float(np.nextafter(umbral32, np.float32(np.inf))), float(np.nextafter(umbral32, np.float32(-np.inf)))):
+            fila = X[len(filas) % len(X)].copy()
+            fila[arbol.feature[nodo]] = valor
+            filas.append(fila)
+    return np.array(filas)
+
+
+def verificar(nombre, modelo, features, X):
+    """Falla con AssertionError si alguna salida del compilado difiere de sklearn."""
+    evaluador = compilar(modelo, features, nombre)
+    X = np.vstack([X, casos_borde(modelo, X)])
+    hojas_sklearn = modelo.apply(X)
+    numero = {int(n): i for i, n in enumerate(np.flatnonzero(modelo.tree_.children_left == -1))}
+    esperado = np.array([numero[int(h)] for h in hojas_sklearn])
+
+    assert np.array_equal(evaluador["hojas"](X), esperado), f"{nombre}: hojas distintas (lote)"
+    registros = pd.DataFrame(X, columns=features).to_dict("records")
+    assert [evaluador["hoja"](r) for r in registros] == esperado.tolist(), f"{nombre}: hojas distintas (Python)"
+    assert np.array_equal(evaluador["predecir_proba"](X), modelo.predict_proba(X)), f"{nombre}: predict_proba distinto"
+    assert np.array_equal(evaluador["predecir"](X), modelo.predict(X)), f"{nombre}: predict distinto"
+    assert [evaluador["predecir_registro"](r) for r in registros] == modelo.predict(X).tolist(), \
+        f"{nombre}: predict distinto (Python)"
+    # Con un DataFrame de entrada las columnas se toman por nombre
+    X_df = pd.DataFrame(X, columns=features)
+    assert np.array_equal(evaluador["predecir_proba"](X_df), modelo.predict_proba(X)), f"{nombre}: DataFrame distinto"
+
+
+def test_arbol_compras():
+    modelo, features, X = arbol_compras()
+    assert modelo.tree_.node_count <= MAX_NODOS_WHERE   # camino np.where
+    verificar("compras", modelo, features, X)
+
+
+def test_arbol_gimnasio():
+    modelo, features, X = arbol_gimnasio()
+    assert modelo.tree_.node_count <= MAX_NODOS_WHERE
+    verificar("gimnasio", modelo, features, X)
+
+
+def test_arbol_profundo():
+    modelo, features, X = arbol_profundo()
+    assert modelo.tree_.node_count > MAX_NODOS_WHERE   # camino por niveles
+    verificar("profundo", modelo, features, X)
+
+
+def test_umbral_float32():
+    """Un valor entre el umbral float64 y su redondeo a float32 va a donde lo manda sklearn."""
+    X = np.array([[0.0], [1.0]])
+    modelo = DecisionTreeClassifier(max_depth=1).fit(X, [0, 1])
+    umbral = modelo.tree_.threshold[0]
+    valores = np.array([[umbral], [np.nextafter(umbral, np.inf)], [float(np.float32(umbral))],
+                        [float(np.nextafter(np.float32(umbral), np.float32(np.inf)))]])
+    evaluador = compilar(modelo, ["x"], "umbral")
+    assert np.array_equal(evaluador["predecir"](valores), modelo.predict(valores))
+    assert [evaluador["predecir_registro"]({"x": v}) for v in valores[:, 0]] == modelo.predict(valores).tolist()
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore", message="X (does not have valid|has) feature names")
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_"):
+            prueba()
+            print(f" ✅ {nombre}")
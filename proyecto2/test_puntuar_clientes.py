@@ -0,0 +1,73 @@
+# para ejecutar : py -m pytest test_puntuar_clientes.py   (o py test_puntuar_clientes.py, sin pytest)
+"""La salida de puntuar_clientes.py tiene las mismas columnas con o sin filas.
+
+Puntúa con un árbol chico entrenado sobre datos de sinteticos.py una entrada
+con filas y otra con solo el encabezado (CSV y Parquet, con y sin
+Cliente_ID) y compara el esquema de las dos salidas.
+"""
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+import ingesta
+import sinteticos
+from busqueda_arbol import FEATURES_COMPRAS
+from puntuar_clientes import COLUMNA_ID, puntuar_archivo
+
+
+def _puntuar(carpeta, ruta_modelo, df, extension):
+    entrada = os.path.join(carpeta, f"entrada{extension}")
+    salida = os.path.join(carpeta, f"salida{extension}")
+    if extension == ".parquet":
+        df.to_parquet(entrada, index=False)
+    else:
+        df.to_csv(entrada, index=False)
+    puntuar_archivo(entrada, salida, ruta_modelo)
+    return pd.read_parquet(salida) if extension == ".parquet" else pd.read_csv(salida)
+
+
+def _verificar(con_id, extension):
+    carpeta = tempfile.mkdtemp(prefix="test_puntuar_")
+    try:
+        clientes = sinteticos.clientes(200, np.random.default_rng(0))
+        entrenamiento = ingesta.codificar_clientes(clientes)
+        modelo = DecisionTreeClassifier(max_depth=3, random_state=42).fit(
+            entrenamiento[FEATURES_COMPRAS].to_numpy(dtype=float), entrenamiento["Recompra"])
+        ruta_modelo = os.path.join(carpeta, "modelo.joblib")
+        joblib.dump({"modelo": modelo, "features": FEATURES_COMPRAS}, ruta_modelo)
+
+        entrada = clientes[([COLUMNA_ID] if con_id else []) + FEATURES_COMPRAS]
+        con_filas = _puntuar(carpeta, ruta_modelo, entrada, extension)
+        sin_filas = _puntuar(carpeta, ruta_modelo, entrada.iloc[:0], extension)
+        columnas = ([COLUMNA_ID] if con_id else []) + ["prob_recompra", "prediccion"]
+        assert list(con_filas.columns) == columnas
+        assert list(sin_filas.columns) == columnas
+        assert len(con_filas) == len(entrada) and len(sin_filas) == 0
+        if extension == ".parquet":
+            assert dict(sin_filas.dtypes) == dict(con_filas.dtypes)
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def test_csv_con_id():
+    _verificar(True, ".csv")
+
+
+def test_csv_sin_id():
+    _verificar(False, ".csv")
+
+
+def test_parquet_con_id():
+    _verificar(True, ".parquet")
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_"):
+            prueba()
+            print(f" ✅ {nombre}")